@@ -7,6 +7,7 @@ SMTP_SERVER=smtp.yandex.com # Yandex için:
 
 """
 import os
+import json
 import logging
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -14,19 +15,27 @@ from dotenv import load_dotenv
 
 # Önce dotenv'i yükle
 env_path = Path('.') / '.env'
-logging.info(f".env dosya yolu: {env_path.absolute()}")
-logging.info(f".env dosyası var mı: {env_path.exists()}")
-
 load_dotenv()
 
-# Tüm env değişkenlerini debug için göster
-logging.info("Mevcut env değişkenleri:")
-for key in ['TELEGRAM_TOKEN', 'ADMIN_CHAT_IDS', 'USE_WEBHOOK', 'WEBHOOK_URL', 'WEBHOOK_SECRET']:
-    value = os.getenv(key)
-    if value:
-        logging.info(f"  {key}: {value}")
-    else:
-        logging.warning(f"  {key}: TANIMSIZ")
+SECRET_ENV_KEYS = ('TELEGRAM_TOKEN', 'WEBHOOK_SECRET')
+
+
+def log_env():
+    """
+    Önemli env değişkenlerini debug için gösterir.
+    Import sırasında değil, logger kurulduktan sonra main.py'den çağrılır (gizli değerler maskelenir).
+    """
+    logging.info(f".env dosya yolu: {env_path.absolute()} (var mı: {env_path.exists()})")
+    logging.info("Mevcut env değişkenleri:")
+    for key in ['TELEGRAM_TOKEN', 'ADMIN_CHAT_IDS', 'USE_WEBHOOK', 'WEBHOOK_URL', 'WEBHOOK_SECRET']:
+        value = os.getenv(key)
+        if not value:
+            logging.warning(f"  {key}: TANIMSIZ")
+        elif key in SECRET_ENV_KEYS:
+            logging.info(f"  {key}: ***{value[-4:]}")
+        else:
+            logging.info(f"  {key}: {value}")
+
 
 @dataclass
 class Config:
@@ -37,9 +46,13 @@ class Config:
     USE_WEBHOOK: bool = field(default_factory=lambda: os.getenv("USE_WEBHOOK", "False").lower() == "true")
     WEBHOOK_URL: str = os.getenv("WEBHOOK_URL", "")
     WEBHOOK_SECRET: str = os.getenv("WEBHOOK_SECRET", "")
+    WEBHOOK_WORKERS: int = int(os.getenv("WEBHOOK_WORKERS", 8))  # Update işleyici sayısı
+    WEBHOOK_QUEUE_SIZE: int = int(os.getenv("WEBHOOK_QUEUE_SIZE", 1000))  # Doluysa 503 (Telegram tekrar dener)
     
-    # Render için port ayarı - main.py'de WEBHOOK_PORT olarak kullanılıyor
+    # Render için port ayarı - main.py'deki tek HTTP sunucusu (/webhook, /health, /ready, /metrics)
     PORT: int = int(os.getenv("PORT", 10000))
+    # /ready: update kuyruğu bu orandan fazla doluysa 503 döner
+    READY_MAX_QUEUE_FILL: float = float(os.getenv("READY_MAX_QUEUE_FILL", 0.8))
     
     # Admin ID'leri
     ADMIN_CHAT_IDS: list[int] = field(default_factory=list)
@@ -54,8 +67,76 @@ class Config:
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
     # SMTP_PORTS: list[int] = field(default_factory=lambda: [465, 587])  # ESKİ 2 portlu
     SMTP_PORTS: list[int] = field(default_factory=list)  # YENİ: Boş liste> yandex + gmail için. ALTTA port
+    # Bağlantı güvenliği: auto (465→ssl, diğerleri→starttls), ssl, starttls, none
+    SMTP_SECURITY: str = os.getenv("SMTP_SECURITY", "auto").lower()
+    # Ek güvenilir CA dosyası (yerel test SMTP sunucusunun self-signed sertifikası için)
+    SMTP_CA_FILE: str = os.getenv("SMTP_CA_FILE", "")
+    # Çoklu SMTP hesabı (JSON liste) - boşsa yukarıdaki tekil hesap kullanılır
+    # [{"server": "smtp.gmail.com", "username": "...", "password": "...", "weight": 2,
+    #   "ports": [465], "messages_per_minute": 20, "daily_limit": 500}, ...]
+    SMTP_ACCOUNTS: list[dict] = field(default_factory=list)
+    # Failover: kimlik / kota hatası alan hesap bu kadar saniye devre dışı kalır
+    SMTP_AUTH_COOLDOWN: int = int(os.getenv("SMTP_AUTH_COOLDOWN", 3600))
+    SMTP_QUOTA_COOLDOWN: int = int(os.getenv("SMTP_QUOTA_COOLDOWN", 900))
 
+    # Mail gönderim kuyruğu - aynı anda açık SMTP oturumu sınırı
+    MAIL_MAX_CONCURRENCY: int = int(os.getenv("MAIL_MAX_CONCURRENCY", 3))
+    # Sağlayıcı hız limitleri (0 → SMTP_PROVIDER_LIMITS içindeki varsayılan)
+    MAIL_RATE_PER_MINUTE: int = int(os.getenv("MAIL_RATE_PER_MINUTE", 0))
+    MAIL_BYTES_PER_MINUTE: int = int(os.getenv("MAIL_BYTES_PER_MINUTE", 0))
+    SMTP_PROVIDER_LIMITS: dict = field(default_factory=lambda: {
+        "gmail": {"messages_per_minute": 20, "bytes_per_minute": 60 * 1024 * 1024},
+        "yandex": {"messages_per_minute": 15, "bytes_per_minute": 40 * 1024 * 1024},
+        "default": {"messages_per_minute": 30, "bytes_per_minute": 60 * 1024 * 1024},
+    })
+    # Ek boyutu limiti (ham dosya) - base64 ile ~4/3 büyür, 18 MB → ~24 MB mesaj (Gmail: 25 MB)
+    MAX_ATTACHMENT_BYTES: int = int(float(os.getenv("MAX_ATTACHMENT_MB", 18)) * 1024 * 1024)
+    # Limit aşan ekler için zip modu: deflated veya stored
+    ATTACHMENT_ZIP_MODE: str = os.getenv("ATTACHMENT_ZIP_MODE", "deflated").lower()
+    # Birden fazla gruba kayıtlı alıcıya tek mail (tüm grup dosyaları ekte)
+    MAIL_MERGE_RECIPIENTS: bool = field(default_factory=lambda: os.getenv("MAIL_MERGE_RECIPIENTS", "True").lower() == "true")
+    # Birleşik mailde ekler bu boyutu aşarsa tek zip olarak gönderilir
+    MAIL_MERGE_ZIP_THRESHOLD: int = int(float(os.getenv("MAIL_MERGE_ZIP_THRESHOLD_MB", 10)) * 1024 * 1024)
+    # Ekler bu boyutu aşarsa mesaj bellekte oluşturulmaz, diskten akışla gönderilir
+    MAIL_STREAM_THRESHOLD: int = int(float(os.getenv("MAIL_STREAM_THRESHOLD_MB", 2)) * 1024 * 1024)
+    
+    # Telegram'a dosya gönderimi: bu sayı veya toplam boyut aşılırsa dosyalar tek zip olarak gönderilir
+    TG_ZIP_FILE_COUNT: int = int(os.getenv("TG_ZIP_FILE_COUNT", 20))
+    TG_ZIP_TOTAL_BYTES: int = int(float(os.getenv("TG_ZIP_TOTAL_MB", 40)) * 1024 * 1024)
+    
+    # Telegram API gönderim limitleri (flood/429 koruması)
+    TG_GLOBAL_RATE: float = float(os.getenv("TG_GLOBAL_RATE", 30))  # Tüm sohbetler, mesaj/sn
+    TG_CHAT_RATE_PER_MINUTE: float = float(os.getenv("TG_CHAT_RATE_PER_MINUTE", 60))  # Özel sohbet başına
+    TG_GROUP_RATE_PER_MINUTE: float = float(os.getenv("TG_GROUP_RATE_PER_MINUTE", 20))  # Grup/kanal başına
+    TG_MAX_CONCURRENCY: int = int(os.getenv("TG_MAX_CONCURRENCY", 8))
+    TG_MAX_RETRIES: int = int(os.getenv("TG_MAX_RETRIES", 3))  # retry_after sonrası tekrar deneme
+    
+    # İş zamanlayıcı: aynı anda çalışan Excel işi sayısı ve küçük dosyalar için hızlı şerit
+    JOB_MAX_CONCURRENCY: int = int(os.getenv("JOB_MAX_CONCURRENCY", 2))
+    JOB_FAST_LANE_BYTES: int = int(float(os.getenv("JOB_FAST_LANE_KB", 512)) * 1024)
+    JOB_FAST_LANE_SLOTS: int = int(os.getenv("JOB_FAST_LANE_SLOTS", 1))
+    
+    # İş geçmişi (SQLite): /status ve admin istatistikleri buradan hesaplanır
+    JOB_HISTORY_PATH: str = os.getenv("JOB_HISTORY_PATH", "")  # Boşsa data/jobs.sqlite3
+    JOB_HISTORY_FLUSH_INTERVAL: float = float(os.getenv("JOB_HISTORY_FLUSH_INTERVAL", 1.0))  # Toplu yazma aralığı (sn)
+    JOB_HISTORY_DAYS: int = int(os.getenv("JOB_HISTORY_DAYS", 180))  # Bu kadar günden eski kayıtlar silinir (0: hiç)
     
+    # Disk kullanımı: dizin boyutları artımlı tutulur, bu aralıkla (sn) tarayarak düzeltilir
+    DISK_RECONCILE_INTERVAL: float = float(os.getenv("DISK_RECONCILE_INTERVAL", 600))
+    # Dizin kotaları (0: sınırsız) - input/output kotası doluysa yeni dosya kabul edilmez
+    INPUT_QUOTA_BYTES: int = int(float(os.getenv("INPUT_QUOTA_MB", 0)) * 1024 * 1024)
+    OUTPUT_QUOTA_BYTES: int = int(float(os.getenv("OUTPUT_QUOTA_MB", 0)) * 1024 * 1024)
+    LOGS_QUOTA_BYTES: int = int(float(os.getenv("LOGS_QUOTA_MB", 0)) * 1024 * 1024)
+    
+    # Loglama: bot.log metin, bot.jsonl JSON satırları (job_id / user_id alanlarıyla)
+    LOG_JSON: bool = field(default_factory=lambda: os.getenv("LOG_JSON", "True").lower() == "true")
+    # Sık tekrarlanan log satırları (ilerleme, mail denemeleri) en fazla bu aralıkla (sn) yazılır
+    LOG_THROTTLE_SECONDS: float = float(os.getenv("LOG_THROTTLE_SECONDS", 5))
+    
+    # groups.json değişiklik kontrol aralığı (sn) - 0 ise izleme kapalı
+    GROUPS_WATCH_INTERVAL: float = float(os.getenv("GROUPS_WATCH_INTERVAL", 5))
+
+
     
     
     # UTİLS işlemleri için ayarlar
@@ -68,6 +149,28 @@ class Config:
     
     # Redis (eğer kullanıyorsanız)
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    
+    # FSM durum deposu: sqlite | redis | memory
+    FSM_STORAGE: str = os.getenv("FSM_STORAGE", "sqlite").lower()
+    FSM_SQLITE_PATH: str = os.getenv("FSM_SQLITE_PATH", "")  # Boşsa data/fsm.sqlite3
+    FSM_FLUSH_INTERVAL: float = float(os.getenv("FSM_FLUSH_INTERVAL", 0.5))  # Toplu yazma aralığı (sn)
+    FSM_CACHE_TTL: float = float(os.getenv("FSM_CACHE_TTL", 60))  # Okuma önbelleği (sn), çok instance'ta kısa tutun
+    FSM_STATE_TTL: int = int(os.getenv("FSM_STATE_TTL", 7 * 24 * 3600))  # Redis kayıt ömrü (sn)
+    
+    # İş çalıştırma: local (bot sürecinde) | celery (ayrı worker'larda)
+    JOB_BACKEND: str = os.getenv("JOB_BACKEND", "local").lower()
+    CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "")  # Boşsa REDIS_URL
+    CELERY_RESULT_BACKEND: str = os.getenv("CELERY_RESULT_BACKEND", "")  # Boşsa REDIS_URL
+    CELERY_EAGER: bool = field(default_factory=lambda: os.getenv("CELERY_EAGER", "False").lower() == "true")  # Broker'sız, süreç içi (test)
+    CELERY_POLL_INTERVAL: float = float(os.getenv("CELERY_POLL_INTERVAL", 1.0))  # Sonuç/ilerleme sorgu aralığı (sn)
+    # Mail limitleri (hız kovaları, günlük sayaç, hesap bekleme süresi) nerede tutulur:
+    # local → süreç içinde, redis → bot ve tüm Celery worker'ları aynı limiti paylaşır (REDIS_URL).
+    # Varsayılan: Celery (eager değil) modunda redis; aksi halde her worker limiti ayrı uygular.
+    MAIL_LIMITER_BACKEND: str = field(default_factory=lambda: os.getenv(
+        "MAIL_LIMITER_BACKEND",
+        "redis" if os.getenv("JOB_BACKEND", "local").lower() == "celery"
+        and os.getenv("CELERY_EAGER", "False").lower() != "true" else "local",
+    ).lower())
 
     def __post_init__(self):
         # ADMIN_CHAT_IDS'i yükle
@@ -101,6 +204,18 @@ class Config:
             else:
                 self.SMTP_PORTS = [465, 587]  # Diğerleri için her iki port
         
+        # SMTP_ACCOUNTS'u environment'dan yükle (JSON liste)
+        accounts_raw = os.getenv("SMTP_ACCOUNTS", "")
+        if accounts_raw.strip():
+            try:
+                accounts = json.loads(accounts_raw)
+                if not isinstance(accounts, list) or not all(isinstance(a, dict) and a.get("server") for a in accounts):
+                    raise ValueError("her hesap 'server' alanı olan bir nesne olmalı")
+                self.SMTP_ACCOUNTS = accounts
+                logging.info(f"✅ {len(accounts)} SMTP hesabı yüklendi")
+            except ValueError as e:
+                logging.error(f"❌ HATA: SMTP_ACCOUNTS okunamadı: {e}")
+        
         # PERSONAL_EMAIL kontrolü
         if not self.PERSONAL_EMAIL:
             logging.warning("⚠️ PERSONAL_EMAIL tanımlanmamış")
@@ -109,12 +224,14 @@ class Config:
         
        # Dizin yapılandırması
         self.DATA_DIR = Path(__file__).parent / "data"
-        self.INPUT_DIR = self.DATA_DIR / "input"
-        self.OUTPUT_DIR = self.DATA_DIR / "output"
-        self.GROUPS_DIR = self.DATA_DIR / "groups"
+        # Bot ve Celery worker'ları arasında paylaşılan dizin (NFS vb.): girdi, çıktı ve gruplar
+        self.STORAGE_DIR = Path(os.getenv("SHARED_STORAGE_DIR") or self.DATA_DIR)
+        self.INPUT_DIR = self.STORAGE_DIR / "input"
+        self.OUTPUT_DIR = self.STORAGE_DIR / "output"
+        self.GROUPS_DIR = self.STORAGE_DIR / "groups"
         self.LOGS_DIR = self.DATA_DIR / "logs"
 
-        for directory in [self.DATA_DIR, self.INPUT_DIR, self.OUTPUT_DIR, self.GROUPS_DIR, self.LOGS_DIR]:
+        for directory in [self.DATA_DIR, self.STORAGE_DIR, self.INPUT_DIR, self.OUTPUT_DIR, self.GROUPS_DIR, self.LOGS_DIR]:
             directory.mkdir(parents=True, exist_ok=True)
 
 config = Config()
\ No newline at end of file
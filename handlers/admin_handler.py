@@ -7,17 +7,22 @@ from aiogram.filters import Command, CommandObject
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from datetime import datetime, timedelta
-import aiofiles
-import aiofiles.os
+import asyncio
 import json
 import shutil
 from typing import Dict, List, Any
 
 from config import config
 from utils.logger import logger
-from utils.file_utils import get_file_stats, get_directory_size, get_recent_processed_files
-from utils.group_manager import group_manager
+from utils.file_utils import get_file_stats, get_recent_processed_files, remove_empty_dirs
+from utils.disk_usage import disk_usage
+from utils.log_reader import error_counter, tail_lines
+from utils.group_manager import group_manager, validate_groups
 from utils.mailer import send_email_with_attachment
+from utils.smtp_accounts import get_account_pool
+from utils.smtp_trace import PHASES, smtp_trace_store
+from utils.update_queue import update_queue
+from utils.telegram_sender import broadcast
 
 router = Router()
 
@@ -89,24 +94,27 @@ async def show_admin_stats(message: Message):
     try:
         stats = await get_file_stats(detailed=True)
         
-        # Disk kullanımı
-        input_size = await get_directory_size(config.INPUT_DIR)
-        output_size = await get_directory_size(config.OUTPUT_DIR)
-        logs_size = await get_directory_size(config.LOGS_DIR)
+        # Aşama başına ortalama süre (son 7 gün, başarılı işler)
+        stage_lines = "".join(
+            f"  {stage}: {seconds:.1f} sn\n" for stage, seconds in stats["stage_averages"].items()
+        ) or "  Veri yok\n"
         
         stats_message = (
             "📈 **Admin İstatistikleri**\n\n"
             f"📊 Toplam işlenen dosya: {stats['total_processed']}\n"
             f"✅ Başarılı işlem: {stats['successful_processed']}\n"
             f"❌ Başarısız işlem: {stats['failed_processed']}\n"
-            f"📧 Gönderilen mail: {stats['emails_sent']}\n\n"
+            f"🛑 İptal edilen: {stats['cancelled_processed']}\n"
+            f"📧 Gönderilen mail: {stats['emails_sent']} (başarısız: {stats['emails_failed']})\n\n"
             f"📅 Zaman Bazlı:\n"
-            f"  Son 24 saat: {stats['last_24h_processed']} dosya\n"
-            f"  Son 7 gün: {stats['last_7d_processed']} dosya\n\n"
+            f"  Son 24 saat: {stats['last_24h_processed']} dosya, {stats['last_24h_rows']} satır\n"
+            f"  Son 7 gün: {stats['last_7d_processed']} dosya, {stats['last_7d_rows']} satır\n\n"
+            f"⏱️ Ortalama Aşama Süreleri (7 gün):\n"
+            f"{stage_lines}\n"
             f"💾 Disk Kullanımı:\n"
-            f"  Input: {input_size}\n"
-            f"  Output: {output_size}\n"
-            f"  Logs: {logs_size}\n\n"
+            f"  Input: {stats['input_dir_size']}\n"
+            f"  Output: {stats['output_dir_size']}\n"
+            f"  Logs: {stats['logs_dir_size']}\n\n"
             f"📈 Toplam satır: {stats['total_rows']}"
         )
         
@@ -120,16 +128,13 @@ async def show_admin_logs(message: Message):
     """Admin loglarını gösterir"""
     try:
         log_path = config.LOGS_DIR / "bot.log"
-        error_path = config.LOGS_DIR / "errors.log"
         
         if not log_path.exists():
             await message.answer("📝 Log dosyası bulunamadı.")
             return
         
-        # Son 50 satırı oku
-        async with aiofiles.open(log_path, 'r', encoding='utf-8') as f:
-            lines = await f.readlines()
-            last_lines = lines[-50:] if len(lines) > 50 else lines
+        # Son 50 satırı oku (dosya sonundan geriye, tamamı okunmaz)
+        last_lines = await asyncio.to_thread(tail_lines, log_path, 50)
         
         if not last_lines:
             await message.answer("📝 Log dosyası boş.")
@@ -137,20 +142,14 @@ async def show_admin_logs(message: Message):
         
         log_content = "".join(last_lines)
         
-        # Hata loglarını da kontrol et
-        error_count = 0
-        if error_path.exists():
-            async with aiofiles.open(error_path, 'r', encoding='utf-8') as f:
-                error_lines = await f.readlines()
-                error_count = len(error_lines)
-        
         # Telegram mesaj sınırı
         if len(log_content) > 4000:
             log_content = log_content[-4000:]
         
+        # Hata sayısı loguru sink'inden (errors.log okunmaz)
         response = (
             f"📝 **Son 50 Log Satırı**\n"
-            f"❌ Hata sayısı: {error_count}\n\n"
+            f"❌ Hata sayısı: {error_counter.total} (son 24 saat: {error_counter.last_24h})\n\n"
             f"```\n{log_content}\n```"
         )
         
@@ -249,9 +248,7 @@ async def handle_group_file_upload(message: Message, state: FSMContext):
             with open(file_path, 'r', encoding='utf-8') as f:
                 groups_data = json.load(f)
             
-            # Basit doğrulama
-            if "groups" not in groups_data or not isinstance(groups_data["groups"], list):
-                raise ValueError("Geçersiz grup dosyası formatı")
+            validate_groups(groups_data)
             
             # Yedek al
             backup_path = config.GROUPS_DIR / f"groups_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
@@ -260,10 +257,10 @@ async def handle_group_file_upload(message: Message, state: FSMContext):
             
             # Yeni dosyayı aktif et
             shutil.move(file_path, config.GROUPS_DIR / "groups.json")
+            disk_usage.rescan(config.GROUPS_DIR)
             
             # Grupları yenile
-            group_manager.groups = group_manager.load_groups()
-            group_manager.city_to_group = group_manager.build_city_mapping()
+            group_manager.refresh_groups()
             
             await message.answer(
                 "✅ Grup dosyası başarıyla güncellendi!\n"
@@ -273,7 +270,7 @@ async def handle_group_file_upload(message: Message, state: FSMContext):
             
         except Exception as e:
             await message.answer(f"❌ Geçersiz grup dosyası: {str(e)}")
-            file_path.unlink()  # Geçersiz dosyayı sil
+            disk_usage.unlink(file_path)  # Geçersiz dosyayı sil
         
     except Exception as e:
         logger.error(f"Grup dosyası yükleme hatası: {e}")
@@ -285,25 +282,17 @@ async def handle_group_file_upload(message: Message, state: FSMContext):
 async def handle_broadcast_message(message: Message, state: FSMContext):
     """Toplu mesaj gönderimini işler"""
     try:
-        # Tüm adminlere mesajı gönder
-        sent_count = 0
-        failed_count = 0
-        
-        for admin_id in config.ADMIN_CHAT_IDS:
-            try:
-                await message.bot.send_message(
-                    admin_id,
-                    f"📢 **Toplu Bildirim**\n\n{message.text}"
-                )
-                sent_count += 1
-            except Exception as e:
-                logger.error(f"Toplu mesaj gönderilemedi {admin_id}: {e}")
-                failed_count += 1
+        # Tüm adminlere mesajı paralel gönder (hız limiti bot session'ında)
+        result = await broadcast(
+            message.bot,
+            config.ADMIN_CHAT_IDS,
+            f"📢 **Toplu Bildirim**\n\n{message.text}"
+        )
         
         await message.answer(
             f"✅ Toplu mesaj gönderildi!\n"
-            f"Başarılı: {sent_count}\n"
-            f"Başarısız: {failed_count}"
+            f"Başarılı: {result['sent']}\n"
+            f"Başarısız: {result['failed']}"
         )
         
     except Exception as e:
@@ -320,24 +309,27 @@ async def clean_system(message: Message):
         now = datetime.now()
         
         # Input dizini (24 saatten eski)
-        for file_path in config.INPUT_DIR.glob("*"):
+        for file_path in config.INPUT_DIR.rglob("*"):
             if file_path.is_file():
                 file_time = datetime.fromtimestamp(file_path.stat().st_mtime)
                 if now - file_time > timedelta(hours=24):
                     file_size = file_path.stat().st_size
                     file_path.unlink()
+                    disk_usage.removed(file_path)
                     cleaned_files += 1
                     cleaned_size += file_size
         
         # Output dizini (7 günden eski)
-        for file_path in config.OUTPUT_DIR.glob("*"):
+        for file_path in config.OUTPUT_DIR.rglob("*"):
             if file_path.is_file():
                 file_time = datetime.fromtimestamp(file_path.stat().st_mtime)
                 if now - file_time > timedelta(days=7):
                     file_size = file_path.stat().st_size
                     file_path.unlink()
+                    disk_usage.removed(file_path)
                     cleaned_files += 1
                     cleaned_size += file_size
+        remove_empty_dirs(config.OUTPUT_DIR)  # Boş kalan iş dizinleri
         
         # Eski log backup'ları (30 günden eski)
         for file_path in config.LOGS_DIR.glob("*.log.*"):
@@ -346,6 +338,7 @@ async def clean_system(message: Message):
                 if now - file_time > timedelta(days=30):
                     file_size = file_path.stat().st_size
                     file_path.unlink()
+                    disk_usage.removed(file_path)
                     cleaned_files += 1
                     cleaned_size += file_size
         
@@ -356,6 +349,7 @@ async def clean_system(message: Message):
                 if now - file_time > timedelta(days=30):
                     file_size = file_path.stat().st_size
                     file_path.unlink()
+                    disk_usage.removed(file_path)
                     cleaned_files += 1
                     cleaned_size += file_size
         
@@ -445,6 +439,7 @@ async def cmd_send_test_email(message: Message, command: CommandObject):
         test_file = config.OUTPUT_DIR / "test_email.xlsx"
         test_wb.save(test_file)
         test_wb.close()
+        disk_usage.added(test_file)
         
         # E-posta gönder
         success = await send_email_with_attachment(
@@ -455,7 +450,7 @@ async def cmd_send_test_email(message: Message, command: CommandObject):
         )
         
         # Test dosyasını sil
-        test_file.unlink()
+        disk_usage.unlink(test_file)
         
         if success:
             await message.answer(f"✅ Test e-postası gönderildi: {email}")
@@ -466,6 +461,78 @@ async def cmd_send_test_email(message: Message, command: CommandObject):
         logger.error(f"Test e-postası hatası: {e}")
         await message.answer(f"❌ Test e-postası hatası: {str(e)}")
 
+@router.message(Command("smtp"))
+async def cmd_smtp_trace(message: Message, command: CommandObject):
+    """SMTP teslimat aşamalarının p50/p95 özetini gösterir (/smtp [saat])"""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ Bu komutu kullanma yetkiniz yok.")
+        return
+    
+    try:
+        hours = float(command.args) if command.args else None
+        since = (datetime.now() - timedelta(hours=hours)).timestamp() if hours else None
+        summary = smtp_trace_store.summary(since=since)
+        
+        if not summary["deliveries"]:
+            await message.answer("📭 Kayıtlı SMTP teslimatı yok.")
+            return
+        
+        phase_lines = []
+        for phase in PHASES:
+            stats = summary["phases"].get(phase)
+            if stats:
+                phase_lines.append(
+                    f"{phase:<9}{stats['count']:>6}{stats['p50_ms']:>10.0f}{stats['p95_ms']:>10.0f}"
+                )
+        
+        account_lines = []
+        for account in get_account_pool().status():
+            state = "✅" if account["available"] else f"⛔ {account['disabled_reason'] or 'limit'} {account['disabled_for']} sn"
+            limit = f"/{account['daily_limit']}" if account["daily_limit"] else ""
+            account_lines.append(f"• {account['name']} (x{account['weight']}) {account['sent_today']}{limit} {state}")
+        
+        period = f"son {command.args} saat" if hours else "tüm kayıtlar"
+        response = (
+            f"📧 <b>SMTP Zamanlama Özeti</b> ({period})\n\n"
+            f"Teslimat: {summary['deliveries']} "
+            f"(✅ {summary['successful']} / ❌ {summary['failed']})\n"
+            f"Ort. deneme: {summary['avg_attempts']:.2f}\n"
+            f"Gönderilen: {summary['bytes_sent'] / 1024 / 1024:.2f} MB\n"
+            f"Toplam süre p50/p95: {summary['total_p50_ms']:.0f} / {summary['total_p95_ms']:.0f} ms\n\n"
+            f"<pre>{'aşama':<9}{'adet':>6}{'p50 ms':>10}{'p95 ms':>10}\n"
+            + "\n".join(phase_lines)
+            + "</pre>\n\n"
+            f"📮 <b>SMTP Hesapları</b>\n" + "\n".join(account_lines)
+        )
+        
+        await message.answer(response, parse_mode="HTML")
+        
+    except ValueError:
+        await message.answer("❌ Kullanım: /smtp [saat]")
+    except Exception as e:
+        logger.error(f"SMTP özet hatası: {e}")
+        await message.answer("❌ SMTP özeti alınamadı.")
+
+@router.message(Command("queue"))
+async def cmd_update_queue(message: Message):
+    """Webhook update kuyruğunun durumunu gösterir"""
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ Bu komutu kullanma yetkiniz yok.")
+        return
+    
+    stats = update_queue.stats()
+    mode = "webhook" if config.USE_WEBHOOK else "polling (kuyruk kullanılmıyor)"
+    await message.answer(
+        f"📬 <b>Update Kuyruğu</b> ({mode})\n\n"
+        f"Derinlik: {stats['depth']} / {stats['capacity']} (en yüksek {stats['max_depth']})\n"
+        f"İşleyici: {stats['workers']}\n"
+        f"Alınan: {stats['received']} | İşlenen: {stats['processed']} | Hatalı: {stats['failed']}\n"
+        f"Reddedilen (dolu): {stats['rejected']} | Tekrar: {stats['duplicates']}\n"
+        f"Bekleme p50/p95: {stats['lag_p50_ms']:.0f} / {stats['lag_p95_ms']:.0f} ms\n"
+        f"İşleme p50/p95: {stats['duration_p50_ms']:.0f} / {stats['duration_p95_ms']:.0f} ms",
+        parse_mode="HTML"
+    )
+
 @router.message(Command("get_logfile"))
 async def cmd_get_logfile(message: Message):
     """Log dosyasını gönderir"""
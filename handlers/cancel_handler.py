@@ -8,15 +8,17 @@ from aiogram.types import Message
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from handlers.reply_handler import show_reply_keyboard
+from jobs.scheduler import job_scheduler
 
 router = Router()
 
 @router.message(Command("cancel", "iptal", "stop"))
 async def cmd_cancel(message: Message, state: FSMContext):
-    """Mevcut işlemi iptal eder"""
+    """Mevcut işlemi iptal eder (kuyruktaki ve çalışan işler dahil)"""
+    cancelled_jobs = job_scheduler.cancel_user(message.from_user.id)
     current_state = await state.get_state()
     
-    if current_state is None:
+    if current_state is None and not cancelled_jobs:
         await message.answer("ℹ️ İptal edilecek aktif işlem yok.")
         return
     
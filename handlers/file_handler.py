@@ -17,6 +17,8 @@ from aiogram.types import Message, FSInputFile, CallbackQuery
 from aiogram.filters import Command
 from config import config
 from utils.logger import logger
+from utils.disk_usage import disk_usage
+from utils.file_utils import remove_empty_dirs
 
 router = Router()
 
@@ -59,9 +61,10 @@ async def download_output_files(message: Message):
         zip_path = Path(tempfile.gettempdir()) / f"output_files_{message.from_user.id}.zip"
         
         with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for file_path in config.OUTPUT_DIR.glob('*'):
+            for file_path in config.OUTPUT_DIR.rglob('*'):
                 if file_path.is_file():
-                    zipf.write(file_path, file_path.name)
+                    # İş dizinleri korunur (farklı işlerin aynı isimli dosyaları)
+                    zipf.write(file_path, file_path.relative_to(config.OUTPUT_DIR))
         
         await message.answer_document(
             FSInputFile(zip_path),
@@ -110,22 +113,28 @@ async def clear_all(message: Message):
         
         # Input dizini
         if config.INPUT_DIR.exists():
-            for file_path in config.INPUT_DIR.glob('*'):
+            for file_path in config.INPUT_DIR.rglob('*'):
                 if file_path.is_file():
                     file_size = file_path.stat().st_size
                     file_path.unlink()
+                    disk_usage.removed(file_path)
                     cleared_files += 1
                     cleared_size += file_size
         
         # Output dizini
         if config.OUTPUT_DIR.exists():
-            for file_path in config.OUTPUT_DIR.glob('*'):
+            for file_path in config.OUTPUT_DIR.rglob('*'):
                 if file_path.is_file():
                     file_size = file_path.stat().st_size
                     file_path.unlink()
+                    disk_usage.removed(file_path)
                     cleared_files += 1
                     cleared_size += file_size
         
+        # Boş kalan iş dizinleri
+        remove_empty_dirs(config.INPUT_DIR)
+        remove_empty_dirs(config.OUTPUT_DIR)
+        
         # Temp dizini (varsa)
         temp_dir = Path(tempfile.gettempdir())
         for pattern in ['*.xlsx', '*.xls', '*.tmp']:
@@ -134,6 +143,7 @@ async def clear_all(message: Message):
                     try:
                         file_size = file_path.stat().st_size
                         file_path.unlink()
+                        disk_usage.removed(file_path)
                         cleared_files += 1
                         cleared_size += file_size
                     except:
@@ -166,6 +176,7 @@ async def clear_logs(message: Message):
                 if file_path.is_file():
                     file_size = file_path.stat().st_size
                     file_path.unlink()
+                    disk_usage.removed(file_path)
                     cleared_files += 1
                     cleared_size += file_size
         
@@ -0,0 +1,139 @@
+# handlers/job_handler.py
+"""
+İş takibi:
+/job <id> → işin durumu, aşaması, ilerlemesi, süreleri ve sonucu
+/job      → kullanıcının son işleri
+track_job: yükleme handler'ları işi kuyruğa verip hemen cevap döner,
+rapor iş bitince bu yardımcı ile arka planda gönderilir.
+"""
+import asyncio
+import html
+import time
+from typing import Any, Awaitable, Callable, Dict, Set
+
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.types import Message
+
+from handlers.admin_handler import is_admin
+from jobs.scheduler import Job, job_scheduler
+from utils.logger import logger
+
+router = Router()
+
+# create_task referansları tutulmazsa task GC ile toplanabilir
+_notify_tasks: Set[asyncio.Task] = set()
+_tracked: Set[str] = set()  # Tekrar teslim edilen istekte rapor iki kez gönderilmesin
+
+STATUS_LABELS = {
+    "queued": "⏳ Sırada",
+    "running": "⚙️ Çalışıyor",
+    "cancelling": "🛑 İptal ediliyor",
+    "done": "✅ Tamamlandı",
+    "failed": "❌ Başarısız",
+    "cancelled": "🚫 İptal edildi",
+}
+
+
+def track_job(message: Message, job: Job, on_result: Callable[[Message, Dict[str, Any]], Awaitable[None]]):
+    """İş bitince sonucu kullanıcıya gönderir (handler beklemeden döner)"""
+    if job.job_id in _tracked:
+        return
+    _tracked.add(job.job_id)
+
+    async def notify():
+        try:
+            result = await job.wait()
+            if result.get("cancelled"):
+                await message.answer(f"🚫 İş #{job.job_id} iptal edildi.")
+            else:
+                await on_result(message, result)
+        except Exception as e:
+            logger.error(f"İş sonucu gönderilemedi #{job.job_id}: {e}")
+        finally:
+            _tracked.discard(job.job_id)
+
+    task = asyncio.create_task(notify())
+    _notify_tasks.add(task)
+    task.add_done_callback(_notify_tasks.discard)
+
+
+def submitted_text(job: Job) -> str:
+    """İş kuyruğa alındığında kullanıcıya gönderilen mesaj"""
+    position = job_scheduler.position(job)
+    state = f"sıraya alındı ({position}. sırada)" if position else "başlatıldı"
+    return (
+        f"🆔 İş #{job.job_id} {state}.\n"
+        f"Rapor hazır olunca gönderilecek. Durum için: /job {job.job_id}"
+    )
+
+
+def _duration(seconds: float) -> str:
+    return f"{seconds:.1f} sn" if seconds < 120 else f"{seconds / 60:.1f} dk"
+
+
+def format_job(job: Job) -> str:
+    """İşin detaylı durum metni (HTML)"""
+    now = time.time()
+    status = job.status
+    lines = [f"🆔 <b>İş #{job.job_id}</b> — {html.escape(job.name)}"]
+
+    state = STATUS_LABELS.get(status, status)
+    progress = job.progress
+    if status in ("running", "cancelling"):
+        state += f" ({html.escape(progress.stage)}"
+        if progress.percent is not None:
+            state += f" %{progress.percent:.0f}: {progress.done}/{progress.total}"
+        state += ")"
+    lines.append(f"Durum: {state}")
+
+    if status == "queued":
+        lines.append(f"Sıra: {job_scheduler.position(job)}. ({'hızlı şerit' if job.fast else 'normal'})")
+
+    waited = (job.started_at or now) - job.created_at
+    timing = f"Bekleme: {_duration(waited)}"
+    if job.started_at:
+        timing += f" | Çalışma: {_duration((job.finished_at or now) - job.started_at)}"
+    lines.append(timing)
+
+    if progress.timings:
+        stages = ", ".join(f"{html.escape(name)} {_duration(seconds)}" for name, seconds in progress.timings.items())
+        lines.append(f"Aşamalar: {stages}")
+
+    result = job.result
+    if result:
+        if "total_rows" in result:
+            lines.append(f"Satır: {result['total_rows']}")
+        email_results = result.get("email_results")
+        if email_results is not None:
+            sent = sum(1 for r in email_results if r.get("success"))
+            lines.append(f"Mail: ✅ {sent} / ❌ {len(email_results) - sent}")
+        if result.get("error") and not result.get("cancelled"):
+            lines.append(f"Hata: {html.escape(str(result['error']))}")
+
+    return "\n".join(lines)
+
+
+@router.message(Command("job"))
+async def cmd_job(message: Message, command: CommandObject):
+    """İş durumunu gösterir (/job <id>) veya son işleri listeler (/job)"""
+    user_id = message.from_user.id
+
+    if not command.args:
+        jobs = job_scheduler.jobs_for_user(user_id)
+        if not jobs:
+            await message.answer("ℹ️ Kayıtlı işiniz yok.")
+            return
+        lines = [
+            f"#{job.job_id} {STATUS_LABELS.get(job.status, job.status)} — {html.escape(job.name)}"
+            for job in jobs
+        ]
+        await message.answer("📋 <b>Son İşleriniz</b>\n\n" + "\n".join(lines) + "\n\nDetay: /job &lt;id&gt;")
+        return
+
+    job = job_scheduler.get(command.args.strip())
+    if job is None or (job.user_id != user_id and not is_admin(user_id)):
+        await message.answer("❌ İş bulunamadı.")
+        return
+
+    await message.answer(format_job(job))
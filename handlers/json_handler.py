@@ -6,15 +6,14 @@
 """
 import os
 import tempfile
-import logging
 from aiogram import F, Router
 from aiogram.types import Message, BufferedInputFile
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from utils.json_processing import process_excel_to_json
+from utils.logger import logger
 
-logger = logging.getLogger(__name__)
 router = Router()
 
 class JsonProcessingState(StatesGroup):
@@ -61,7 +60,7 @@ async def handle_excel_file(message: Message, state: FSMContext):
             
             # JSON dosyasını gönder
             input_file = BufferedInputFile(json_data, filename="groups.json")
-            await message.answer_document(input_file, caption="✅ Grup verileri başarıyla oluşturuldu!")
+            await message.answer_document(input_file, caption="✅ Grup verileri başarıyla oluşturuldu ve devreye alındı!")
             
             # Geçici dosyayı sil
             os.unlink(temp_file_path)
@@ -72,7 +71,7 @@ async def handle_excel_file(message: Message, state: FSMContext):
                 os.unlink(temp_file_path)
 
     except Exception as e:
-        logger.error(f"JSON işleme hatası: {str(e)}", exc_info=True)
+        logger.opt(exception=e).error("JSON işleme hatası: {}", e)
         await message.answer(f"❌ Hata oluştu: {str(e)}")
         
         # Hata durumunda geçici dosyayı temizle
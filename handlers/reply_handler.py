@@ -15,6 +15,8 @@ from aiogram.types import Message, ReplyKeyboardMarkup, KeyboardButton
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 
+from jobs.scheduler import job_scheduler
+
 logger = logging.getLogger(__name__)
 router = Router()
 
@@ -97,10 +99,11 @@ async def handle_clear(message: Message, state: FSMContext) -> None:
 # İptal butonu handler'ı ekleyin
 @router.message(lambda m: m.text and m.text == "iptal")
 async def handle_cancel_button(message: Message, state: FSMContext):
-    """Reply keyboard'dan iptal işlemi"""
+    """Reply keyboard'dan iptal işlemi (kuyruktaki ve çalışan işler dahil)"""
+    cancelled_jobs = job_scheduler.cancel_user(message.from_user.id)
     current_state = await state.get_state()
     
-    if current_state is None:
+    if current_state is None and not cancelled_jobs:
         await message.answer("ℹ️ İptal edilecek aktif işlem yok.")
         return
     
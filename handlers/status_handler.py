@@ -1,12 +1,14 @@
 # handlers/status_handler.py
 from aiogram import Router
 from aiogram.types import Message
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from datetime import datetime, timedelta
-import aiofiles
+import asyncio
+import html
 from config import config
 from utils.logger import logger
 from utils.file_utils import get_recent_processed_files, get_file_stats
+from utils.log_reader import GREP_MAX_PATTERN, grep_lines, tail_lines
 
 router = Router()
 
@@ -56,22 +58,39 @@ async def cmd_files(message: Message):
         await message.answer("❌ Dosya listesi alınamadı.")
 
 @router.message(Command("logs"))
-async def cmd_logs(message: Message):
+async def cmd_logs(message: Message, command: CommandObject):
+    """/logs → son 20 satır, /logs grep <metin> → metni içeren son satırlar (sadece admin)"""
+    if message.from_user.id not in config.ADMIN_CHAT_IDS:
+        await message.answer("❌ Bu komutu kullanma yetkiniz yok.")
+        return
     try:
         log_path = config.LOGS_DIR / "bot.log"
         if not log_path.exists():
             await message.answer("📝 Log dosyası bulunamadı.")
             return
 
-        async with aiofiles.open(log_path, 'r', encoding='utf-8') as f:
-            lines = await f.readlines()
-            last_lines = lines[-20:] if len(lines) > 20 else lines
+        args = (command.args or "").strip()
+        if args.split(maxsplit=1)[0:1] == ["grep"]:
+            pattern = args[4:].strip()[:GREP_MAX_PATTERN]
+            if not pattern:
+                await message.answer("❌ Kullanım: /logs grep <metin>")
+                return
+            # Dosya satır satır taranır (thread'de), sadece son eşleşmeler tutulur
+            found = await asyncio.to_thread(grep_lines, log_path, pattern, 30)
+            if not found["matches"]:
+                await message.answer(f"🔍 Eşleşme yok ({found['scanned']} satır tarandı).")
+                return
+            log_content = "".join(found["matches"])
+            title = f"🔍 {html.escape(pattern)}: {found['total']} eşleşme (son {len(found['matches'])})"
+        else:
+            last_lines = await asyncio.to_thread(tail_lines, log_path, 20)
+            log_content = "".join(last_lines)
+            title = "Son Loglar:"
 
-        log_content = "".join(last_lines)
         if len(log_content) > 4000:
             log_content = log_content[-4000:]
 
-        await message.answer(f"<b>Son Loglar:</b>\n<pre>{log_content}</pre>", parse_mode="HTML")
+        await message.answer(f"<b>{title}</b>\n<pre>{html.escape(log_content)}</pre>", parse_mode="HTML")
     except Exception as e:
         logger.error(f"Logs komutu hatası: {e}")
         await message.answer("❌ Loglar alınamadı.")
@@ -31,24 +31,26 @@ handlers/reply_handler.py dosyasına TEK butonu ekle
 # TEK butonu handler'ı ekle
 
 """
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from aiogram import Router, F
-from aiogram.types import Message, BufferedInputFile
+from aiogram.types import Message
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
 from config import config
-from utils.excel_cleaner import clean_excel_headers
-from utils.excel_splitter import split_excel_by_groups
+from utils.cancellation import CancellationToken
 from utils.validator import validate_excel_file
-from utils.mailer import send_email_with_attachment
+from utils.disk_usage import disk_usage
+from utils.file_utils import job_input_path, remove_job_input
 from utils.reporter import generate_processing_report
+from utils.document_delivery import send_documents
 from utils.logger import logger
+from jobs.process_excel import run_pipeline
+from jobs.scheduler import job_scheduler, make_job_func
+from handlers.job_handler import submitted_text, track_job
 
-import tempfile
-import asyncio
 from pathlib import Path
 
 router = Router()
@@ -80,45 +82,47 @@ async def handle_tek_excel_upload(message: Message, state: FSMContext):
             await state.clear()
             return
         
+        # Telegram aynı update'i tekrar gönderirse dosya yeniden indirilmez, mevcut iş döner
+        dedupe_key = f"{message.chat.id}:{message.message_id}"
+        existing = job_scheduler.get_by_key(dedupe_key)
+        if existing:
+            await message.answer(submitted_text(existing))
+            return
+        
         # Dosyayı indir
         bot = message.bot
         file = await bot.get_file(file_id)
-        file_path = config.INPUT_DIR / file_name
         
+        # Dizin kotası (artımlı kayıttan, tarama yapmadan)
+        if disk_usage.over_quota(config.INPUT_DIR, file.file_size or 0) or disk_usage.over_quota(config.OUTPUT_DIR):
+            await message.answer("❌ Depolama alanı dolu, lütfen daha sonra tekrar deneyin.")
+            await state.clear()
+            return
+        
+        # İşe özel dizin: aynı isimli başka yükleme kuyruktaki işin girdisini ezmez
+        file_path = job_input_path(file_name)
         await bot.download_file(file.file_path, file_path)
+        disk_usage.added(file_path)
         
         # Doğrulama
         validation_result = validate_excel_file(str(file_path))
         if not validation_result["valid"]:
             await message.answer(f"❌ {validation_result['message']}")
             await state.clear()
-            file_path.unlink()
+            remove_job_input(file_path)
             return
         
-        await message.answer("⏳ TEK işlem başlatıldı...")
-        
-        # TEK işlemini gerçekleştir
-        task_result = await process_tek_task(file_path, message.from_user.id)
-        
-        if task_result["success"]:
-            # Rapor oluştur
-            report = generate_tek_report(task_result)
-            await message.answer(report)
-            
-            # Dosyaları kullanıcıya da gönder (opsiyonel)
-            for file_info in task_result["output_files"].values():
-                try:
-                    await message.answer_document(
-                        BufferedInputFile(
-                            file_info["path"].read_bytes(),
-                            filename=file_info["filename"]
-                        ),
-                        caption=f"📁 {file_info['filename']}"
-                    )
-                except Exception as e:
-                    logger.warning(f"Dosya gönderilemedi {file_info['filename']}: {e}")
-        else:
-            await message.answer(f"❌ İşlem sırasında hata oluştu: {task_result['error']}")
+        # TEK işlemini zamanlayıcı üzerinden gerçekleştir; rapor ve dosyalar iş bitince gönderilir
+        user_id = message.from_user.id
+        job = job_scheduler.submit(
+            user_id, file_name, make_job_func("tek", process_tek_task, file_path, user_id),
+            size=file_path.stat().st_size,
+            dedupe_key=dedupe_key,
+            input_path=file_path,
+            mode="tek",
+        )
+        await message.answer(submitted_text(job))
+        track_job(message, job, send_tek_result)
         
     except Exception as e:
         logger.error(f"TEK işleme hatası: {e}")
@@ -126,98 +130,34 @@ async def handle_tek_excel_upload(message: Message, state: FSMContext):
     finally:
         await state.clear()
 
+async def send_tek_result(message: Message, task_result: Dict[str, Any]):
+    """İş bitince TEK raporunu ve çıktı dosyalarını gönderir"""
+    if not task_result["success"]:
+        await message.answer(f"❌ İşlem sırasında hata oluştu: {task_result.get('error', 'Bilinmeyen hata')}")
+        return
+
+    # Rapor oluştur
+    report = generate_tek_report(task_result)
+    await message.answer(report)
+
+    # Dosyaları kullanıcıya da gönder (diskten, 10'arlı gruplar veya tek zip)
+    await send_documents(
+        message.bot, message.chat.id,
+        list(task_result["output_files"].values()),
+        zip_name="tek_islem.zip"
+    )
+
 @router.message(TekProcessingStates.waiting_for_file)
 async def handle_tek_wrong_file_type(message: Message):
     await message.answer("❌ Lütfen bir Excel dosyası gönderin.")
 
-async def process_tek_task(input_path: Path, user_id: int) -> Dict[str, Any]:
-    """TEK işlemi için özel görev"""
-    cleaning_result = None
-    try:
-        logger.info(f"TEK işlemi başlatıldı: {input_path.name}, Kullanıcı: {user_id}")
-
-        # 1. Excel dosyasını temizle
-        cleaning_result = clean_excel_headers(str(input_path))
-        if not cleaning_result["success"]:
-            return {"success": False, "error": cleaning_result.get("error", "Temizleme hatası")}
-        
-        # 2. Dosyayı gruplara ayır (normal işlem gibi)
-        splitting_result = split_excel_by_groups(
-            cleaning_result["temp_path"],
-            cleaning_result["headers"]
-        )
-        
-        if not splitting_result["success"]:
-            return {"success": False, "error": splitting_result.get("error", "Ayırma hatası")}
-        
-        # 3. Tüm çıktı dosyalarını TEK maile gönder
-        email_success = False
-        output_files = splitting_result["output_files"]
-        
-        if output_files and config.PERSONAL_EMAIL:
-            # Tüm dosyaları tek mailde gönder
-            email_success = await send_multiple_files_email(output_files)
-        
-        return {
-            "success": email_success,
-            "output_files": output_files,
-            "total_rows": splitting_result["total_rows"],
-            "matched_rows": splitting_result["matched_rows"],
-            "user_id": user_id,
-            "personal_email": config.PERSONAL_EMAIL
-        }
-        
-    except Exception as e:
-        logger.error(f"TEK işlem hatası: {e}")
-        return {"success": False, "error": str(e)}
-    finally:
-        # Geçici dosyaları temizle
-        try:
-            if cleaning_result and "temp_path" in cleaning_result:
-                Path(cleaning_result["temp_path"]).unlink(missing_ok=True)
-        except:
-            pass
-
-async def send_multiple_files_email(output_files: Dict[str, Any]) -> bool:
-    """Birden fazla dosyayı tek mailde gönderir"""
-    if not config.PERSONAL_EMAIL:
-        logger.error("PERSONAL_EMAIL tanımlı değil")
-        return False
-    
-    try:
-        # Tüm dosyaları zip yap
-        import zipfile
-        import tempfile
-        
-        zip_path = Path(tempfile.gettempdir()) / "tek_islem_output.zip"
-        
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for file_info in output_files.values():
-                zipf.write(file_info["path"], file_info["filename"])
-        
-        # Mail gönder
-        subject = "📊 TEK İŞLEM - Grup Raporları"
-        body = (
-            f"TEK işlem sonucu oluşturulan {len(output_files)} dosya ektedir.\n\n"
-            f"Toplam satır: {sum(f['row_count'] for f in output_files.values())}\n"
-            f"Oluşan gruplar: {', '.join(f['filename'] for f in output_files.values())}"
-        )
-        
-        success = await send_email_with_attachment(
-            [config.PERSONAL_EMAIL],
-            subject,
-            body,
-            zip_path
-        )
-        
-        # Zip dosyasını sil
-        zip_path.unlink(missing_ok=True)
-        
-        return success
-        
-    except Exception as e:
-        logger.error(f"Çoklu dosya mail gönderme hatası: {e}")
-        return False
+async def process_tek_task(
+    input_path: Path,
+    user_id: int,
+    cancel_token: Optional[CancellationToken] = None
+) -> Dict[str, Any]:
+    """TEK işlemi: gruplara ayırır, tüm dosyaları tek zip olarak kişisel maile gönderir"""
+    return await run_pipeline(input_path, user_id, ["tek"], cancel_token)
 
 def generate_tek_report(result: Dict) -> str:
     """TEK işlem raporu oluşturur"""
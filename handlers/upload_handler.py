@@ -1,18 +1,21 @@
 from aiogram import Router, F
 from aiogram.types import Message, BufferedInputFile
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 
 from config import config
-from utils.excel_cleaner import clean_excel_headers
-from utils.excel_splitter import split_excel_by_groups
 from utils.validator import validate_excel_file
+from utils.disk_usage import disk_usage
+from utils.file_utils import job_input_path, remove_job_input
 #from utils.reporter import generate_processing_report
 from utils.reporter import generate_processing_report, generate_personal_email_report
 from utils.file_namer import generate_output_filename
 #from jobs.process_excel import process_excel_task
-from jobs.process_excel import process_excel_task, process_excel_task_for_personal_email
+from jobs.process_excel import process_excel_task, process_excel_task_for_personal_email, run_pipeline
+from jobs.scheduler import job_scheduler, make_job_func
+from handlers.job_handler import submitted_text, track_job
+from handlers.tek_handler import send_tek_result
 
 from utils.logger import logger
 
@@ -30,8 +33,14 @@ async def cmd_start(message: Message):
     )
 
 @router.message(Command("process"))
-async def cmd_process(message: Message, state: FSMContext):
+async def cmd_process(message: Message, state: FSMContext, command: CommandObject):
+    """
+    Grup işlemi için dosya bekler. Ek modlar aynı okumada birlikte çalışır:
+    /process bana → ayrıca tüm veri kişisel maile, /process tek → ayrıca grup dosyaları zip olarak kişisel maile
+    """
+    extra = [word for word in (command.args or "").lower().split() if word in ("bana", "tek")]
     await state.set_state(ProcessingStates.waiting_for_file)
+    await state.update_data(modes=["process"] + extra)
     await message.answer("Lütfen işlemek istediğiniz Excel dosyasını gönderin.")
 
 ##BA1
@@ -39,6 +48,8 @@ async def cmd_process(message: Message, state: FSMContext):
 async def cmd_bana(message: Message, state: FSMContext):
     """Sadece kişisel maile gönderim için dosya bekler"""
     await state.set_state(ProcessingStates.waiting_for_file)
+    # Doküman mesajında komut metni olmaz → mod FSM verisinde taşınır
+    await state.update_data(modes=["bana"])
     await message.answer(
         "📊 Excel dosyasını gönderin.\n\n"
         "ℹ️ iptal için ❌ İptal tıklayın."
@@ -52,6 +63,7 @@ async def handle_cancel_command(message: Message, state: FSMContext):
     cancel_commands = ["/cancel", "/iptal", "/stop", "iptal", "cancel", "dur"]
     
     if message.text.strip().lower() in [cmd.lower() for cmd in cancel_commands]:
+        job_scheduler.cancel_user(message.from_user.id)
         await state.clear()
         await message.answer(
             "❌ İşlem iptal edildi.\n"
@@ -63,9 +75,27 @@ async def handle_cancel_command(message: Message, state: FSMContext):
 
 
 
+async def _send_upload_report(message: Message, task_result: dict):
+    """İş bitince her mod için rapor (veya hata mesajını) gönderir"""
+    if not task_result.get("modes"):
+        await message.answer(f"❌ İşlem sırasında hata oluştu: {task_result.get('error', 'Bilinmeyen hata')}")
+        return
+    
+    for mode, part in task_result["modes"].items():
+        mode_result = {**task_result, **part}
+        if mode == "tek":
+            await send_tek_result(message, mode_result)
+        elif mode == "bana":
+            await message.answer(generate_personal_email_report(mode_result))
+        else:
+            await message.answer(generate_processing_report(mode_result))
+
+
 @router.message(ProcessingStates.waiting_for_file, F.document)
 async def handle_excel_upload(message: Message, state: FSMContext):
     try:
+        # Doküman mesajında komut metni olmaz → modlar FSM verisinde taşınır
+        modes = (await state.get_data()).get("modes") or ["process"]
         file_id = message.document.file_id
         file_name = message.document.file_name
         
@@ -74,43 +104,60 @@ async def handle_excel_upload(message: Message, state: FSMContext):
             await state.clear()
             return
         
+        # Telegram aynı update'i tekrar gönderirse dosya yeniden indirilmez, mevcut iş döner
+        dedupe_key = f"{message.chat.id}:{message.message_id}"
+        existing = job_scheduler.get_by_key(dedupe_key)
+        if existing:
+            await message.answer(submitted_text(existing))
+            return
+        
         # Dosyayı indir
         bot = message.bot
         file = await bot.get_file(file_id)
-        file_path = config.INPUT_DIR / file_name
         
+        # Dizin kotası (artımlı kayıttan, tarama yapmadan)
+        if disk_usage.over_quota(config.INPUT_DIR, file.file_size or 0) or disk_usage.over_quota(config.OUTPUT_DIR):
+            await message.answer("❌ Depolama alanı dolu, lütfen daha sonra tekrar deneyin.")
+            await state.clear()
+            return
+        
+        # İşe özel dizin: aynı isimli başka yükleme kuyruktaki işin girdisini ezmez
+        file_path = job_input_path(file_name)
         await bot.download_file(file.file_path, file_path)
+        disk_usage.added(file_path)
         
         # Doğrulama
         validation_result = validate_excel_file(file_path)
         if not validation_result["valid"]:
             await message.answer(f"❌ {validation_result['message']}")
             await state.clear()
-            file_path.unlink()  # Geçici dosyayı sil
+            remove_job_input(file_path)  # Geçici dosyayı sil
             return
         
-        await message.answer("⏳ Dosya işleniyor, lütfen bekleyin...")
-        
         # Komuta göre farklı işlem yap
-        if message.text and message.text.startswith('/bana'):
+        user_id = message.from_user.id
+        if modes == ["bana"]:
             # /bana komutu için kişisel mail gönderimi
-            task_result = await process_excel_task_for_personal_email(file_path, message.from_user.id)
-        else:
+            job_func = make_job_func("personal_email", process_excel_task_for_personal_email, file_path, user_id)
+        elif modes == ["process"]:
             # /process komutu için normal grup işlemi
-            task_result = await process_excel_task(file_path, message.from_user.id)
-        
-        if task_result["success"]:
-            # Rapor oluştur
-            if message.text and message.text.startswith('/bana'):
-                report = generate_personal_email_report(task_result)
-            else:
-                report = generate_processing_report(task_result)
-            
-            # Kullanıcıya rapor gönder
-            await message.answer(report)
-            
+            job_func = make_job_func("process_excel", process_excel_task, file_path, user_id)
         else:
-            await message.answer(f"❌ İşlem sırasında hata oluştu: {task_result['error']}")
+            # Birden fazla mod: dosya bir kez okunur, tüm çıkışlar birlikte üretilir
+            job_func = make_job_func("pipeline", run_pipeline, file_path, user_id, modes)
+        
+        # Zamanlayıcıya ver: eşzamanlılık sınırı, kullanıcılar arası sıra ve iptal orada yönetilir.
+        # Handler beklemez; iş numarası hemen döner, rapor iş bitince gönderilir.
+        # dedupe_key: Telegram aynı update'i tekrar gönderirse ikinci iş açılmaz
+        job = job_scheduler.submit(
+            user_id, file_name, job_func,
+            size=file_path.stat().st_size,
+            dedupe_key=dedupe_key,
+            input_path=file_path,
+            mode="+".join(modes),
+        )
+        await message.answer(submitted_text(job))
+        track_job(message, job, _send_upload_report)
         
     except Exception as e:
         logger.error(f"Dosya işleme hatası: {e}")
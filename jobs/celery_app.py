@@ -0,0 +1,39 @@
+# Celery Uygulaması (jobs/celery_app.py)
+"""
+JOB_BACKEND=celery iken Excel işlerini ayrı worker'larda çalıştırır.
+Worker: celery -A jobs.celery_app worker --loglevel=info --concurrency=2
+CELERY_EAGER=true → broker/sonuç deposu bellekte, görevler bot sürecinde çalışır (test / geliştirme).
+Her worker süreci kendi mail dispatcher'ını kurar; sağlayıcı hız limitleri, günlük hesap limitleri ve
+bekleme süreleri MAIL_LIMITER_BACKEND=redis (Celery modunda varsayılan) ile tüm worker'larda ortaktır.
+Testler: python -m pytest tests (eager mod, mail gönderilmez).
+"""
+from celery import Celery
+from celery.signals import setup_logging
+
+from config import config
+
+if config.CELERY_EAGER:
+    broker_url, result_backend = "memory://", "cache+memory://"
+else:
+    broker_url = config.CELERY_BROKER_URL or config.REDIS_URL
+    result_backend = config.CELERY_RESULT_BACKEND or config.REDIS_URL
+
+celery_app = Celery("kova", broker=broker_url, backend=result_backend, include=["jobs.celery_tasks"])
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    task_always_eager=config.CELERY_EAGER,
+    task_track_started=True,
+    task_acks_late=True,            # Worker çökerse görev başka worker'a geçer
+    worker_prefetch_multiplier=1,   # Uzun işler tek tek alınır
+    result_expires=24 * 3600,
+    timezone="Europe/Istanbul",
+)
+
+
+@setup_logging.connect
+def _setup_worker_logging(**kwargs):
+    """Worker logları da loguru üzerinden data/logs altına yazılsın"""
+    from utils.logger import setup_logger
+    setup_logger()
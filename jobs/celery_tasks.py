@@ -0,0 +1,198 @@
+# Celery Görevleri (jobs/celery_tasks.py)
+"""
+Excel işlerinin Celery görevleri (JOB_BACKEND=celery):
+- Bot dosyayı paylaşılan dizine (SHARED_STORAGE_DIR) indirir ve görevi kuyruğa verir
+- Worker işi çalıştırır; aşama / ilerleme PROGRESS durumu olarak sonuç deposuna yazılır
+- Bot sonucu CELERY_POLL_INTERVAL aralığıyla sorgular, raporu kendisi gönderir
+- İptal: görev revoke(terminate=True) ile durdurulur
+Yollar paylaşılan dizine göre göreli taşınır (sunucularda bağlama noktası farklı olabilir).
+"""
+import asyncio
+import contextlib
+import contextvars
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from celery import states
+
+from config import config
+from jobs.celery_app import celery_app
+from jobs.process_excel import process_excel_task, process_excel_task_for_personal_email, run_pipeline
+from jobs.scheduler import CANCELLED_RESULT
+from utils.cancellation import CancellationToken
+from utils.job_progress import JobProgress, current_progress
+from utils.logger import logger
+
+PROGRESS_PUSH_INTERVAL = 1.0  # Worker ilerlemeyi en fazla saniyede bir yazar
+
+_local = threading.local()
+# Eager modda görevler tek thread'de çalışır (worker sürecindeki gibi tek event loop)
+_eager_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="celery-eager")
+_eager_tokens: Dict[str, CancellationToken] = {}
+
+
+def to_storage_path(path: Any) -> str:
+    """Paylaşılan dizin altındaki yolu göreli hale getirir"""
+    path = Path(path)
+    try:
+        return str(path.relative_to(config.STORAGE_DIR))
+    except ValueError:
+        return str(path)
+
+
+def from_storage_path(value: str) -> Path:
+    return config.STORAGE_DIR / value  # Mutlak yol ise olduğu gibi kalır
+
+
+def to_jsonable(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Görev sonucunu JSON'a çevrilebilir hale getirir (Path → göreli yol)"""
+    return json.loads(json.dumps(result, default=lambda v: to_storage_path(v) if isinstance(v, Path) else str(v)))
+
+
+def restore_paths(value: Any) -> Any:
+    """Sonuçtaki 'path' alanlarını tekrar Path yapar"""
+    if isinstance(value, dict):
+        return {
+            key: from_storage_path(item) if key == "path" and isinstance(item, str) else restore_paths(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [restore_paths(item) for item in value]
+    return value
+
+
+def _run_async(coro):
+    """Thread'e ait kalıcı event loop'ta çalıştırır (global limitleyiciler tek loop'a bağlı kalır)"""
+    loop = getattr(_local, "loop", None)
+    if loop is None:
+        loop = _local.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(coro)
+
+
+class RemoteProgress(JobProgress):
+    """İlerlemeyi Celery PROGRESS durumu olarak yayınlar (aşama değişiminde hemen, sonra en fazla saniyede bir)"""
+
+    def __init__(self, task):
+        super().__init__()
+        self._task = task
+        self._pushed = 0.0
+
+    def _push(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._pushed < PROGRESS_PUSH_INTERVAL:
+            return
+        self._pushed = now
+        self._task.update_state(state="PROGRESS", meta={
+            "stage": self.stage, "done": self.done, "total": self.total, "timings": self.timings,
+        })
+
+    def set_stage(self, stage: str):
+        super().set_stage(stage)
+        self._push(force=True)
+
+    def update(self, done: int, total: Optional[int] = None):
+        super().update(done, total)
+        self._push()
+
+
+def _execute(task, func, input_path: str, user_id: int, *args: Any) -> Dict[str, Any]:
+    if task.request.is_eager:
+        # Bot sürecinde: iptal belirteci ve ilerleme (context kopyası) doğrudan kullanılır
+        # (log kayıtlarının job_id / user_id alanları da context kopyasından gelir)
+        token = _eager_tokens.pop(task.request.id, None)
+        log_context = contextlib.nullcontext()
+    else:
+        token = None
+        current_progress.set(RemoteProgress(task))
+        # Worker'da iş kimliği Celery görev kimliğidir (bot "Görev Celery'ye verildi" satırında eşler)
+        log_context = logger.contextualize(job_id=task.request.id, user_id=user_id)
+    with log_context:
+        result = _run_async(func(from_storage_path(input_path), user_id, *args, token))
+    return to_jsonable(result)
+
+
+@celery_app.task(bind=True, name="kova.process_excel")
+def process_excel(self, input_path: str, user_id: int) -> Dict[str, Any]:
+    return _execute(self, process_excel_task, input_path, user_id)
+
+
+@celery_app.task(bind=True, name="kova.personal_email")
+def personal_email(self, input_path: str, user_id: int) -> Dict[str, Any]:
+    return _execute(self, process_excel_task_for_personal_email, input_path, user_id)
+
+
+@celery_app.task(bind=True, name="kova.tek")
+def tek(self, input_path: str, user_id: int) -> Dict[str, Any]:
+    # handlers.tek_handler zamanlayıcı üzerinden bu modülü kullanır → döngüsel import olmasın
+    from handlers.tek_handler import process_tek_task
+    return _execute(self, process_tek_task, input_path, user_id)
+
+
+@celery_app.task(bind=True, name="kova.pipeline")
+def pipeline(self, input_path: str, user_id: int, modes: List[str]) -> Dict[str, Any]:
+    return _execute(self, run_pipeline, input_path, user_id, modes)
+
+
+REMOTE_TASKS = {
+    "process_excel": process_excel,
+    "personal_email": personal_email,
+    "tek": tek,
+    "pipeline": pipeline,
+}
+
+
+def _apply_progress(progress: JobProgress, info: Dict[str, Any]):
+    """Worker'dan gelen ilerlemeyi yerel iş kaydına aktarır"""
+    if info.get("stage") and info["stage"] != progress.stage:
+        progress.set_stage(info["stage"])
+    progress.update(info.get("done", 0), info.get("total", 0))
+    progress.timings = dict(info.get("timings") or {})
+
+
+async def run_remote(
+    kind: str,
+    input_path: Path,
+    user_id: int,
+    cancel_token: CancellationToken,
+    *extra: Any
+) -> Dict[str, Any]:
+    """Görevi Celery'ye verir, bitene kadar ilerlemesini izler ve sonucunu döndürür"""
+    task = REMOTE_TASKS[kind]
+    args = (to_storage_path(input_path), user_id, *extra)
+
+    if celery_app.conf.task_always_eager:
+        task_id = str(uuid.uuid4())
+        _eager_tokens[task_id] = cancel_token
+        context = contextvars.copy_context()
+        try:
+            eager = await asyncio.get_running_loop().run_in_executor(
+                _eager_executor, context.run, lambda: task.apply(args=args, task_id=task_id)
+            )
+        finally:
+            _eager_tokens.pop(task_id, None)
+        return restore_paths(eager.get())
+
+    async_result = await asyncio.to_thread(task.apply_async, args=args)
+    logger.info(f"☁️ Görev Celery'ye verildi: {task.name} ({async_result.id})")
+    progress = current_progress.get()
+
+    while True:
+        if cancel_token.cancelled:
+            await asyncio.to_thread(async_result.revoke, terminate=True)
+            logger.info(f"☁️ Görev iptal edildi: {async_result.id}")
+            return {**CANCELLED_RESULT, "user_id": user_id}
+
+        meta = await asyncio.to_thread(async_result.backend.get_task_meta, async_result.id)
+        if meta["status"] in states.READY_STATES:
+            break
+        if meta["status"] == "PROGRESS" and progress is not None and isinstance(meta.get("result"), dict):
+            _apply_progress(progress, meta["result"])
+        await asyncio.sleep(config.CELERY_POLL_INTERVAL)
+
+    result = await asyncio.to_thread(async_result.get, propagate=True)
+    return restore_paths(result)
@@ -1,219 +1,399 @@
 # Excel İşleme Görevi (jobs/process_excel.py)
-
+"""
+Excel işlem hattının çıkışları ve görevleri:
+/process → grup dosyaları + grup mailleri, /bana → tek dosya kişisel maile,
+/tek → grup dosyaları zip olarak kişisel maile.
+Birden fazla mod tek okumada birlikte çalıştırılabilir (run_pipeline).
+"""
 import asyncio
+import os
+import shutil
+import zipfile
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List
-from openpyxl import load_workbook
+from typing import Dict, Any, List, Optional, Tuple
 import tempfile
 
-from utils.excel_cleaner import clean_excel_headers
-from utils.excel_splitter import split_excel_by_groups
-from utils.mailer import send_email_with_attachment
-from utils.group_manager import group_manager
+from utils.cancellation import CancellationToken, JobCancelled
+from utils.excel_pipeline import SheetWriter, Sink, parse_into_sinks
+from utils.mail_dispatcher import MailJob, mail_dispatcher
+from utils.attachment_packer import prepare_attachment_parts
+from utils.file_namer import generate_output_filename
+from utils.file_utils import job_output_dir
+from utils.group_manager import GroupIndex, group_manager
+from utils.job_progress import report_stage
 from utils.logger import logger
-import config  # config modülünü import etmeyi unutmayın
+from config import config
 
-async def process_excel_task(input_path: Path, user_id: int) -> Dict[str, Any]:
-    """Excel işleme görevini yürütür (geliştirilmiş)"""
-    cleaning_result = None
-    try:
-        logger.info(f"Excel işleme başlatıldı: {input_path.name}, Kullanıcı: {user_id}")
-
-        # 1. Excel dosyasını temizle ve düzenle
-        cleaning_result = clean_excel_headers(str(input_path))
-        if not cleaning_result["success"]:
-            error_msg = f"Excel temizleme hatası: {cleaning_result.get('error', 'Bilinmeyen hata')}"
-            logger.error(error_msg)
-            return {"success": False, "error": error_msg}
-        
-        logger.info(f"Excel temizlendi: {cleaning_result['row_count']} satır")
 
-        # 2. Dosyayı gruplara ayır
-        splitting_result = split_excel_by_groups(
-            cleaning_result["temp_path"],
-            cleaning_result["headers"]
-        )
+def _group_mail_jobs(recipient: str, entry: Dict[str, Any]) -> List[MailJob]:
+    """Tek bir grubun dosyası (veya numaralı parçaları) için mail işleri"""
+    group_id, group_info, file_info = entry["group_id"], entry["group_info"], entry["file_info"]
+    group_name = group_info.get('group_name', group_id)
+    subject = f"{group_name} Raporu - {file_info['filename']}"
+    body = (
+        f"Merhaba,\n\n"
+        f"{group_name} grubu için {file_info['row_count']} satırlık rapor ekte gönderilmiştir.\n\n"
+        f"İyi çalışmalar,\nExcel Bot"
+    )
+    
+    jobs = []
+    for part in entry["parts"]:
+        part_subject, part_body = subject, body
+        if part["parts"] > 1:
+            part_subject = f"{subject} ({part['part']}/{part['parts']})"
+            part_body = body + f"\n\nBölüm {part['part']}/{part['parts']}: satır {part['rows'][0]}-{part['rows'][1]}"
+        jobs.append(MailJob(
+            [recipient], part_subject, part_body, part["path"],
+            meta={"group_id": group_id, "recipient": recipient, "filename": part["filename"]}
+        ))
+    return jobs
+
+
+def _zip_attachments(paths: List[Path], zip_path: Path) -> Path:
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for path in paths:
+            zipf.write(path, path.name)
+    return zip_path
+
+
+async def _merged_mail_job(recipient: str, entries: List[Dict[str, Any]], work_dir: Path) -> Optional[MailJob]:
+    """
+    Birden fazla gruba kayıtlı alıcı için tek mail: tüm grup dosyaları ekte,
+    toplam boyut MAIL_MERGE_ZIP_THRESHOLD'u aşarsa tek zip olarak.
+    Zip de ek limitini aşarsa None döner (grup bazlı gönderime düşülür).
+    """
+    paths = [part["path"] for entry in entries for part in entry["parts"]]
+    total_size = sum(part["size"] for entry in entries for part in entry["parts"])
+    group_ids = [entry["group_id"] for entry in entries]
+    group_names = [entry["group_info"].get("group_name", entry["group_id"]) for entry in entries]
+    
+    attachments: Any = paths
+    if total_size > config.MAIL_MERGE_ZIP_THRESHOLD:
+        zip_name = f"Raporlar-{datetime.now().strftime('%m%d_%H%M')}-{len(group_ids)}grup.zip"
+        recipient_dir = work_dir / recipient.replace("@", "_at_")
+        recipient_dir.mkdir(parents=True, exist_ok=True)
+        zip_path = await asyncio.to_thread(_zip_attachments, paths, recipient_dir / zip_name)
+        if zip_path.stat().st_size > config.MAX_ATTACHMENT_BYTES:
+            logger.info(f"📦 {recipient} için birleşik zip ek limitini aşıyor, grup bazlı gönderilecek")
+            return None
+        attachments = zip_path
+    
+    lines = [
+        f"• {name}: {entry['file_info']['row_count']} satır"
+        for name, entry in zip(group_names, entries)
+    ]
+    subject = f"{len(entries)} Grup Raporu - {', '.join(group_names)}"
+    body = (
+        f"Merhaba,\n\n"
+        f"Sorumlu olduğunuz {len(entries)} grubun raporları ekte gönderilmiştir:\n"
+        + "\n".join(lines)
+        + "\n\nİyi çalışmalar,\nExcel Bot"
+    )
+    filename = attachments.name if isinstance(attachments, Path) else ", ".join(p.name for p in paths)
+    return MailJob(
+        [recipient], subject, body, attachments,
+        meta={"group_id": ", ".join(group_ids), "recipient": recipient, "filename": filename}
+    )
+
+
+async def send_group_emails(
+    output_files: Dict[str, Any],
+    group_lookup=None,
+    cancel_token: Optional[CancellationToken] = None
+) -> List[Dict[str, Any]]:
+    """
+    Grup dosyalarını dispatcher üzerinden gönderir.
+    Önce alıcı → dosyalar haritası kurulur; birden fazla gruba kayıtlı alıcılar
+    (MAIL_MERGE_RECIPIENTS açıksa) tüm dosyalarını tek mailde alır.
+    """
+    group_lookup = group_lookup or group_manager.index.group_info
+    recipient_entries: Dict[str, List[Dict[str, Any]]] = {}
+    recipient_names: Dict[str, str] = {}
+    unsendable: List[Dict[str, Any]] = []  # Eki hazırlanamayan grupların sonuçları
+    
+    for group_id, file_info in output_files.items():
+        group_info = group_lookup(group_id)
+        recipients = [r.strip() for r in group_info.get("email_recipients", []) if r.strip()]  # Boş adresleri atla
         
-        if not splitting_result["success"]:
-            error_msg = f"Excel ayırma hatası: {splitting_result.get('error', 'Bilinmeyen hata')}"
-            logger.error(error_msg)
-            return {"success": False, "error": error_msg}
+        if not recipients or file_info["row_count"] <= 0:
+            continue
         
-        logger.info(f"Excel gruplara ayrıldı: {splitting_result['total_rows']} satır, {len(splitting_result['output_files'])} grup")
-
-        # 3. E-postaları gönder (async olarak)
-        email_tasks = []
-        output_files = splitting_result["output_files"]
-        email_results = []
+        # Ek limitini aşan dosyalar zip'lenir veya numaralı parçalara bölünür
+        parts = await asyncio.to_thread(prepare_attachment_parts, file_info)
+        if not parts:
+            unsendable.extend(
+                {"group_id": group_id, "recipient": recipient, "filename": file_info["filename"],
+                 "success": False, "error": "Ek hazırlanamadı: dosyada veri satırı yok"}
+                for recipient in recipients
+            )
+            continue
+        if parts[0]["kind"] != "original":
+            file_info["parts"] = [
+                {"filename": part["filename"], "rows": part["rows"], "size": part["size"], "kind": part["kind"]}
+                for part in parts
+            ]
         
-        for group_id, file_info in output_files.items():
-            group_info = group_manager.get_group_info(group_id)
-            recipients = group_info.get("email_recipients", [])
-            
-            if recipients and file_info["row_count"] > 0:
-                subject = f"{group_info.get('group_name', group_id)} Raporu - {file_info['filename']}"
-                body = (
-                    f"Merhaba,\n\n"
-                    f"{group_info.get('group_name', group_id)} grubu için {file_info['row_count']} satırlık rapor ekte gönderilmiştir.\n\n"
-                    f"İyi çalışmalar,\nExcel Bot"
-                )
-                
-                # Her alıcı için ayrı mail gönderimi
-                for recipient in recipients:
-                    if recipient.strip():  # Boş email adreslerini atla
-                        task = send_email_with_attachment(
-                            [recipient.strip()], subject, body, file_info["path"]
-                        )
-                        email_tasks.append((task, group_id, recipient, file_info["path"].name))
+        entry = {"group_id": group_id, "group_info": group_info, "file_info": file_info, "parts": parts}
+        for recipient in recipients:
+            key = recipient.lower()
+            recipient_names.setdefault(key, recipient)
+            # Aynı grupta aynı adres iki kez yazılmışsa tek sefer
+            if entry not in recipient_entries.setdefault(key, []):
+                recipient_entries[key].append(entry)
+    
+    jobs = []
+    work_dir = Path(tempfile.mkdtemp(prefix="mail_merge_"))
+    try:
+        for key, entries in recipient_entries.items():
+            recipient = recipient_names[key]
+            merged = None
+            if config.MAIL_MERGE_RECIPIENTS and len(entries) > 1:
+                merged = await _merged_mail_job(recipient, entries, work_dir)
+            if merged:
+                jobs.append(merged)
+            else:
+                for entry in entries:
+                    jobs.extend(_group_mail_jobs(recipient, entry))
         
-        # Tüm mail görevlerini paralel çalıştır
-        if email_tasks:
-            logger.info(f"{len(email_tasks)} mail görevi başlatılıyor...")
-            
-            # Görevleri topla ve çalıştır
-            tasks = [task[0] for task in email_tasks]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Sonuçları işle
-            for i, result in enumerate(results):
-                task_info = email_tasks[i]
-                group_id, recipient, filename = task_info[1], task_info[2], task_info[3]
-                
-                if isinstance(result, Exception):
-                    logger.error(f"Mail gönderim hatası - Grup: {group_id}, Alıcı: {recipient}, Dosya: {filename}, Hata: {result}")
-                    email_results.append({
-                        "success": False,
-                        "group_id": group_id,
-                        "recipient": recipient,
-                        "error": str(result)
-                    })
-                else:
-                    logger.info(f"Mail gönderildi - Grup: {group_id}, Alıcı: {recipient}, Dosya: {filename}")
-                    email_results.append({
-                        "success": True,
-                        "group_id": group_id,
-                        "recipient": recipient
-                    })
-            
-            # Grup bazında email durumunu güncelle
-            successful_emails = sum(1 for res in email_results if res["success"])
-            logger.info(f"Mail gönderim sonucu: {successful_emails} başarılı, {len(email_results) - successful_emails} başarısız")
+        if not jobs:
+            return unsendable
         
-        # 4. Geçici dosyaları temizle
-        try:
-            if cleaning_result and "temp_path" in cleaning_result:
-                temp_path = Path(cleaning_result["temp_path"])
-                if temp_path.exists():
-                    temp_path.unlink()
-                    logger.info(f"Geçici dosya silindi: {temp_path.name}")
-        except Exception as e:
-            logger.warning(f"Geçici dosya silinemedi: {e}")
+        merged_count = sum(1 for entries in recipient_entries.values() if len(entries) > 1)
+        if merged_count:
+            logger.info(f"📬 {merged_count} alıcının birden fazla grubu tek mailde birleştirildi")
+        
+        email_results = await mail_dispatcher.dispatch(jobs, cancel_token) + unsendable
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    
+    successful_emails = sum(1 for res in email_results if res["success"])
+    logger.info(f"Mail gönderim sonucu: {successful_emails} başarılı, {len(email_results) - successful_emails} başarısız")
+    return email_results
+
+
+def _cancelled_result(user_id: int) -> Dict[str, Any]:
+    return {"success": False, "cancelled": True, "error": "İşlem iptal edildi", "user_id": user_id}
+
+
+class GroupFilesSink(Sink):
+    """Satırları grup dosyalarına yazar; send_mail ise grup alıcılarına gönderir (/process)"""
+
+    def __init__(self, send_mail: bool = True):
+        self.send_mail = send_mail
+        # İşe özel dizin: aynı dakikada çalışan işlerin <grup>-<zaman>.xlsx dosyaları çakışmaz
+        self.output_dir = job_output_dir()
+        self.writers: Dict[str, SheetWriter] = {}
+        self.output_files: Dict[str, Any] = {}
+
+    def open(self, headers: List[str], groups: GroupIndex, source: Path):
+        self.headers, self.groups = headers, groups
+
+    def write(self, row: tuple, group_ids: Tuple[str, ...]):
+        for group_id in group_ids:
+            writer = self.writers.get(group_id)
+            if writer is None:
+                filename = generate_output_filename(self.groups.group_info(group_id))
+                writer = self.writers[group_id] = SheetWriter(self.output_dir / filename, self.headers)
+            writer.append(row)
+
+    def finish(self):
+        for group_id, writer in self.writers.items():
+            writer.save()
+            self.output_files[group_id] = {
+                "path": writer.path,
+                "row_count": writer.rows,
+                "filename": writer.path.name,
+                "matched_cities": writer.rows,
+            }
+
+    async def deliver(self, stats: Dict[str, Any], cancel_token: Optional[CancellationToken] = None) -> Dict[str, Any]:
+        result = {"success": True, "output_files": self.output_files}
+        if self.send_mail:
+            result["email_results"] = await send_group_emails(self.output_files, self.groups.group_info, cancel_token)
+        return result
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+
+
+class PersonalFileSink(Sink):
+    """Tüm satırları tek dosyada toplayıp kişisel maile gönderir (/bana)"""
+
+    def __init__(self):
+        self.writer: Optional[SheetWriter] = None
+
+    def open(self, headers: List[str], groups: GroupIndex, source: Path):
+        self.source = source
+        fd, name = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        self.writer = SheetWriter(Path(name), headers, title="Düzenlenmiş Veri")
+
+    def write(self, row: tuple, group_ids: Tuple[str, ...]):
+        self.writer.append(row)
+
+    def finish(self):
+        self.writer.save()
+
+    async def deliver(self, stats: Dict[str, Any], cancel_token: Optional[CancellationToken] = None) -> Dict[str, Any]:
+        if not config.PERSONAL_EMAIL:
+            return {"success": False, "error": "PERSONAL_EMAIL tanımlı değil", "email_sent_to": None}
         
+        subject = f"📊 Excel Raporu - {self.source.name}"
+        body = (
+            f"Merhaba,\n\n"
+            f"{stats['total_rows']} satırlık Excel raporu ekte gönderilmiştir.\n\n"
+            f"İyi çalışmalar,\nExcel Bot"
+        )
+        mail_result = await mail_dispatcher.send(
+            MailJob([config.PERSONAL_EMAIL], subject, body, self.writer.path),
+            cancel_token
+        )
         return {
-            "success": True,
-            "output_files": output_files,
-            "total_rows": splitting_result["total_rows"],
-            "matched_rows": splitting_result["matched_rows"],
-            "email_results": email_results,
-            "user_id": user_id
+            "success": mail_result["success"],
+            "email_sent_to": config.PERSONAL_EMAIL if mail_result["success"] else None,
+            **({} if mail_result["success"] else {"error": mail_result.get("error", "Mail gönderilemedi")}),
         }
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+            self.writer.path.unlink(missing_ok=True)
+
+
+class PersonalZipSink(Sink):
+    """Grup dosyalarını tek zip olarak kişisel maile gönderir (/tek); dosyaları files sink'i yazar"""
+
+    def __init__(self, files: GroupFilesSink):
+        self.files = files
+
+    async def deliver(self, stats: Dict[str, Any], cancel_token: Optional[CancellationToken] = None) -> Dict[str, Any]:
+        output_files = self.files.output_files
+        result = {"success": False, "output_files": output_files, "personal_email": config.PERSONAL_EMAIL}
+        if not config.PERSONAL_EMAIL:
+            logger.error("PERSONAL_EMAIL tanımlı değil")
+            return {**result, "error": "PERSONAL_EMAIL tanımlı değil"}
+        if not output_files:
+            return {**result, "error": "Gönderilecek dosya yok"}
         
-    except Exception as e:
-        logger.error(f"İşlem görevi hatası: {e}", exc_info=True)
-        
-        # Hata durumunda geçici dosyaları temizle
+        # İşler paralel çalışabildiği için her işe ayrı zip adı
+        fd, zip_name = tempfile.mkstemp(prefix="tek_islem_", suffix=".zip")
+        os.close(fd)
+        zip_path = Path(zip_name)
         try:
-            if cleaning_result and "temp_path" in cleaning_result:
-                temp_path = Path(cleaning_result["temp_path"])
-                if temp_path.exists():
-                    temp_path.unlink()
-        except:
-            pass
-            
-        return {"success": False, "error": str(e)}
+            await asyncio.to_thread(_zip_attachments, [f["path"] for f in output_files.values()], zip_path)
+            subject = "📊 TEK İŞLEM - Grup Raporları"
+            body = (
+                f"TEK işlem sonucu oluşturulan {len(output_files)} dosya ektedir.\n\n"
+                f"Toplam satır: {sum(f['row_count'] for f in output_files.values())}\n"
+                f"Oluşan gruplar: {', '.join(f['filename'] for f in output_files.values())}"
+            )
+            mail_result = await mail_dispatcher.send(
+                MailJob([config.PERSONAL_EMAIL], subject, body, zip_path),
+                cancel_token
+            )
+        finally:
+            zip_path.unlink(missing_ok=True)
         
+        result["success"] = mail_result["success"]
+        if not mail_result["success"]:
+            result["error"] = mail_result.get("error", "Mail gönderilemedi")
+        return result
 
 
+PIPELINE_MODES = ("process", "bana", "tek")
 
-#kişisel mail fonksiyonu
-#
-async def process_excel_task_for_personal_email(input_path: Path, user_id: int) -> Dict[str, Any]:
-    """Sadece kişisel maile gönderim için Excel işleme görevi"""
-    cleaning_result = None
-    try:
-        logger.info(f"Kişisel mail için Excel işleme başlatıldı: {input_path.name}, Kullanıcı: {user_id}")
-
-        # 1. Excel dosyasını temizle ve düzenle (aynı işlem)
-        cleaning_result = clean_excel_headers(str(input_path))
-        if not cleaning_result["success"]:
-            error_msg = f"Excel temizleme hatası: {cleaning_result.get('error', 'Bilinmeyen hata')}"
-            logger.error(error_msg)
-            return {"success": False, "error": error_msg}
-        
-        logger.info(f"Excel temizlendi: {cleaning_result['row_count']} satır")
 
-        # 2. Tüm verileri tek bir dosyada tut (gruplara ayırma YOK)
-        # Temizlenmiş dosyayı yükle
-        wb = load_workbook(cleaning_result["temp_path"])
-        ws = wb.active
-        
-        # Sütun genişliklerini ayarla
-        from openpyxl.utils import get_column_letter
-        for column_cells in ws.columns:
-            length = max(len(str(cell.value)) if cell.value else 0 for cell in column_cells)
-            column_letter = get_column_letter(column_cells[0].column)
-            ws.column_dimensions[column_letter].width = min(25, max(length + 2, 10))
+def build_sinks(modes: List[str]) -> Tuple[List[Sink], Dict[str, Sink]]:
+    """
+    İstenen modlar için çıkışları kurar. Dönüş: (okuma sırasında beslenecek çıkışlar, mod → teslim eden çıkış)
+    process ve tek birlikte istenirse grup dosyaları bir kez yazılır.
+    """
+    sinks: List[Sink] = []
+    by_mode: Dict[str, Sink] = {}
+    
+    files = None
+    if "process" in modes or "tek" in modes:
+        files = GroupFilesSink(send_mail="process" in modes)
+        sinks.append(files)
+    if "process" in modes:
+        by_mode["process"] = files
+    if "bana" in modes:
+        by_mode["bana"] = PersonalFileSink()
+        sinks.append(by_mode["bana"])
+    if "tek" in modes:
+        by_mode["tek"] = PersonalZipSink(files)
+    return sinks, by_mode
+
+
+async def run_pipeline(
+    input_path: Path,
+    user_id: int,
+    modes: List[str],
+    cancel_token: Optional[CancellationToken] = None
+) -> Dict[str, Any]:
+    """
+    Excel'i tek geçişte okuyup istenen modların (process, bana, tek) çıkışlarını üretir ve teslim eder.
+    Her modun sonucu result["modes"][mod] altında, ortak alanlar üst seviyededir.
+    """
+    modes = [mode for mode in PIPELINE_MODES if mode in modes]
+    if not modes:
+        return {"success": False, "error": "Geçerli işlem modu yok", "user_id": user_id}
+    
+    sinks, by_mode = build_sinks(modes)
+    # İş boyunca aynı grup görüntüsü kullanılır (yenileme işi yarıda etkilemez)
+    groups = group_manager.index
+    try:
+        logger.info(f"Excel işleme başlatıldı: {input_path.name}, Kullanıcı: {user_id}, Mod: {'+'.join(modes)}")
         
-        # Geçici çıktı dosyası oluştur
-        temp_output = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
-        temp_output_path = temp_output.name
-        wb.save(temp_output_path)
-        wb.close()
+        # 1. Oku, sütunları düzenle, satırları çıkışlara dağıt (CPU işi thread'de)
+        report_stage("okuma")
+        stats = await asyncio.to_thread(parse_into_sinks, input_path, sinks, groups, cancel_token)
         
-        # 3. Sadece kişisel maile gönder
-        email_success = False
-        if config.PERSONAL_EMAIL:
-            subject = f"📊 Excel Raporu - {input_path.name}"
-            body = (
-                f"Merhaba,\n\n"
-                f"{cleaning_result['row_count']} satırlık Excel raporu ekte gönderilmiştir.\n\n"
-                f"İyi çalışmalar,\nExcel Bot"
-            )
-            
-            email_success = await send_email_with_attachment(
-                [config.PERSONAL_EMAIL], subject, body, Path(temp_output_path)
-            )
+        report_stage("dosya yazma")
+        await asyncio.to_thread(lambda: [sink.finish() for sink in sinks])
+        logger.info(f"Excel işlendi: {stats['total_rows']} satır")
         
-        # 4. Geçici dosyaları temizle
-        try:
-            if cleaning_result and "temp_path" in cleaning_result:
-                temp_path = Path(cleaning_result["temp_path"])
-                if temp_path.exists():
-                    temp_path.unlink()
-            if Path(temp_output_path).exists():
-                Path(temp_output_path).unlink()
-        except Exception as e:
-            logger.warning(f"Geçici dosya silinemedi: {e}")
+        # 2. Teslimat (eşzamanlılık ve hız limiti dispatcher'da)
+        report_stage("mail")
+        parts = {}
+        for mode, sink in by_mode.items():
+            parts[mode] = await sink.deliver(stats, cancel_token)
         
-        return {
-            "success": email_success,
-            "total_rows": cleaning_result["row_count"],
-            "email_sent_to": config.PERSONAL_EMAIL if email_success else None,
-            "user_id": user_id
-        }
+        result = {"user_id": user_id, **stats}
+        for part in parts.values():
+            result.update(part)
+        result["success"] = all(part["success"] for part in parts.values())
+        result["modes"] = parts
+        if result["success"]:
+            result.pop("error", None)
+        return result
         
+    except JobCancelled:
+        logger.info(f"Excel işleme iptal edildi: {input_path.name}, Kullanıcı: {user_id}")
+        return _cancelled_result(user_id)
     except Exception as e:
-        logger.error(f"Kişisel mail işleme hatası: {e}", exc_info=True)
-        
-        # Hata durumunda geçici dosyaları temizle
-        try:
-            if cleaning_result and "temp_path" in cleaning_result:
-                temp_path = Path(cleaning_result["temp_path"])
-                if temp_path.exists():
-                    temp_path.unlink()
-            if 'temp_output_path' in locals() and Path(temp_output_path).exists():
-                Path(temp_output_path).unlink()
-        except:
-            pass
-            
-        return {"success": False, "error": str(e)}
\ No newline at end of file
+        logger.opt(exception=e).error("İşlem görevi hatası: {}", e)
+        return {"success": False, "error": str(e), "user_id": user_id}
+    finally:
+        for sink in sinks:
+            sink.close()
+
+
+async def process_excel_task(
+    input_path: Path,
+    user_id: int,
+    cancel_token: Optional[CancellationToken] = None
+) -> Dict[str, Any]:
+    """Excel'i gruplara ayırıp grup alıcılarına gönderir (/process)"""
+    return await run_pipeline(input_path, user_id, ["process"], cancel_token)
+
+
+async def process_excel_task_for_personal_email(
+    input_path: Path,
+    user_id: int,
+    cancel_token: Optional[CancellationToken] = None
+) -> Dict[str, Any]:
+    """Sadece kişisel maile gönderim için Excel işleme görevi (/bana)"""
+    return await run_pipeline(input_path, user_id, ["bana"], cancel_token)
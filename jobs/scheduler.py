@@ -0,0 +1,328 @@
+# İş Zamanlayıcı (jobs/scheduler.py)
+"""
+Excel işlerini sıraya alır ve sınırlı sayıda paralel çalıştırır:
+- Kullanıcı başına kuyruk, kullanıcılar arasında round-robin (biri 10 dosya yüklese de diğerleri bekletilmez)
+- Genel eşzamanlılık sınırı (JOB_MAX_CONCURRENCY), kullanıcı başına aynı anda tek iş
+- Hızlı şerit: küçük dosyalar (JOB_FAST_LANE_KB altı) ayrılmış slotlarda, büyük işlerin arkasında beklemeden çalışır;
+  şeritte de kullanıcı başına aynı anda tek iş, ve en az bir slot her zaman adil (round-robin) kuyruğa kalır
+- İptal: kullanıcının kuyruktaki işleri silinir, çalışan işin belirteci iptal edilir
+  (temizleme / ayırma / mail döngüleri belirteci kontrol edip durur)
+- Her işin ID'si, aşama / ilerleme / süre bilgisi tutulur (/job <id>); aynı Telegram
+  mesajı tekrar teslim edilirse (webhook) yeni iş açılmaz, mevcut iş döndürülür
+- İş numaraları iş geçmişindeki (SQLite) en büyük numaradan devam eder: yeniden başlatmada çakışmaz
+"""
+import asyncio
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, List, Optional
+
+from config import config
+from utils.cancellation import CancellationToken
+from utils.file_utils import remove_job_input
+from utils.job_progress import JobProgress, current_progress
+from utils.logger import logger
+from utils.job_history import job_history
+from utils.metrics import observe_job
+
+JobFunc = Callable[[CancellationToken], Awaitable[Dict[str, Any]]]
+
+CANCELLED_RESULT = {"success": False, "cancelled": True, "error": "İşlem iptal edildi"}
+JOB_HISTORY_SIZE = 200  # /job ile sorgulanabilecek biten iş sayısı
+
+
+def make_job_func(
+    kind: str,
+    local_func: Callable[..., Awaitable[Dict[str, Any]]],
+    input_path: Path,
+    user_id: int,
+    *args: Any
+) -> JobFunc:
+    """
+    İşi JOB_BACKEND'e göre bot sürecinde (local) veya Celery worker'ında çalıştıracak fonksiyon.
+    Ek argümanlar (ör. pipeline modları) user_id'den sonra, iptal belirtecinden önce verilir.
+    """
+    if config.JOB_BACKEND == "celery":
+        from jobs.celery_tasks import run_remote  # celery sadece bu modda yüklenir
+        return lambda token: run_remote(kind, input_path, user_id, token, *args)
+    return lambda token: local_func(input_path, user_id, *args, token)
+
+
+@dataclass
+class Job:
+    job_id: str
+    user_id: int
+    name: str
+    func: JobFunc
+    mode: str = ""  # process, bana, tek veya birleşik (process+tek)
+    size: int = 0
+    fast: bool = False
+    dedupe_key: Optional[str] = None
+    input_path: Optional[Path] = None  # İş bitince (veya iptal edilince) silinir
+    token: CancellationToken = field(default_factory=CancellationToken)
+    progress: JobProgress = field(default_factory=JobProgress)
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    future: Optional[asyncio.Future] = None
+
+    @property
+    def status(self) -> str:
+        """queued | running | cancelling | done | failed | cancelled"""
+        if self.result is not None:
+            if self.result.get("cancelled"):
+                return "cancelled"
+            return "done" if self.result.get("success") else "failed"
+        if self.started_at is None:
+            return "queued"
+        return "cancelling" if self.token.cancelled else "running"
+
+    async def wait(self) -> Dict[str, Any]:
+        """İş bitene kadar bekler, sonucunu döndürür"""
+        return await asyncio.shield(self.future)
+
+
+class JobScheduler:
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        fast_lane_bytes: Optional[int] = None,
+        fast_lane_slots: Optional[int] = None
+    ):
+        self.max_concurrency = max_concurrency or config.JOB_MAX_CONCURRENCY
+        self.fast_lane_bytes = fast_lane_bytes if fast_lane_bytes is not None else config.JOB_FAST_LANE_BYTES
+        self.fast_lane_slots = fast_lane_slots if fast_lane_slots is not None else config.JOB_FAST_LANE_SLOTS
+
+        self._user_queues: Dict[int, Deque[Job]] = {}
+        self._fast_queue: Deque[Job] = deque()
+        self._running: Dict[str, Job] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._jobs: Dict[str, Job] = {}          # Tüm işler (ID → iş), biten eski işler budanır
+        self._by_key: Dict[str, Job] = {}        # Tekrar teslim kontrolü
+        self._ids: Optional[Iterator[int]] = None  # İlk işte iş geçmişinden başlatılır
+        # Round-robin: en uzun süredir hizmet almamış kullanıcı önce (kuyruğu boşalıp dolsa da sıra korunur)
+        self._last_served: Dict[int, int] = {}
+        self._serve_counter = itertools.count(1)
+
+    # ---- Durum ----
+
+    @property
+    def running_count(self) -> int:
+        return len(self._running)
+
+    def _regular_running(self) -> int:
+        return sum(1 for job in self._running.values() if not job.fast)
+
+    def _fast_running(self) -> int:
+        return sum(1 for job in self._running.values() if job.fast)
+
+    def _user_running(self, user_id: int, fast: bool = False) -> bool:
+        return any(job.user_id == user_id and job.fast == fast for job in self._running.values())
+
+    def _next_id(self) -> str:
+        if self._ids is None:
+            self._ids = itertools.count(job_history.last_job_id() + 1)
+        return f"{next(self._ids):04d}"
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id.lstrip("#"))
+
+    def get_by_key(self, dedupe_key: str) -> Optional[Job]:
+        """Aynı istekle açılmış iş (handler dosyayı indirmeden önce bakar)"""
+        return self._by_key.get(dedupe_key)
+
+    def jobs_for_user(self, user_id: int, limit: int = 10) -> List[Job]:
+        """Kullanıcının en yeni işleri"""
+        jobs = [job for job in self._jobs.values() if job.user_id == user_id]
+        return jobs[-limit:][::-1]
+
+    def queued_jobs(self) -> List[Job]:
+        return list(self._fast_queue) + [job for queue in self._user_queues.values() for job in queue]
+
+    def position(self, job: Job) -> int:
+        """Kuyruktaki sırası (1 tabanlı), çalışıyorsa veya bittiyse 0"""
+        if job in self._fast_queue:
+            return self._fast_queue.index(job) + 1
+        for index, queued in enumerate(self._round_robin_order(), 1):
+            if queued is job:
+                return index
+        return 0
+
+    def _round_robin_order(self) -> List[Job]:
+        """Normal kuyruğun round-robin sırasıyla açılmış hali (tahmini bekleme sırası)"""
+        users = sorted(self._user_queues, key=lambda user_id: self._last_served.get(user_id, 0))
+        queues = [list(self._user_queues[user_id]) for user_id in users]
+        order = []
+        for depth in range(max((len(q) for q in queues), default=0)):
+            order.extend(q[depth] for q in queues if depth < len(q))
+        return order
+
+    # ---- Gönderme / iptal ----
+
+    def submit(
+        self,
+        user_id: int,
+        name: str,
+        func: JobFunc,
+        size: int = 0,
+        dedupe_key: Optional[str] = None,
+        mode: str = "",
+        input_path: Optional[Path] = None
+    ) -> Job:
+        """
+        İşi kuyruğa alır; küçük dosyalar hızlı şeride girer. Aynı dedupe_key ile gelen iş tekrar açılmaz.
+        input_path verilirse iş bitince silinir.
+        """
+        if dedupe_key and dedupe_key in self._by_key:
+            job = self._by_key[dedupe_key]
+            logger.warning(f"♻️ Tekrar teslim edilen istek, mevcut iş döndürülüyor: #{job.job_id}")
+            if input_path and input_path != job.input_path:
+                remove_job_input(input_path)  # İki teslimat aynı anda indirdiyse ikinci kopya
+            return job
+
+        job = Job(
+            job_id=self._next_id(),
+            user_id=user_id,
+            name=name,
+            func=func,
+            mode=mode,
+            size=size,
+            fast=self.fast_lane_slots > 0 and 0 < size <= self.fast_lane_bytes,
+            dedupe_key=dedupe_key,
+            input_path=input_path,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._jobs[job.job_id] = job
+        if dedupe_key:
+            self._by_key[dedupe_key] = job
+        self._prune()
+
+        if job.fast:
+            self._fast_queue.append(job)
+        else:
+            self._user_queues.setdefault(user_id, deque()).append(job)
+
+        logger.info(f"📥 İş kuyruğa alındı #{job.job_id}: {name} ({size / 1024:.0f} KB, "
+                    f"{'hızlı şerit' if job.fast else 'normal'}), kullanıcı: {user_id}")
+        self._pump()
+        return job
+
+    def cancel_user(self, user_id: int) -> int:
+        """Kullanıcının kuyruktaki ve çalışan tüm işlerini iptal eder, iptal edilen iş sayısını döndürür"""
+        cancelled = 0
+
+        for job in [job for job in self._fast_queue if job.user_id == user_id]:
+            self._fast_queue.remove(job)
+            self._finish(job, dict(CANCELLED_RESULT))
+            cancelled += 1
+
+        for job in self._user_queues.pop(user_id, ()):
+            self._finish(job, dict(CANCELLED_RESULT))
+            cancelled += 1
+
+        for job in self._running.values():
+            if job.user_id == user_id and not job.token.cancelled:
+                job.token.cancel()
+                cancelled += 1
+
+        if cancelled:
+            logger.info(f"🛑 Kullanıcı {user_id} için {cancelled} iş iptal edildi")
+        return cancelled
+
+    # ---- Zamanlama ----
+
+    def _next_regular(self) -> Optional[Job]:
+        """Round-robin: en uzun süredir beklemiş kullanıcının ilk işi (zaten işi çalışan kullanıcılar atlanır)"""
+        candidates = [user_id for user_id in self._user_queues if not self._user_running(user_id)]
+        if not candidates:
+            return None
+
+        # min() eşitlikte ilk geleni seçer → hiç hizmet almamış kullanıcılar geliş sırasıyla
+        user_id = min(candidates, key=lambda uid: self._last_served.get(uid, 0))
+        self._last_served[user_id] = next(self._serve_counter)
+
+        queue = self._user_queues[user_id]
+        job = queue.popleft()
+        if not queue:
+            del self._user_queues[user_id]
+        return job
+
+    def _next_fast(self) -> Optional[Job]:
+        """Hızlı şeritte sıradaki iş; hızlı işi zaten çalışan kullanıcılar atlanır (tek kullanıcı şeridi dolduramaz)"""
+        # Ayrılmış slotlar + boştaki normal slotlar; en az bir normal slot adil kuyruğa kalır
+        fast_limit = self.fast_lane_slots + max(0, self.max_concurrency - 1)
+        if self._fast_running() >= fast_limit:
+            return None
+        for job in self._fast_queue:
+            if not self._user_running(job.user_id, fast=True):
+                self._fast_queue.remove(job)
+                return job
+        return None
+
+    def _pump(self):
+        """Boş slot oldukça kuyruktan iş başlatır"""
+        total_slots = self.max_concurrency + self.fast_lane_slots
+        while len(self._running) < total_slots:
+            job = self._next_fast()
+            if job is None and self._regular_running() < self.max_concurrency:
+                job = self._next_regular()
+            if job is None:
+                return
+            self._start(job)
+
+    def _start(self, job: Job):
+        job.started_at = time.time()
+        self._running[job.job_id] = job
+        self._tasks[job.job_id] = asyncio.create_task(self._run(job))
+
+    async def _run(self, job: Job):
+        # Task kendi context kopyasında çalışır → report_stage/report_progress bu işi günceller,
+        # işin (thread'ler dahil) tüm log kayıtları job_id / user_id taşır
+        try:
+            with logger.contextualize(job_id=job.job_id, user_id=job.user_id):
+                waited = job.started_at - job.created_at
+                logger.info(f"▶️ İş başladı #{job.job_id}: {job.name} (kuyrukta {waited:.1f} sn)")
+                current_progress.set(job.progress)
+                job.progress.set_stage("başladı")
+                result = dict(CANCELLED_RESULT)  # Task iptal edilirse (kapanış) bekleyen yine sonuç alır
+                try:
+                    result = await job.func(job.token)
+                    if job.token.cancelled and not result.get("cancelled"):
+                        result = {**result, "cancelled": True}
+                except Exception as e:
+                    # Mesaj argümanla verilir: hata metnindeki {...} loguru'nun format'ını bozmasın
+                    logger.opt(exception=e).error("İş hatası #{}: {}", job.job_id, e)
+                    result = {"success": False, "error": str(e)}
+                finally:
+                    self._running.pop(job.job_id, None)
+                    self._tasks.pop(job.job_id, None)
+                    self._finish(job, result)
+                    logger.info(f"⏹️ İş bitti #{job.job_id}: {job.name} ({job.finished_at - job.started_at:.1f} sn)")
+        finally:
+            self._pump()
+
+    def _finish(self, job: Job, result: Dict[str, Any]):
+        job.finished_at = time.time()
+        job.progress.set_stage("bitti")
+        job.result = result
+        if not job.future.done():
+            job.future.set_result(result)
+        if job.input_path:
+            remove_job_input(job.input_path)
+        observe_job(job)
+        job_history.record(job)
+
+    def _prune(self):
+        """Geçmiş sınırını aşan en eski biten işleri unutur"""
+        finished = [job for job in self._jobs.values() if job.result is not None]
+        for job in finished[:max(0, len(finished) - JOB_HISTORY_SIZE)]:
+            self._jobs.pop(job.job_id, None)
+            if job.dedupe_key:
+                self._by_key.pop(job.dedupe_key, None)
+
+
+# Global job scheduler instance
+job_scheduler = JobScheduler()
@@ -1,14 +1,17 @@
 #KOVA   main.py
 #
+# Başlangıç profilleyici diğer tüm import'lardan önce kurulur (STARTUP_PROFILE=true)
+from utils.startup_profiler import startup_profiler
+startup_profiler.install()
+
 import asyncio
 import os
 from aiogram import Bot, Dispatcher
 from aiogram.enums import ParseMode
-from aiogram.fsm.storage.memory import MemoryStorage
 from aiogram.client.default import DefaultBotProperties
 from aiohttp import web
 
-from config import config
+from config import config, log_env
 from handlers.reply_handler import router as reply_router
 from handlers.upload_handler import router as upload_router
 from handlers.status_handler import router as status_router
@@ -19,85 +22,35 @@ from handlers.json_handler import router as json_router
 from handlers.file_handler import router as file_router
 from handlers.tek_handler import router as tek_router
 from handlers.cancel_handler import router as cancel_router
+from handlers.job_handler import router as job_router
 
 
 
 
-from utils.logger import setup_logger
+from utils.logger import logger, setup_logger
+from utils.group_manager import group_manager
+from utils.fsm_storage import create_fsm_storage
+from utils.update_queue import update_queue
+from utils.telegram_sender import install_rate_limiter
+from utils.metrics import render_metrics
+from jobs.scheduler import job_scheduler
+from utils.job_history import job_history
+from utils.disk_usage import disk_usage
 
 # Logger kurulumu
 setup_logger()
-
-# Health check ve webhook için farklı portlar
-HEALTH_CHECK_PORT = 8080  # Health check için varsayılan port
-WEBHOOK_PORT = config.PORT  # Webhook için config'ten gelen port
-
-
-async def handle_health_check(reader, writer):
-    """Asenkron health check handler"""
-    try:
-        # İsteği oku
-        data = await reader.read(1024)
-        if not data:
-            return
-
-        # Basit HTTP isteği parsing
-        request_line = data.decode().split('\r\n')[0]
-        method, path, _ = request_line.split()
-        
-        if path == '/health':
-            response = (
-                "HTTP/1.1 200 OK\r\n"
-                "Content-Type: text/plain\r\n"
-                "Content-Length: 13\r\n\r\n"
-                "Bot is running"
-            )
-            writer.write(response.encode())
-            await writer.drain()
-        else:
-            response = (
-                "HTTP/1.1 404 Not Found\r\n"
-                "Content-Type: text/plain\r\n\r\n"
-                "Not Found"
-            )
-            writer.write(response.encode())
-            await writer.drain()
-    except Exception as e:
-        print(f"Health check hatası: {e}")
-        try:
-            response = (
-                "HTTP/1.1 500 Internal Server Error\r\n"
-                "Content-Type: text/plain\r\n\r\n"
-                "Error"
-            )
-            writer.write(response.encode())
-            await writer.drain()
-        except Exception:
-            pass
-    finally:
-        writer.close()
-        await writer.wait_closed()
-
-
-async def start_health_check_server(port: int):
-    """Asenkron health check sunucusu başlat"""
-    server = await asyncio.start_server(
-        handle_health_check, 
-        "0.0.0.0", 
-        port
-    )
-    print(f"✅ Health check sunucusu {port} portunda başlatıldı")
-    return server
-
+log_env()
 
 # -------------------------------
-# Webhook mode için aiohttp server
+# HTTP sunucusu (tek aiohttp uygulaması, config.PORT):
+# /webhook (webhook modunda), /health, /ready, /metrics
 # -------------------------------
 async def webhook_handler(request: web.Request):
-    """Telegram'dan gelen update'leri aiogram'a aktarır"""
-    dp: Dispatcher = request.app["dp"]
-    bot: Bot = request.app["bot"]
-    
+    """
+    Telegram'dan gelen update'i kuyruğa alır ve hemen onaylar.
+    İşleme update_queue işleyicilerinde yapılır; uzun işlerde Telegram zaman aşımına
+    düşüp aynı update'i tekrar göndermez.
+    """
     # Secret token kontrolü (eğer ayarlanmışsa)
     if config.WEBHOOK_SECRET:
         token = request.headers.get('X-Telegram-Bot-Api-Secret-Token')
@@ -106,33 +59,78 @@ async def webhook_handler(request: web.Request):
     
     try:
         update = await request.json()
-        await dp.feed_webhook_update(bot, update)
-        return web.Response(text="ok")
-    except Exception as e:
+    except ValueError as e:
         print(f"Webhook hata: {e}")
-        return web.Response(status=500, text="error")
-
-
-async def start_webhook(bot: Bot, dp: Dispatcher):
-    """Webhook mode başlatıcı"""
+        return web.Response(status=400, text="bad request")
+    
+    if not update_queue.enqueue(update):
+        # Kuyruk dolu → Telegram update'i daha sonra tekrar gönderir
+        return web.Response(status=503, text="busy")
+    return web.Response(text="ok")
+
+
+async def health_handler(request: web.Request):
+    """Canlılık: süreç ayakta ve event loop cevap veriyor"""
+    return web.Response(text="Bot is running")
+
+
+async def ready_handler(request: web.Request):
+    """
+    Hazırlık: başlangıç bitti, update kuyruğu dolmak üzere değil, işleyiciler doymuş değil.
+    Hazır değilse 503 → yük dengeleyici yeni trafik göndermez.
+    """
+    stats = update_queue.stats()
+    fill = stats["depth"] / stats["capacity"]
+    saturated = stats["busy"] >= stats["workers"] and stats["depth"] >= stats["workers"]
+    started = startup_profiler.ready_at is not None and (update_queue.running or not config.USE_WEBHOOK)
+    ready = started and not saturated and fill < config.READY_MAX_QUEUE_FILL
+    body = {
+        "ready": ready,
+        "started": started,
+        "queue_depth": stats["depth"],
+        "queue_capacity": stats["capacity"],
+        "workers_busy": stats["busy"],
+        "workers": stats["workers"],
+        "jobs_running": job_scheduler.running_count,
+        "jobs_queued": len(job_scheduler.queued_jobs()),
+        "job_slots": job_scheduler.max_concurrency,
+    }
+    return web.json_response(body, status=200 if ready else 503)
+
+
+async def metrics_handler(request: web.Request):
+    """Prometheus metrikleri"""
+    body, content_type = render_metrics()
+    return web.Response(body=body, headers={"Content-Type": content_type})
+
+
+def create_app(bot: Bot, dp: Dispatcher) -> web.Application:
     app = web.Application()
     app["dp"] = dp
     app["bot"] = bot
-
-    # Webhook endpoint'i
-    app.router.add_post("/webhook", webhook_handler)
-    
-    # Health endpoint'i webhook modu için de ekle
-    async def health_check(request):
-        return web.Response(text="Bot is running")
-    
-    app.router.add_get("/health", health_check)
-
-    runner = web.AppRunner(app)
+    if config.USE_WEBHOOK:
+        app.router.add_post("/webhook", webhook_handler)
+    app.router.add_get("/health", health_handler)
+    app.router.add_get("/ready", ready_handler)
+    app.router.add_get("/metrics", metrics_handler)
+    return app
+
+
+async def start_http_server(bot: Bot, dp: Dispatcher) -> web.AppRunner:
+    """HTTP sunucusunu başlatır (her iki modda da; health check başlangıçtan itibaren cevap verir)"""
+    # access_log kapalı: health/metrics yoklamaları her seferinde log dosyasına yazılmasın
+    runner = web.AppRunner(create_app(bot, dp), access_log=None)
     await runner.setup()
-    site = web.TCPSite(runner, "0.0.0.0", WEBHOOK_PORT)
-    print(f"🌐 Webhook sunucusu {WEBHOOK_PORT} portunda dinleniyor (/webhook)")
+    site = web.TCPSite(runner, "0.0.0.0", config.PORT)
     await site.start()
+    print(f"🌐 HTTP sunucusu {config.PORT} portunda dinleniyor (/health, /ready, /metrics"
+          f"{', /webhook' if config.USE_WEBHOOK else ''})")
+    return runner
+
+
+async def start_webhook(bot: Bot, dp: Dispatcher):
+    """Webhook mode başlatıcı (HTTP sunucusu zaten dinliyor)"""
+    update_queue.start(bot, dp)
 
     # Telegram'a webhook bildirimi
     await bot.set_webhook(
@@ -140,14 +138,14 @@ async def start_webhook(bot: Bot, dp: Dispatcher):
         secret_token=config.WEBHOOK_SECRET or None,
         drop_pending_updates=True,
     )
-    
-    return runner  # Graceful shutdown için runner'ı döndür
+    startup_profiler.mark_ready()
 
 
 async def start_polling(bot: Bot, dp: Dispatcher):
     """Polling mode başlatıcı"""
     print("🤖 Polling modu başlatılıyor...")
     await bot.delete_webhook(drop_pending_updates=True)
+    startup_profiler.mark_ready()
     await dp.start_polling(bot)
 
 
@@ -159,17 +157,22 @@ async def main():
         print("❌ HATA: Bot token bulunamadı!")
         return
 
-    storage = MemoryStorage()
+    storage = create_fsm_storage()
 
     bot = Bot(
         token=config.TELEGRAM_TOKEN,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
+    # Giden tüm API çağrıları genel + sohbet bazlı limitle, 429'da bekleyip tekrar denenir
+    install_rate_limiter(bot)
     dp = Dispatcher(storage=storage)
+    # İlk update'in geliş süresi (soğuk başlangıç ölçümü)
+    dp.update.outer_middleware(startup_profiler.first_update_middleware)
 
     # Router'ları yükle
     dp.include_router(reply_router)
     dp.include_router(cancel_router)  # cancel_handler
+    dp.include_router(job_router)  # /job: dosya beklerken de çalışsın
     dp.include_router(upload_router)
     dp.include_router(status_router)
     dp.include_router(admin_router)
@@ -181,20 +184,27 @@ async def main():
 
 
 
-    health_server = None
-    webhook_runner = None
+    http_runner = None
+    groups_watch_task = None
+    disk_watch_task = None
 
     try:
-        # Health check sunucusunu başlat (her iki mod için de)
-        health_server = await start_health_check_server(HEALTH_CHECK_PORT)
-        health_task = asyncio.create_task(health_server.serve_forever())
+        # groups.json değişikliklerini arka planda izle
+        if config.GROUPS_WATCH_INTERVAL > 0:
+            groups_watch_task = asyncio.create_task(group_manager.watch())
+        
+        # Dizin boyutlarını ilk kez hesapla, periyodik olarak düzelt
+        disk_watch_task = asyncio.create_task(disk_usage.watch(config.DISK_RECONCILE_INTERVAL))
+
+        # HTTP sunucusunu başlat (her iki mod için de)
+        http_runner = await start_http_server(bot, dp)
 
         if config.USE_WEBHOOK:
             # Webhook modu
             print("🚀 Webhook modu başlatılıyor...")
-            webhook_runner = await start_webhook(bot, dp)
+            await start_webhook(bot, dp)
             
-            # Her iki sunucu da çalışır durumda kalacak
+            # Sunucu çalışır durumda kalacak
             await asyncio.Event().wait()
         else:
             # Polling modu
@@ -210,14 +220,25 @@ async def main():
         # Graceful shutdown
         print("🔴 Bot durduruluyor...")
         
-        if webhook_runner:
-            await webhook_runner.cleanup()
+        if groups_watch_task:
+            groups_watch_task.cancel()
+        if disk_watch_task:
+            disk_watch_task.cancel()
+        
+        if http_runner:
+            await http_runner.cleanup()
+        # Yeni update alınmıyor → kuyrukta kalanları işle
+        await update_queue.stop()
         
-        if health_server:
-            health_server.close()
-            await health_server.wait_closed()
+        # Bekleyen FSM ve iş geçmişi yazmalarını aktar
+        await storage.close()
+        await job_history.close()
+        from utils.smtp_trace import smtp_trace_store
+        await asyncio.to_thread(smtp_trace_store.flush)
         
         await bot.session.close()
+        # Kuyruktaki log kayıtları dosyalara yazılsın
+        await logger.complete()
         print("✅ Bot başarıyla durduruldu")
 
 
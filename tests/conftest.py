@@ -0,0 +1,14 @@
+"""Testler Celery'yi eager modda çalıştırır: broker ve sonuç deposu bellekte, görevler test sürecinde"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# config import edilmeden önce ayarlanmalı
+os.environ.setdefault("JOB_BACKEND", "celery")
+os.environ.setdefault("CELERY_EAGER", "true")
+os.environ.setdefault("MAIL_LIMITER_BACKEND", "local")
+os.environ.setdefault("SHARED_STORAGE_DIR", tempfile.mkdtemp(prefix="kova_test_"))
+os.environ.setdefault("JOB_HISTORY_PATH", os.path.join(os.environ["SHARED_STORAGE_DIR"], "jobs.sqlite3"))
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
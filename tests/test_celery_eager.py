@@ -0,0 +1,93 @@
+"""Celery görevleri (jobs/celery_tasks.py) eager modda: yol dönüşümleri, işlem hattı ve iptal"""
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from config import config
+from jobs import celery_tasks
+from jobs.celery_tasks import restore_paths, run_remote, to_jsonable
+from jobs.process_excel import run_pipeline
+from jobs.scheduler import make_job_func
+from utils.cancellation import CancellationToken
+from utils.mail_dispatcher import mail_dispatcher
+from utils.rate_limit import RedisTokenBucket, TokenBucket, make_bucket
+from utils.smtp_accounts import shared_account_state
+
+CITIES = ["Ankara", "İzmir", "Antalya", "Bilinmeyen"]
+
+
+def write_input(rows: int = 40) -> Path:
+    from openpyxl import Workbook
+
+    path = config.INPUT_DIR / "test_girdi.xlsx"
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["TARİH", "İL", "NOT"])
+    for index in range(rows):
+        ws.append([f"2024-01-{index % 28 + 1:02d}", CITIES[index % len(CITIES)], f"satır {index}"])
+    wb.save(path)
+    return path
+
+
+@pytest.fixture
+def sent_mails(monkeypatch):
+    """Mail gönderilmez; dispatcher'a verilen işler kaydedilir"""
+    jobs = []
+
+    async def fake_dispatch(mail_jobs, cancel_token=None):
+        jobs.extend(mail_jobs)
+        return [{**job.meta, "success": True} for job in mail_jobs]
+
+    monkeypatch.setattr(mail_dispatcher, "dispatch", fake_dispatch)
+    return jobs
+
+
+def test_eager_mode_is_configured():
+    assert config.JOB_BACKEND == "celery"
+    assert celery_tasks.celery_app.conf.task_always_eager
+
+
+def test_paths_round_trip_through_json():
+    path = config.OUTPUT_DIR / "is" / "grup.xlsx"
+    result = {"success": True, "output_files": {"g1": {"path": path, "row_count": 3}}}
+
+    payload = to_jsonable(result)
+    assert payload["output_files"]["g1"]["path"] == str(Path("output") / "is" / "grup.xlsx")
+    assert restore_paths(payload)["output_files"]["g1"]["path"] == path
+
+
+def test_pipeline_runs_through_celery(sent_mails):
+    input_path = write_input()
+    job_func = make_job_func("pipeline", run_pipeline, input_path, 42, ["process"])
+
+    result = asyncio.run(job_func(CancellationToken()))
+
+    assert result["success"], result
+    assert result["total_rows"] == 40
+    assert result["modes"]["process"]["success"]
+    for file_info in result["output_files"].values():
+        assert isinstance(file_info["path"], Path)
+        assert file_info["path"].exists()
+    assert sum(file_info["row_count"] for file_info in result["output_files"].values()) >= 40
+
+
+def test_cancelled_token_reaches_task(sent_mails):
+    input_path = write_input()
+    token = CancellationToken()
+    token.cancel()
+
+    result = asyncio.run(run_remote("pipeline", input_path, 42, token, ["process"]))
+
+    assert result["cancelled"]
+    assert not result["success"]
+    assert not sent_mails
+
+
+def test_mail_limits_are_local_in_eager_mode(monkeypatch):
+    assert isinstance(make_bucket("kova:test", 60), TokenBucket)
+    assert shared_account_state() is None
+
+    monkeypatch.setattr(config, "MAIL_LIMITER_BACKEND", "redis")
+    assert isinstance(make_bucket("kova:test", 60), RedisTokenBucket)
+    assert shared_account_state() is not None
@@ -0,0 +1,88 @@
+"""/js komutu (handlers/json_handler.py, utils/json_processing.py): hatalı grup dosyaları"""
+import asyncio
+import io
+from pathlib import Path
+
+import pytest
+
+from handlers import json_handler
+from utils.group_manager import group_manager
+from utils.json_processing import process_excel_to_json
+
+
+def write_groups_workbook(path: Path, group_ids, sheet: str = "grup") -> Path:
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = sheet
+    # Gruplar D sütunundan başlar: ID, ad, e-postalar, şehirler
+    for offset, group_id in enumerate(group_ids):
+        column = 4 + offset
+        ws.cell(row=1, column=column, value=group_id)
+        ws.cell(row=2, column=column, value=f"{group_id} adı")
+        ws.cell(row=3, column=column, value="alici@test.local")
+        ws.cell(row=4, column=column, value="Ankara")
+    wb.save(path)
+    return path
+
+
+class FakeMessage:
+    """Sadece handle_excel_file'ın kullandığı alanlar"""
+
+    def __init__(self, content: bytes, file_name: str = "gruplar.xlsx"):
+        self.document = type("Document", (), {"file_name": file_name, "file_id": "f1"})()
+        self.answers = []
+        content_bytes = content
+
+        class Bot:
+            async def get_file(self, file_id):
+                return type("File", (), {"file_path": "docs/f1"})()
+
+            async def download_file(self, file_path):
+                return io.BytesIO(content_bytes)
+
+        self.bot = Bot()
+
+    async def answer(self, text, **kwargs):
+        self.answers.append(text)
+
+    async def answer_document(self, document, **kwargs):
+        self.answers.append(kwargs.get("caption"))
+
+
+class FakeState:
+    cleared = False
+
+    async def clear(self):
+        self.cleared = True
+
+
+def test_missing_file_raises_original_error():
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(process_excel_to_json("/nonexistent.xlsx"))
+
+
+def test_missing_sheet_raises_value_error(tmp_path):
+    path = write_groups_workbook(tmp_path / "gruplar.xlsx", ["Grup_1"], sheet="liste")
+    with pytest.raises(ValueError, match="'grup' sayfası"):
+        asyncio.run(process_excel_to_json(str(path)))
+
+
+def test_duplicate_group_id_keeps_current_groups(tmp_path):
+    before = len(group_manager.index)
+    path = write_groups_workbook(tmp_path / "gruplar.xlsx", ["Grup_1", "grup_1"])
+    with pytest.raises(ValueError, match="birden fazla"):
+        asyncio.run(process_excel_to_json(str(path)))
+    assert len(group_manager.index) == before
+
+
+def test_handler_replies_with_error(tmp_path):
+    path = write_groups_workbook(tmp_path / "gruplar.xlsx", ["Grup_1", "Grup_1"])
+    message, state = FakeMessage(path.read_bytes()), FakeState()
+
+    asyncio.run(json_handler.handle_excel_file(message, state))
+
+    assert message.answers[-1].startswith("❌ Hata oluştu")
+    assert "birden fazla" in message.answers[-1]
+    assert state.cleared
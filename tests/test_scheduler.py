@@ -0,0 +1,69 @@
+"""İş zamanlayıcısı (jobs/scheduler.py): hızlı şerit adaleti, iş numaraları"""
+import asyncio
+
+from jobs import scheduler as scheduler_module
+from jobs.scheduler import JobScheduler
+from utils.job_history import JobHistory
+
+
+def blocking_job(release: asyncio.Event):
+    async def func(token):
+        await release.wait()
+        return {"success": True}
+    return func
+
+
+def test_fast_lane_runs_one_job_per_user():
+    async def main():
+        scheduler = JobScheduler(max_concurrency=2, fast_lane_bytes=1024, fast_lane_slots=1)
+        release = asyncio.Event()
+        small = [scheduler.submit(1, f"küçük {i}", blocking_job(release), size=100) for i in range(5)]
+        other = scheduler.submit(2, "diğer küçük", blocking_job(release), size=100)
+        running = {job.job_id for job in scheduler._running.values()}
+
+        release.set()
+        await asyncio.gather(*(job.wait() for job in small + [other]))
+        return running, small, other
+
+    running, small, other = asyncio.run(main())
+    # Kullanıcı 1'in sadece ilk işi, ardından kullanıcı 2'nin işi başlar
+    assert running == {small[0].job_id, other.job_id}
+
+
+def test_fast_lane_leaves_a_slot_for_regular_queue():
+    async def main():
+        scheduler = JobScheduler(max_concurrency=2, fast_lane_bytes=1024, fast_lane_slots=1)
+        release = asyncio.Event()
+        fast = [scheduler.submit(user_id, "küçük", blocking_job(release), size=100) for user_id in range(1, 6)]
+        large = scheduler.submit(99, "büyük", blocking_job(release), size=10_000)
+        running = {job.job_id for job in scheduler._running.values()}
+
+        release.set()
+        await asyncio.gather(*(job.wait() for job in fast + [large]))
+        return running, large
+
+    running, large = asyncio.run(main())
+    assert len(running) == 3
+    assert large.job_id in running
+
+
+def test_job_ids_continue_after_restart(tmp_path, monkeypatch):
+    history = JobHistory(tmp_path / "jobs.sqlite3", flush_interval=0)
+    monkeypatch.setattr(scheduler_module, "job_history", history)
+
+    async def run_jobs(count: int):
+        scheduler = JobScheduler(max_concurrency=2, fast_lane_slots=0)
+        release = asyncio.Event()
+        release.set()
+        jobs = [scheduler.submit(1, "iş", blocking_job(release)) for _ in range(count)]
+        await asyncio.gather(*(job.wait() for job in jobs))
+        await history.flush()
+        return [job.job_id for job in jobs]
+
+    first = asyncio.run(run_jobs(3))
+    # Yeni süreç: aynı geçmiş dosyası, yeni zamanlayıcı
+    second = asyncio.run(run_jobs(2))
+    asyncio.run(history.close())
+
+    assert first == ["0001", "0002", "0003"]
+    assert second == ["0004", "0005"]
@@ -0,0 +1,67 @@
+"""Telegram gönderim sınırlayıcısı (utils/telegram_sender.py): medya grupları"""
+import asyncio
+import time
+
+from aiogram.methods import SendMediaGroup, SendMessage
+from aiogram.types import InputMediaDocument
+
+from config import config
+from utils.telegram_sender import TelegramRateLimiter
+
+
+def run_requests(limiter, methods):
+    sent = []
+
+    async def make_request(bot, method):
+        sent.append(method)
+        return True
+
+    async def main():
+        started = time.monotonic()
+        for method in methods:
+            await limiter(make_request, None, method)
+        return time.monotonic() - started
+
+    return asyncio.run(main()), sent
+
+
+def media_group(chat_id: int, count: int) -> SendMediaGroup:
+    return SendMediaGroup(
+        chat_id=chat_id,
+        media=[InputMediaDocument(media=f"file_{index}") for index in range(count)],
+    )
+
+
+def test_media_group_uses_one_chat_token_per_file(monkeypatch):
+    # Sohbet başına saniyede 10 mesaj (token başına 0.1 sn), genel limit engel olmasın
+    monkeypatch.setattr(config, "TG_CHAT_RATE_PER_MINUTE", 600)
+    monkeypatch.setattr(config, "TG_GLOBAL_RATE", 1000)
+    limiter = TelegramRateLimiter()
+
+    elapsed, sent = run_requests(limiter, [media_group(42, 5)])
+
+    # İlk dosya kapasiteden, kalan 4 dosya 0.1 sn aralıkla
+    assert len(sent) == 1
+    assert elapsed >= 0.35
+
+
+def test_media_group_larger_than_global_capacity(monkeypatch):
+    monkeypatch.setattr(config, "TG_CHAT_RATE_PER_MINUTE", 60000)
+    monkeypatch.setattr(config, "TG_GLOBAL_RATE", 4)  # kapasite 4, token başına 0.25 sn
+    limiter = TelegramRateLimiter()
+
+    elapsed, _ = run_requests(limiter, [media_group(42, 6)])
+
+    # 4 dosya kapasiteden, 2 dosya için 0.5 sn
+    assert elapsed >= 0.45
+
+
+def test_single_messages_not_delayed_across_chats(monkeypatch):
+    monkeypatch.setattr(config, "TG_CHAT_RATE_PER_MINUTE", 60)
+    monkeypatch.setattr(config, "TG_GLOBAL_RATE", 1000)
+    limiter = TelegramRateLimiter()
+
+    elapsed, sent = run_requests(limiter, [SendMessage(chat_id=chat_id, text="x") for chat_id in range(1, 6)])
+
+    assert len(sent) == 5
+    assert elapsed < 0.2
@@ -0,0 +1,203 @@
+# Mail Throughput Benchmark (tools/mail_benchmark.py)
+"""
+Mailer değişikliklerini gerçek posta kutularına dokunmadan ölçer.
+Yerel SMTP sink'i başlatır, config'i ona yönlendirir ve iki yolu sürer:
+- direct: send_email_with_attachment'ı alıcı sayısı kadar paralel çağırır
+- stage : process_excel_task'ın mail aşamasını (send_group_emails) çalıştırır
+
+Her senaryo için mesaj/sn, byte/sn ve p50/p95 gecikme raporlanır.
+
+Örnek:
+    python -m tools.mail_benchmark --recipients 1,10,50 --sizes 50KB,1MB --security starttls
+    python -m tools.mail_benchmark --mode stage --latency 0.02 --fail-rate 0.1 --no-rate-limit
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from config import config
+from utils.logger import logger
+from utils.mailer import send_email_with_attachment
+from utils.mail_dispatcher import mail_dispatcher
+from utils.smtp_trace import PHASES, percentile, smtp_trace_store
+from jobs.process_excel import send_group_emails
+from tools.smtp_sink import SmtpSink, generate_self_signed_cert
+
+SIZE_UNITS = {"KB": 1024, "MB": 1024 * 1024, "B": 1}
+
+
+def parse_size(text: str) -> int:
+    """'50KB', '2MB', '1000' → byte"""
+    text = text.strip().upper()
+    for unit, factor in SIZE_UNITS.items():
+        if text.endswith(unit):
+            return int(float(text[: -len(unit)]) * factor)
+    return int(text)
+
+
+def make_attachment(directory: Path, size: int) -> Path:
+    """Sıkıştırılamaz (rastgele) içerikli sahte xlsx eki"""
+    path = directory / f"bench_{size}.xlsx"
+    if not path.exists():
+        path.write_bytes(os.urandom(size))
+    return path
+
+
+async def run_direct(recipients: int, attachment: Path) -> Dict[str, Any]:
+    latencies: List[float] = []
+
+    async def one(index: int) -> bool:
+        started = time.perf_counter()
+        ok = await send_email_with_attachment(
+            [f"alici{index}@bench.local"], "Benchmark", "Benchmark mesajı", attachment,
+            max_retries=config.MAX_EMAIL_RETRIES,
+        )
+        latencies.append(time.perf_counter() - started)
+        return ok
+
+    results = await asyncio.gather(*(one(i) for i in range(recipients)), return_exceptions=True)
+    successes = sum(1 for r in results if r is True)
+    return {"success": successes, "failed": recipients - successes, "latencies": latencies}
+
+
+async def run_stage(recipients: int, attachment: Path) -> Dict[str, Any]:
+    output_files = {
+        "bench": {"path": attachment, "row_count": 1, "filename": attachment.name}
+    }
+    group_info = {
+        "group_id": "bench",
+        "group_name": "Benchmark",
+        "email_recipients": [f"alici{i}@bench.local" for i in range(recipients)],
+    }
+    results = await send_group_emails(output_files, group_lookup=lambda _gid: group_info)
+    successes = sum(1 for r in results if r["success"])
+    return {
+        "success": successes,
+        "failed": len(results) - successes,
+        "latencies": [r["elapsed"] for r in results if "elapsed" in r],
+    }
+
+
+async def run_benchmark(args) -> List[Dict[str, Any]]:
+    work_dir = Path(tempfile.mkdtemp(prefix="mail_bench_"))
+    certfile = keyfile = None
+    if args.security != "none":
+        certfile, keyfile = generate_self_signed_cert(work_dir)
+
+    sink = SmtpSink(
+        host="127.0.0.1",
+        security=args.security,
+        certfile=certfile,
+        keyfile=keyfile,
+        latency=args.latency,
+        fail_rate=args.fail_rate,
+        fail_stage=args.fail_stage,
+        seed=42,
+    )
+    port = await sink.start()
+
+    # Benchmark izleri gerçek logs/smtp_trace.jsonl dosyasına karışmasın
+    smtp_trace_store.path = work_dir / "smtp_trace.jsonl"
+    smtp_trace_store.records.clear()
+
+    # Mailer'ı sink'e yönlendir
+    config.SMTP_SERVER = "localhost"
+    config.SMTP_PORTS = [port]
+    config.SMTP_SECURITY = args.security
+    config.SMTP_CA_FILE = str(certfile) if certfile else ""
+    config.SMTP_USERNAME = "bench@bench.local"
+    config.SMTP_PASSWORD = "bench"
+    config.MAX_EMAIL_RETRIES = args.retries
+    if args.no_rate_limit:
+        config.MAIL_RATE_PER_MINUTE = 10 ** 9
+        config.MAIL_BYTES_PER_MINUTE = 10 ** 15
+
+    runners = {"direct": run_direct, "stage": run_stage}
+    modes = ["direct", "stage"] if args.mode == "both" else [args.mode]
+    rows = []
+
+    try:
+        for mode in modes:
+            for recipients in args.recipients:
+                for size in args.sizes:
+                    attachment = make_attachment(work_dir, size)
+                    mail_dispatcher.reset()
+                    bytes_before = sink.stats.bytes_received
+
+                    started = time.perf_counter()
+                    result = await runners[mode](recipients, attachment)
+                    wall = time.perf_counter() - started
+
+                    received = sink.stats.bytes_received - bytes_before
+                    rows.append({
+                        "mode": mode,
+                        "recipients": recipients,
+                        "size": size,
+                        "ok": result["success"],
+                        "failed": result["failed"],
+                        "wall": wall,
+                        "msg_per_sec": result["success"] / wall if wall else 0.0,
+                        "bytes_per_sec": received / wall if wall else 0.0,
+                        "p50": percentile(result["latencies"], 50),
+                        "p95": percentile(result["latencies"], 95),
+                    })
+    finally:
+        await sink.stop()
+
+    return rows
+
+
+def print_report(rows: List[Dict[str, Any]]):
+    header = f"{'mod':<7}{'alıcı':>7}{'ek':>10}{'ok':>6}{'hata':>6}{'süre(s)':>9}{'msg/s':>9}{'MB/s':>8}{'p50(s)':>9}{'p95(s)':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['mode']:<7}{row['recipients']:>7}{row['size'] / 1024:>8.0f}KB"
+            f"{row['ok']:>6}{row['failed']:>6}{row['wall']:>9.2f}"
+            f"{row['msg_per_sec']:>9.1f}{row['bytes_per_sec'] / (1024 * 1024):>8.2f}"
+            f"{row['p50']:>9.3f}{row['p95']:>9.3f}"
+        )
+
+    # Tüm teslimatların aşama bazlı SMTP süreleri
+    summary = smtp_trace_store.summary()
+    print()
+    print(f"{'aşama':<10}{'adet':>7}{'p50(ms)':>10}{'p95(ms)':>10}")
+    for phase in PHASES:
+        if phase in summary["phases"]:
+            stats = summary["phases"][phase]
+            print(f"{phase:<10}{stats['count']:>7}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mail throughput benchmark (yerel SMTP sink ile)")
+    parser.add_argument("--mode", choices=["direct", "stage", "both"], default="both")
+    parser.add_argument("--recipients", default="1,10,50", help="Virgülle ayrılmış alıcı sayıları")
+    parser.add_argument("--sizes", default="50KB,1MB", help="Virgülle ayrılmış ek boyutları")
+    parser.add_argument("--security", choices=["none", "ssl", "starttls"], default="none")
+    parser.add_argument("--latency", type=float, default=0.0, help="Sink yanıt gecikmesi (sn)")
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--fail-stage", default="data")
+    parser.add_argument("--retries", type=int, default=config.MAX_EMAIL_RETRIES)
+    parser.add_argument("--no-rate-limit", action="store_true", help="Dispatcher hız limitlerini kapat")
+    parser.add_argument("--verbose", action="store_true", help="Mailer loglarını göster")
+    args = parser.parse_args()
+
+    args.recipients = [int(x) for x in args.recipients.split(",") if x.strip()]
+    args.sizes = [parse_size(x) for x in args.sizes.split(",") if x.strip()]
+
+    if not args.verbose:
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+
+    rows = asyncio.run(run_benchmark(args))
+    print_report(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+# Yerel SMTP Test Sunucusu (tools/smtp_sink.py)
+"""
+Gerçek posta kutularına mail atmadan mailer'ı ölçmek için yerel SMTP "sink".
+aiosmtpd benzeri ama bağımlılıksız (sadece asyncio):
+- Güvenlik: none, ssl (465 tarzı), starttls (587 tarzı)
+- AUTH PLAIN / LOGIN her kimliği kabul eder
+- Her komut öncesi yapay gecikme (latency)
+- Belirli aşamada olasılıklı hata enjeksiyonu (ör. DATA'da 451)
+
+Tek başına çalıştırma:
+    python -m tools.smtp_sink --port 2525 --security starttls --cert cert.pem --key key.pem
+"""
+import argparse
+import asyncio
+import random
+import ssl
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+FAIL_STAGES = ("connect", "auth", "mail", "rcpt", "data")
+
+
+@dataclass
+class ReceivedMessage:
+    mail_from: str
+    rcpt_to: List[str]
+    size: int              # DATA ile alınan byte (dot-stuffing çözülmüş)
+    received_at: float     # time.monotonic()
+
+
+@dataclass
+class SinkStats:
+    connections: int = 0
+    messages: int = 0
+    bytes_received: int = 0
+    injected_failures: int = 0
+    received: List[ReceivedMessage] = field(default_factory=list)
+
+
+def generate_self_signed_cert(directory: Path) -> Tuple[Path, Path]:
+    """openssl ile localhost için self-signed sertifika üretir (cert, key)"""
+    cert_path = directory / "smtp_sink_cert.pem"
+    key_path = directory / "smtp_sink_key.pem"
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", str(key_path), "-out", str(cert_path), "-days", "1",
+            "-subj", "/CN=localhost",
+            "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1",
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert_path, key_path
+
+
+class SmtpSink:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        security: str = "none",
+        certfile: Optional[Path] = None,
+        keyfile: Optional[Path] = None,
+        latency: float = 0.0,
+        fail_rate: float = 0.0,
+        fail_stage: str = "data",
+        fail_code: int = 451,
+        seed: Optional[int] = None,
+        keep_messages: bool = False,
+    ):
+        if security not in ("none", "ssl", "starttls"):
+            raise ValueError(f"Geçersiz güvenlik modu: {security}")
+        if fail_stage not in FAIL_STAGES:
+            raise ValueError(f"Geçersiz hata aşaması: {fail_stage}")
+        if security != "none" and not (certfile and keyfile):
+            raise ValueError("TLS için certfile ve keyfile gerekli")
+
+        self.host = host
+        self.port = port
+        self.security = security
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.fail_stage = fail_stage
+        self.fail_code = fail_code
+        self.keep_messages = keep_messages
+        self.stats = SinkStats()
+        self._random = random.Random(seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+        self._ssl_context = None
+        if security != "none":
+            self._ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            self._ssl_context.load_cert_chain(str(certfile), str(keyfile))
+
+    async def start(self) -> int:
+        """Sunucuyu başlatır, dinlenen portu döndürür"""
+        self._server = await asyncio.start_server(
+            self._handle_client,
+            self.host,
+            self.port,
+            ssl=self._ssl_context if self.security == "ssl" else None,
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def _should_fail(self, stage: str) -> bool:
+        if self.fail_rate <= 0 or stage != self.fail_stage:
+            return False
+        if self._random.random() < self.fail_rate:
+            self.stats.injected_failures += 1
+            return True
+        return False
+
+    async def _reply(self, writer: asyncio.StreamWriter, line: str):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        writer.write(line.encode("ascii") + b"\r\n")
+        await writer.drain()
+
+    def _ehlo_lines(self, tls_active: bool) -> List[str]:
+        lines = ["250-localhost", "250-8BITMIME", "250-SIZE 104857600", "250-AUTH PLAIN LOGIN"]
+        if self.security == "starttls" and not tls_active:
+            lines.append("250-STARTTLS")
+        lines.append("250 OK")
+        return lines
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats.connections += 1
+        tls_active = self.security == "ssl"
+        mail_from, rcpt_to = "", []
+
+        try:
+            if self._should_fail("connect"):
+                await self._reply(writer, f"{self.fail_code} Servis geçici olarak kullanılamıyor")
+                return
+            await self._reply(writer, "220 localhost SMTP sink hazir")
+
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    return
+                line = raw.decode("utf-8", "replace").rstrip("\r\n")
+                verb = line.split(" ", 1)[0].upper()
+                arg = line[len(verb):].strip()
+
+                if verb in ("EHLO", "HELO"):
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    lines = self._ehlo_lines(tls_active) if verb == "EHLO" else ["250 localhost"]
+                    writer.write("\r\n".join(lines).encode("ascii") + b"\r\n")
+                    await writer.drain()
+
+                elif verb == "STARTTLS":
+                    if self.security != "starttls" or tls_active:
+                        await self._reply(writer, "503 STARTTLS kullanilamaz")
+                        continue
+                    await self._reply(writer, "220 TLS baslatiliyor")
+                    await writer.start_tls(self._ssl_context)
+                    tls_active = True
+
+                elif verb == "AUTH":
+                    mechanism = arg.split(" ", 1)[0].upper()
+                    if mechanism == "LOGIN":
+                        # Kullanıcı adı ve şifre base64 olarak iki adımda gelir
+                        await self._reply(writer, "334 VXNlcm5hbWU6")
+                        await reader.readline()
+                        await self._reply(writer, "334 UGFzc3dvcmQ6")
+                        await reader.readline()
+                    elif mechanism == "PLAIN" and " " not in arg:
+                        await self._reply(writer, "334 ")
+                        await reader.readline()
+                    if self._should_fail("auth"):
+                        await self._reply(writer, f"{self.fail_code} Kimlik dogrulama basarisiz")
+                    else:
+                        await self._reply(writer, "235 Kimlik dogrulandi")
+
+                elif verb == "MAIL":
+                    if self._should_fail("mail"):
+                        await self._reply(writer, f"{self.fail_code} Gonderici reddedildi")
+                        continue
+                    mail_from, rcpt_to = arg.partition(":")[2].strip(), []
+                    await self._reply(writer, "250 OK")
+
+                elif verb == "RCPT":
+                    if self._should_fail("rcpt"):
+                        await self._reply(writer, f"{self.fail_code} Alici reddedildi")
+                        continue
+                    rcpt_to.append(arg.partition(":")[2].strip())
+                    await self._reply(writer, "250 OK")
+
+                elif verb == "DATA":
+                    await self._reply(writer, "354 Veri bekleniyor")
+                    size = 0
+                    while True:
+                        chunk = await reader.readline()
+                        if not chunk or chunk == b".\r\n":
+                            break
+                        size += len(chunk) - (1 if chunk.startswith(b"..") else 0)
+
+                    if self._should_fail("data"):
+                        await self._reply(writer, f"{self.fail_code} Mesaj gecici olarak reddedildi")
+                        continue
+
+                    self.stats.messages += 1
+                    self.stats.bytes_received += size
+                    if self.keep_messages:
+                        self.stats.received.append(
+                            ReceivedMessage(mail_from, list(rcpt_to), size, time.monotonic())
+                        )
+                    await self._reply(writer, "250 OK mesaj alindi")
+
+                elif verb in ("RSET", "NOOP"):
+                    mail_from, rcpt_to = "", []
+                    await self._reply(writer, "250 OK")
+
+                elif verb == "QUIT":
+                    await self._reply(writer, "221 Gule gule")
+                    return
+
+                else:
+                    await self._reply(writer, "502 Komut desteklenmiyor")
+
+        except (ConnectionError, ssl.SSLError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+
+async def _serve_forever(args):
+    certfile, keyfile = args.cert, args.key
+    if args.security != "none" and not (certfile and keyfile):
+        certfile, keyfile = generate_self_signed_cert(Path(tempfile.mkdtemp()))
+        print(f"🔐 Self-signed sertifika: {certfile} (mailer için SMTP_CA_FILE olarak verin)")
+
+    sink = SmtpSink(
+        host=args.host,
+        port=args.port,
+        security=args.security,
+        certfile=certfile,
+        keyfile=keyfile,
+        latency=args.latency,
+        fail_rate=args.fail_rate,
+        fail_stage=args.fail_stage,
+        fail_code=args.fail_code,
+    )
+    port = await sink.start()
+    print(f"📭 SMTP sink dinleniyor: {args.host}:{port} ({args.security})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await sink.stop()
+        print(f"📊 {sink.stats.messages} mesaj, {sink.stats.bytes_received} byte alındı")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yerel SMTP test sunucusu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2525)
+    parser.add_argument("--security", choices=["none", "ssl", "starttls"], default="none")
+    parser.add_argument("--cert", type=Path)
+    parser.add_argument("--key", type=Path)
+    parser.add_argument("--latency", type=float, default=0.0, help="Her yanıt öncesi gecikme (sn)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Hata olasılığı (0-1)")
+    parser.add_argument("--fail-stage", choices=FAIL_STAGES, default="data")
+    parser.add_argument("--fail-code", type=int, default=451)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_serve_forever(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
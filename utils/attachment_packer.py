@@ -0,0 +1,143 @@
+#Ek Paketleyici (utils/attachment_packer.py)
+"""
+Sağlayıcı ek limitini aşan çıktı dosyalarını gönderilebilir parçalara çevirir:
+1. Limit altındaysa dosya olduğu gibi gönderilir
+2. Aşıyorsa zip'e (deflated/stored) paketlenir
+3. Zip de aşıyorsa satır aralıklarına bölünür → numaralı seri (1/3, 2/3, 3/3)
+"""
+import math
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+from config import config
+from utils.disk_usage import disk_usage
+from utils.logger import logger
+
+MAX_SPLIT_ROUNDS = 4  # Parça limiti aşarsa parça sayısı en fazla bu kadar kez ikiye katlanır
+
+
+def _single_part(path: Path, kind: str) -> Dict[str, Any]:
+    return {
+        "path": path,
+        "filename": path.name,
+        "part": 1,
+        "parts": 1,
+        "rows": None,
+        "size": path.stat().st_size,
+        "kind": kind,
+    }
+
+
+def _zip_file(path: Path) -> Path:
+    """Dosyayı yanına aynı isimli .zip olarak paketler"""
+    compression = zipfile.ZIP_STORED if config.ATTACHMENT_ZIP_MODE == "stored" else zipfile.ZIP_DEFLATED
+    zip_path = path.with_suffix(".zip")
+    with zipfile.ZipFile(zip_path, "w", compression, compresslevel=9 if compression == zipfile.ZIP_DEFLATED else None) as zipf:
+        zipf.write(path, path.name)
+    disk_usage.added(zip_path)
+    return zip_path
+
+
+def _save_part(writer, parts: List[Dict[str, Any]], first_row: int):
+    """Dolan parçayı kaydeder (dosya adı geçici: toplam parça sayısı henüz belli değil)"""
+    writer.save()
+    writer.close()
+    parts.append({
+        "path": writer.path,
+        "part": len(parts) + 1,
+        "rows": (first_row, first_row + writer.rows - 1),
+        "kind": "split",
+    })
+
+
+def _split_by_rows(path: Path, part_count: int, row_count: int) -> List[Dict[str, Any]]:
+    """Dosyayı satır aralıklarına göre en fazla part_count parçaya böler (satırlar akışla okunur)"""
+    from openpyxl import load_workbook
+    from utils.excel_pipeline import SheetWriter
+
+    per_part = max(1, math.ceil(row_count / part_count))
+    parts: List[Dict[str, Any]] = []
+    writer = None
+    written = 0
+
+    wb = load_workbook(filename=path, read_only=True)
+    try:
+        rows_iter = wb.active.iter_rows(values_only=True)
+        headers = list(next(rows_iter, ()))
+        for row in rows_iter:
+            if not any(row):
+                continue
+            if writer is None:
+                writer = SheetWriter(path.with_name(f"{path.stem}_part{len(parts) + 1}{path.suffix}"), headers)
+            writer.append(row)
+            written += 1
+            if writer.rows >= per_part:
+                _save_part(writer, parts, written - writer.rows + 2)  # Excel satır numarası (başlık 1. satır)
+                writer = None
+        if writer is not None:
+            _save_part(writer, parts, written - writer.rows + 2)
+    finally:
+        if writer is not None:
+            writer.close()
+        wb.close()
+
+    # Parça sayısı artık belli → numaralı son isimler
+    for part in parts:
+        final_path = path.with_name(f"{path.stem}_part{part['part']}of{len(parts)}{path.suffix}")
+        part["path"].replace(final_path)
+        disk_usage.removed(part["path"])
+        disk_usage.added(final_path)
+        part.update(path=final_path, filename=final_path.name, parts=len(parts), size=final_path.stat().st_size)
+    return parts
+
+
+def prepare_attachment_parts(file_info: Dict[str, Any], limit: int = None) -> List[Dict[str, Any]]:
+    """
+    Çıktı dosyasını ek limitine göre gönderilebilir parçalara çevirir.
+    Dönen her parça: path, filename, part, parts, rows (satır aralığı), size, kind
+    kind: original | zip | split
+    Bölünecek veri satırı yoksa boş liste döner (gönderilecek ek yok).
+    """
+    limit = limit or config.MAX_ATTACHMENT_BYTES
+    path = Path(file_info["path"])
+    size = path.stat().st_size
+
+    if size <= limit:
+        return [_single_part(path, "original")]
+
+    logger.info(f"📦 {path.name} ek limitini aşıyor ({size / 1024 / 1024:.1f} MB > {limit / 1024 / 1024:.1f} MB), zip deneniyor")
+
+    # 1. Zip'e paketle
+    zip_path = _zip_file(path)
+    if zip_path.stat().st_size <= limit:
+        logger.info(f"📦 Zip yeterli: {zip_path.name} ({zip_path.stat().st_size / 1024 / 1024:.1f} MB)")
+        return [_single_part(zip_path, "zip")]
+    disk_usage.unlink(zip_path)
+
+    # 2. Satır aralıklarına böl (tahmini parça sayısı + %10 pay)
+    row_count = file_info.get("row_count") or 0
+    part_count = math.ceil(size * 1.1 / limit)
+    for split_round in range(MAX_SPLIT_ROUNDS):
+        parts = _split_by_rows(path, part_count, row_count)
+        if (
+            split_round == MAX_SPLIT_ROUNDS - 1  # Son turun dosyaları (limit üstü olsa da) gönderilir
+            or all(part["size"] <= limit for part in parts)
+            or len(parts) >= row_count
+        ):
+            break
+        # Parçalardan biri hala büyük → parça sayısını artır ve yeniden böl
+        for part in parts:
+            disk_usage.unlink(part["path"])
+        part_count *= 2
+
+    if not parts:
+        logger.warning(f"⚠️ {path.name} bölünemedi: veri satırı yok")
+        return []
+
+    oversized = [part["filename"] for part in parts if part["size"] > limit]
+    if oversized:
+        logger.warning(f"⚠️ Bölme sonrası hala limit üstü parçalar: {oversized}")
+
+    logger.info(f"✂️ {path.name} {len(parts)} parçaya bölündü")
+    return parts
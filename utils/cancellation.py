@@ -0,0 +1,35 @@
+#İptal Belirteci (utils/cancellation.py)
+"""
+Çalışan bir işi durdurmak için paylaşılan belirteç.
+threading.Event tabanlıdır: hem event loop'ta hem de asyncio.to_thread ile
+çalışan Excel temizleme / ayırma döngülerinde kontrol edilebilir.
+"""
+import threading
+from typing import Optional
+
+
+class JobCancelled(Exception):
+    """İş kullanıcı tarafından iptal edildi"""
+
+
+class CancellationToken:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        """İptal edildiyse JobCancelled fırlatır (döngülerde her adımda çağrılır)"""
+        if self._event.is_set():
+            raise JobCancelled("İşlem iptal edildi")
+
+
+def check_cancelled(token: Optional[CancellationToken]):
+    """Belirteç verilmişse iptal kontrolü yapar"""
+    if token is not None:
+        token.raise_if_cancelled()
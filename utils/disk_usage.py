@@ -0,0 +1,161 @@
+#Disk Kullanımı (utils/disk_usage.py)
+"""
+input / output / logs / groups dizinlerinin boyutu her seferinde taranmaz, artımlı tutulur:
+- Dosya yazan / silen kod (pipeline, ek paketleyici, yüklemeler, temizlik komutları,
+  log rotasyonu) added() / removed() / unlink() ile bildirir → usage() O(1)
+- Büyüyen log dosyaları (bot.log, errors.log) "canlı" kayıtlıdır, boyutları okunurken stat edilir
+- DISK_RECONCILE_INTERVAL aralığında os.scandir taramasıyla (thread'de) düzeltilir;
+  Celery worker'larının yazdıkları ve dışarıdan yapılan değişiklikler böyle yakalanır
+- Dizin kotaları (INPUT_QUOTA_MB, OUTPUT_QUOTA_MB, LOGS_QUOTA_MB): yeni yükleme kota aşımında reddedilir
+"""
+import asyncio
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import config
+from utils.logger import logger
+
+
+def format_size(size: int) -> str:
+    return f"{size / (1024 * 1024):.2f} MB"
+
+
+def scan_directory(directory: Path) -> Dict[str, int]:
+    """Dizindeki tüm dosyalar (alt dizinler dahil) → boyut; os.scandir ile tek stat"""
+    sizes: Dict[str, int] = {}
+    stack = [str(directory)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            sizes[entry.path] = entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue  # Tarama sırasında silinmiş
+        except OSError:
+            continue
+    return sizes
+
+
+class DiskUsage:
+    def __init__(self):
+        self._files: Dict[str, Dict[str, int]] = {}  # dizin → {dosya → boyut}
+        self._totals: Dict[str, int] = {}
+        self._quotas: Dict[str, int] = {}
+        self._live: Dict[str, List[str]] = {}  # dizin → boyutu okunurken stat edilen dosyalar
+        self._lock = threading.Lock()  # Pipeline dosyaları thread'de yazar
+
+    def track(self, directory: Path, quota_bytes: int = 0):
+        """Dizini izlemeye alır (ilk boyut reconcile ile hesaplanır)"""
+        key = str(directory.absolute())
+        with self._lock:
+            self._files.setdefault(key, {})
+            self._totals.setdefault(key, 0)
+            self._quotas[key] = quota_bytes
+
+    def add_live_file(self, path: Path):
+        """Sürekli büyüyen dosya (aktif log): kayıtlı boyut yerine her okumada stat edilir"""
+        owner = self._owner(str(path.absolute()))
+        if owner is not None:
+            self._live.setdefault(owner, []).append(str(path.absolute()))
+
+    def _owner(self, path: str) -> Optional[str]:
+        for directory in self._files:
+            if path.startswith(directory + os.sep):
+                return directory
+        return None
+
+    def _set(self, path: Path, size: Optional[int]):
+        key = str(path.absolute())
+        owner = self._owner(key)
+        if owner is None:
+            return  # İzlenmeyen dizin (geçici dosyalar vb.)
+        with self._lock:
+            files = self._files[owner]
+            previous = files.pop(key, 0)
+            if size is not None:
+                files[key] = size
+            self._totals[owner] += (size or 0) - previous
+
+    def added(self, path: Path, size: Optional[int] = None):
+        """Dosya yazıldı / büyüdü (size verilmezse stat edilir)"""
+        if size is None:
+            try:
+                size = path.stat().st_size
+            except OSError:
+                return
+        self._set(path, size)
+
+    def removed(self, path: Path):
+        """Dosya silindi: kayıtlı boyutu düşülür"""
+        self._set(path, None)
+
+    def unlink(self, path: Path):
+        """Dosyayı siler ve kullanımdan düşer"""
+        path.unlink(missing_ok=True)
+        self._set(path, None)
+
+    def usage(self, directory: Path) -> int:
+        key = str(directory.absolute())
+        total = self._totals.get(key)
+        if total is None:
+            return sum(scan_directory(directory).values())  # İzlenmeyen dizin: tek seferlik tarama
+        for live in self._live.get(key, ()):
+            try:
+                total += os.stat(live).st_size - self._files[key].get(live, 0)
+            except OSError:
+                pass
+        return total
+
+    def formatted(self, directory: Path) -> str:
+        return format_size(self.usage(directory))
+
+    def over_quota(self, directory: Path, incoming: int = 0) -> bool:
+        """Dizine incoming byte eklenirse kota aşılır mı (kota yoksa False)"""
+        quota = self._quotas.get(str(directory.absolute()), 0)
+        return quota > 0 and self.usage(directory) + incoming > quota
+
+    def rescan(self, directory: Path) -> int:
+        """Tek dizini yeniden tarar (senkron; log dizini gibi az dosyalı dizinler için), farkı döndürür"""
+        key = str(directory.absolute())
+        if key not in self._files:
+            return 0
+        sizes = scan_directory(directory)
+        with self._lock:
+            drift = sum(sizes.values()) - self._totals[key]
+            self._files[key] = sizes
+            self._totals[key] = sum(sizes.values())
+        return drift
+
+    async def reconcile(self):
+        """Tüm izlenen dizinleri thread'de tarayıp kayıtları düzeltir"""
+        for key in list(self._files):
+            drift = await asyncio.to_thread(self.rescan, Path(key))
+            if drift and abs(drift) > 1024 * 1024:
+                logger.info(f"💾 Disk kullanımı düzeltildi: {Path(key).name} ({drift / 1024 / 1024:+.1f} MB)")
+            quota = self._quotas.get(key, 0)
+            if quota and self._totals[key] > quota:
+                logger.warning(f"💾 {Path(key).name} kotası aşıldı: {format_size(self._totals[key])} / {format_size(quota)}")
+
+    async def watch(self, interval: float):
+        """Başlangıçta ve her interval saniyede bir reconcile eder"""
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Disk kullanımı taranamadı: {e}")
+            await asyncio.sleep(interval)
+
+
+# Global disk usage instance
+disk_usage = DiskUsage()
+disk_usage.track(config.INPUT_DIR, config.INPUT_QUOTA_BYTES)
+disk_usage.track(config.OUTPUT_DIR, config.OUTPUT_QUOTA_BYTES)
+disk_usage.track(config.LOGS_DIR, config.LOGS_QUOTA_BYTES)
+disk_usage.track(config.GROUPS_DIR)
@@ -0,0 +1,92 @@
+#Telegram Dosya Gönderimi (utils/document_delivery.py)
+"""
+Çıktı dosyalarını Telegram'a toplu gönderir:
+- Dosyalar belleğe okunmaz, diskten akışla yüklenir (FSInputFile)
+- 10'arlı medya grupları → dosya başına değil grup başına bir API çağrısı
+- Dosya sayısı TG_ZIP_FILE_COUNT'u veya toplam boyut TG_ZIP_TOTAL_MB'yi aşarsa tek zip
+"""
+import asyncio
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+from aiogram import Bot
+from aiogram.types import FSInputFile, InputMediaDocument
+
+from config import config
+from utils.logger import logger
+
+MEDIA_GROUP_SIZE = 10                 # Telegram medya grubu sınırı
+TELEGRAM_UPLOAD_LIMIT = 50 * 1024 * 1024  # Bot API yükleme sınırı
+
+
+def _zip_files(files: List[Dict[str, Any]]) -> Path:
+    fd, name = tempfile.mkstemp(prefix="ciktilar_", suffix=".zip")
+    os.close(fd)
+    with zipfile.ZipFile(name, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for file_info in files:
+            zipf.write(file_info["path"], file_info["filename"])
+    return Path(name)
+
+
+async def _send_groups(bot: Bot, chat_id: int, files: List[Dict[str, Any]]) -> int:
+    """Dosyaları 10'arlı medya grupları halinde gönderir, gönderilen dosya sayısını döndürür"""
+    sent = 0
+    for start in range(0, len(files), MEDIA_GROUP_SIZE):
+        chunk = files[start:start + MEDIA_GROUP_SIZE]
+        try:
+            if len(chunk) == 1:
+                await bot.send_document(
+                    chat_id,
+                    FSInputFile(chunk[0]["path"], filename=chunk[0]["filename"]),
+                    caption=f"📁 {chunk[0]['filename']}",
+                )
+            else:
+                await bot.send_media_group(chat_id, [
+                    InputMediaDocument(
+                        media=FSInputFile(file_info["path"], filename=file_info["filename"]),
+                        caption=f"📁 {file_info['filename']}",
+                    )
+                    for file_info in chunk
+                ])
+            sent += len(chunk)
+        except Exception as e:
+            logger.warning(f"Dosyalar gönderilemedi ({', '.join(f['filename'] for f in chunk)}): {e}")
+    return sent
+
+
+async def send_documents(bot: Bot, chat_id: int, files: List[Dict[str, Any]], zip_name: str = "ciktilar.zip") -> Dict[str, Any]:
+    """
+    Dosyaları (path, filename) sohbete gönderir.
+    Dönüş: success, sent (dosya sayısı), mode (group | zip)
+    """
+    files = [f for f in files if Path(f["path"]).exists()]
+    if not files:
+        return {"success": True, "sent": 0, "mode": "group"}
+
+    too_large = [f["filename"] for f in files if Path(f["path"]).stat().st_size > TELEGRAM_UPLOAD_LIMIT]
+    if too_large:
+        logger.warning(f"Telegram yükleme sınırını aşan dosyalar atlandı: {too_large}")
+        files = [f for f in files if f["filename"] not in too_large]
+
+    total = sum(Path(f["path"]).stat().st_size for f in files)
+    if len(files) > config.TG_ZIP_FILE_COUNT or total > config.TG_ZIP_TOTAL_BYTES:
+        zip_path = await asyncio.to_thread(_zip_files, files)
+        try:
+            if zip_path.stat().st_size <= TELEGRAM_UPLOAD_LIMIT:
+                await bot.send_document(
+                    chat_id,
+                    FSInputFile(zip_path, filename=zip_name),
+                    caption=f"📦 {len(files)} dosya",
+                )
+                return {"success": not too_large, "sent": len(files), "mode": "zip"}
+            logger.warning(f"Zip Telegram sınırını aşıyor ({zip_path.stat().st_size / 1024 / 1024:.1f} MB), gruplar halinde gönderiliyor")
+        except Exception as e:
+            logger.warning(f"Zip gönderilemedi, gruplar halinde gönderiliyor: {e}")
+        finally:
+            zip_path.unlink(missing_ok=True)
+
+    sent = await _send_groups(bot, chat_id, files)
+    return {"success": sent == len(files) and not too_large, "sent": sent, "mode": "group"}
@@ -0,0 +1,190 @@
+#Excel İşlem Hattı (utils/excel_pipeline.py)
+"""
+Yüklenen Excel'i tek geçişte okur ve satırları çıkışlara (sink) dağıtır:
+- Başlık satırı bulunur, TARİH → A, İL → B, diğer sütunlar C'den itibaren sıralanır
+  (eski temizleme adımıyla aynı kurallar, ara dosya yazılmadan)
+- Her satırın grupları bir kez hesaplanır, tüm çıkışlar aynı satırı alır
+- Çıkış dosyaları write-only yazılır; sütun genişlikleri ilk satırlardan hesaplanır
+Çıkışların teslimatı (mail, zip) jobs/process_excel.py'dedir.
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utils.cancellation import CancellationToken, check_cancelled
+from utils.disk_usage import disk_usage
+from utils.group_manager import DEFAULT_GROUP_ID, GroupIndex
+from utils.job_progress import report_progress
+from utils.logger import LogThrottle, logger
+
+HEADER_SEARCH_ROWS = 5      # Başlık satırı ilk 5 satırda aranır
+WIDTH_SAMPLE_ROWS = 500     # Sütun genişliği bu kadar satırdan hesaplanır
+PROGRESS_EVERY = 1000
+
+
+def resolve_columns(header_row: Sequence[Any]) -> Tuple[List[int], List[str]]:
+    """
+    Başlık satırından yeni sütun sırasını çıkarır.
+    Dönüş: (kaynak sütun indeksleri, yeni başlıklar) - ilk ikisi TARİH ve İL
+    """
+    headers = [
+        str(value).strip().upper() if value else f"UNKNOWN_{col}"
+        for col, value in enumerate(header_row, 1)
+    ]
+
+    date_idx = city_idx = None
+    for idx, header in enumerate(headers):
+        if "TARİH" in header:
+            date_idx = idx
+        elif "İL" in header and city_idx is None:
+            city_idx = idx
+
+    if date_idx is None or city_idx is None:
+        raise ValueError("TARİH veya İL sütunu bulunamadı")
+
+    others = [
+        idx for idx, header in enumerate(headers)
+        if idx not in (date_idx, city_idx) and header not in ("TARİH", "İL")
+    ]
+    return [date_idx, city_idx] + others, ["TARİH", "İL"] + [headers[idx] for idx in others]
+
+
+class SheetWriter:
+    """Tek sayfalık write-only Excel yazıcı (genişlikler ilk WIDTH_SAMPLE_ROWS satırdan)"""
+
+    def __init__(self, path: Path, headers: List[str], title: str = "Veriler"):
+        from openpyxl import Workbook  # Ağır paket: ilk işte yüklenir
+
+        self.path = path
+        self.headers = headers
+        self.rows = 0
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet(title)
+        self._sample: Optional[List[tuple]] = []
+
+    def append(self, row: tuple):
+        self.rows += 1
+        if self._sample is None:
+            self._ws.append(row)
+            return
+        self._sample.append(row)
+        if len(self._sample) >= WIDTH_SAMPLE_ROWS:
+            self._flush_sample()
+
+    def _flush_sample(self):
+        from openpyxl.utils import get_column_letter
+
+        widths = [len(str(header)) if header else 0 for header in self.headers]
+        for row in self._sample:
+            for idx, value in enumerate(row):
+                if value:
+                    widths[idx] = max(widths[idx], len(str(value)))
+        # write-only modda genişlikler ilk satırdan önce verilmeli
+        for idx, width in enumerate(widths, 1):
+            self._ws.column_dimensions[get_column_letter(idx)].width = min(25, max(width + 2, 10))
+        self._ws.append(self.headers)
+        for row in self._sample:
+            self._ws.append(row)
+        self._sample = None
+
+    def save(self):
+        if self._sample is not None:
+            self._flush_sample()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._wb.save(self.path)
+        disk_usage.added(self.path)
+
+    def close(self):
+        try:
+            self._wb.close()
+        except Exception:
+            pass
+
+
+class Sink:
+    """Çıkış temel sınıfı: open → write (her satır) → finish (dosyaları kaydet) → deliver → close"""
+
+    def open(self, headers: List[str], groups: GroupIndex, source: Path):
+        pass
+
+    def write(self, row: tuple, group_ids: Tuple[str, ...]):
+        pass
+
+    def finish(self):
+        pass
+
+    async def deliver(self, stats: Dict[str, Any], cancel_token: Optional[CancellationToken] = None) -> Dict[str, Any]:
+        return {"success": True}
+
+    def close(self):
+        pass
+
+
+def parse_into_sinks(
+    input_path: Path,
+    sinks: List[Sink],
+    groups: GroupIndex,
+    cancel_token: Optional[CancellationToken] = None
+) -> Dict[str, Any]:
+    """Excel'i tek geçişte okuyup satırları çıkışlara dağıtır (thread'de çalıştırılır)"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(filename=input_path, read_only=True)
+    try:
+        ws = wb.active
+        rows = ws.iter_rows(values_only=True)
+
+        header_row, skipped = None, 0
+        for row in rows:
+            skipped += 1
+            if any(row):
+                header_row = row
+                break
+            if skipped >= HEADER_SEARCH_ROWS:
+                break
+        if header_row is None:
+            raise ValueError("TARİH veya İL sütunu bulunamadı")
+
+        columns, headers = resolve_columns(header_row)
+        for sink in sinks:
+            sink.open(headers, groups, input_path)
+
+        total_rows = max(0, (ws.max_row or 0) - skipped)
+        logger.info(f"İşlenecek toplam satır: {total_rows}")
+
+        processed = matched = 0
+        unmatched_cities = set()
+        progress_log = LogThrottle()
+        for row in rows:
+            check_cancelled(cancel_token)
+            if not any(row):  # Boş satırları atla
+                continue
+
+            width = len(row)
+            out = tuple(row[idx] if idx < width else None for idx in columns)
+            group_ids = groups.groups_for_city(out[1])
+            if group_ids == (DEFAULT_GROUP_ID,):
+                unmatched_cities.add(str(out[1]))
+            else:
+                matched += 1
+
+            for sink in sinks:
+                sink.write(out, group_ids)
+
+            processed += 1
+            if processed % PROGRESS_EVERY == 0:
+                report_progress(processed, total_rows)
+                if progress_log.ready():
+                    logger.info(f"{processed}/{total_rows} satır işlendi")
+
+        logger.info(f"İşlem tamamlandı: {processed} satır")
+        if unmatched_cities:
+            logger.warning(f"Eşleşmeyen şehirler: {list(unmatched_cities)[:10]}{'...' if len(unmatched_cities) > 10 else ''}")
+
+        return {
+            "headers": headers,
+            "total_rows": processed,
+            "matched_rows": matched,
+            "unmatched_cities": list(unmatched_cities),
+        }
+    finally:
+        wb.close()
@@ -10,10 +10,13 @@ hata durumlarında uygun geri bildirim sağlar.
 # utils/file_utils.py
 
 import os
+import time
+import uuid
 from datetime import datetime
 from pathlib import Path
-import psutil
 from config import config
+from utils.disk_usage import disk_usage
+from utils.job_history import job_history
 
 async def get_recent_processed_files(limit: int = 10):
     """
@@ -25,7 +28,7 @@ async def get_recent_processed_files(limit: int = 10):
     if not output_dir.exists():
         return []
 
-    for file_path in sorted(output_dir.glob("*.xlsx"), key=lambda x: x.stat().st_mtime, reverse=True):
+    for file_path in sorted(output_dir.rglob("*.xlsx"), key=lambda x: x.stat().st_mtime, reverse=True):
         stat = file_path.stat()
         files.append({
             "name": file_path.name,
@@ -40,35 +43,41 @@ async def get_recent_processed_files(limit: int = 10):
 async def get_file_stats(detailed=False):
     """
     İşlenen dosya sayısı ve sistem kaynak kullanımı gibi bilgileri verir.
+    İş sayıları, satır ve mail toplamları iş geçmişinden (SQLite, indeksli sorgu) gelir.
     """
-    total_processed = len(list(config.OUTPUT_DIR.glob("*.xlsx")))
-    total_rows = 0
-    successful_processed = total_processed
-    failed_processed = 0
-    emails_sent = total_processed
+    summary = await job_history.summary()
 
     last_processed = "Yok"
-    files = sorted(config.OUTPUT_DIR.glob("*.xlsx"), key=lambda x: x.stat().st_mtime, reverse=True)
-    if files:
-        last_processed = datetime.fromtimestamp(files[0].stat().st_mtime).strftime("%d.%m.%Y %H:%M")
+    if summary["last_finished"]:
+        last_processed = datetime.fromtimestamp(summary["last_finished"]).strftime("%d.%m.%Y %H:%M")
+
+    import psutil
 
     process = psutil.Process()
     memory_usage = f"{process.memory_info().rss / 1024 / 1024:.1f} MB"
 
     stats = {
-        "total_processed": total_processed,
-        "total_rows": total_rows,
-        "successful_processed": successful_processed,
-        "failed_processed": failed_processed,
-        "emails_sent": emails_sent,
+        "total_processed": summary["jobs"],
+        "total_rows": summary["rows"],
+        "successful_processed": summary["successful"],
+        "failed_processed": summary["failed"],
+        "cancelled_processed": summary["cancelled"],
+        "emails_sent": summary["mails_sent"],
+        "emails_failed": summary["mails_failed"],
         "last_processed": last_processed,
         "memory_usage": memory_usage
     }
 
     if detailed:
+        now = time.time()
+        last_24h = await job_history.summary(since=now - 24 * 3600)
+        last_7d = await job_history.summary(since=now - 7 * 24 * 3600)
         stats.update({
-            "last_24h_processed": total_processed,
-            "last_7d_processed": total_processed,
+            "last_24h_processed": last_24h["jobs"],
+            "last_24h_rows": last_24h["rows"],
+            "last_7d_processed": last_7d["jobs"],
+            "last_7d_rows": last_7d["rows"],
+            "stage_averages": await job_history.stage_averages(now - 7 * 24 * 3600),
             "input_dir_size": get_directory_size(config.INPUT_DIR),
             "output_dir_size": get_directory_size(config.OUTPUT_DIR),
             "logs_dir_size": get_directory_size(config.LOGS_DIR),
@@ -79,10 +88,33 @@ async def get_file_stats(detailed=False):
 def get_directory_size(path: Path) -> str:
     """
     Verilen dizindeki tüm dosyaların toplam boyutunu MB cinsinden döner.
+    İzlenen dizinlerde (input/output/logs/groups) artımlı kayıttan okunur, dizin taranmaz.
     """
-    total_size = 0  # total_size_ yerine total_size
-    for file_path in path.rglob('*'):
-        if file_path.is_file():
-            total_size += file_path.stat().st_size
-    
-    return f"{total_size / (1024 * 1024):.2f} MB"  # total_size_ yerine total_size
+    return disk_usage.formatted(path)
+
+def job_input_path(file_name: str) -> Path:
+    """Yüklenen dosya için işe özel dizin: aynı isimli yüklemeler kuyruktaki işin girdisini ezmez"""
+    directory = config.INPUT_DIR / uuid.uuid4().hex[:12]
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / Path(file_name).name
+
+def remove_job_input(path: Path):
+    """İş bitince girdiyi ve işe özel dizinini siler"""
+    disk_usage.unlink(path)
+    if path.parent != config.INPUT_DIR:
+        try:
+            path.parent.rmdir()
+        except OSError:
+            pass
+
+def job_output_dir() -> Path:
+    """İşe özel çıktı dizini (aynı dakikada çalışan işlerin grup dosyaları çakışmaz); ilk kayıtta oluşur"""
+    return config.OUTPUT_DIR / f"{datetime.now().strftime('%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+def remove_empty_dirs(root: Path):
+    """Temizlikten sonra boş kalan iş dizinlerini siler"""
+    for directory in sorted((p for p in root.rglob("*") if p.is_dir()), reverse=True):
+        try:
+            directory.rmdir()
+        except OSError:
+            pass
@@ -0,0 +1,256 @@
+#FSM Durum Deposu (utils/fsm_storage.py)
+"""
+Kalıcı aiogram FSM deposu (yeniden başlatmada kullanıcıların bekleme durumu kaybolmaz):
+- sqlite: tek sunucu için dosya tabanlı (varsayılan data/fsm.sqlite3)
+- redis: birden fazla instance için (config.REDIS_URL)
+- memory: eski davranış (aiogram MemoryStorage)
+
+Okumalar süreç içi önbellekten yapılır (FSM_CACHE_TTL), arka uca sadece önbellekte
+olmayan anahtar için gidilir. Yazmalar önbelleğe hemen işlenir, arka uca
+FSM_FLUSH_INTERVAL aralığında tek transaction / pipeline ile toplu aktarılır.
+Çok instance'lı kurulumda FSM_CACHE_TTL kısa tutulmalı (veya 0).
+"""
+import asyncio
+import copy
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, StateType, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from config import config
+from utils.logger import logger
+
+# (state, data) çifti; state None ve data boşsa kayıt silinir
+Record = Tuple[Optional[str], Dict[str, Any]]
+
+
+def _is_empty(record: Record) -> bool:
+    return record[0] is None and not record[1]
+
+
+class SqliteBackend:
+    """Tek dosyalık SQLite arka ucu (işlemler thread'de, tek bağlantı üzerinden)"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS fsm ("
+                "key TEXT PRIMARY KEY, state TEXT, data TEXT NOT NULL, updated REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _load(self, key: str) -> Optional[Record]:
+        with self._lock:
+            row = self._connection().execute("SELECT state, data FROM fsm WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def _save_many(self, records: Dict[str, Record]):
+        now = time.time()
+        upserts = [
+            (key, state, json.dumps(data, ensure_ascii=False), now)
+            for key, (state, data) in records.items()
+            if not _is_empty((state, data))
+        ]
+        deletes = [(key,) for key, record in records.items() if _is_empty(record)]
+        with self._lock:
+            conn = self._connection()
+            with conn:  # Tek transaction
+                if upserts:
+                    conn.executemany(
+                        "INSERT INTO fsm (key, state, data, updated) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(key) DO UPDATE SET state = excluded.state, "
+                        "data = excluded.data, updated = excluded.updated",
+                        upserts,
+                    )
+                if deletes:
+                    conn.executemany("DELETE FROM fsm WHERE key = ?", deletes)
+
+    def _close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def load(self, key: str) -> Optional[Record]:
+        return await asyncio.to_thread(self._load, key)
+
+    async def save_many(self, records: Dict[str, Record]):
+        await asyncio.to_thread(self._save_many, records)
+
+    async def close(self):
+        await asyncio.to_thread(self._close)
+
+
+class RedisBackend:
+    """Redis arka ucu: anahtar başına tek JSON değer → okuma tek GET, yazma tek pipeline"""
+
+    def __init__(self, url: str, ttl: int = 0):
+        from redis.asyncio import Redis  # Sadece redis seçildiğinde yüklenir
+
+        self.redis = Redis.from_url(url)
+        self.ttl = ttl or None
+
+    async def load(self, key: str) -> Optional[Record]:
+        raw = await self.redis.get(key)
+        if raw is None:
+            return None
+        value = json.loads(raw)
+        return value.get("state"), value.get("data") or {}
+
+    async def save_many(self, records: Dict[str, Record]):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, (state, data) in records.items():
+                if _is_empty((state, data)):
+                    pipe.delete(key)
+                else:
+                    pipe.set(key, json.dumps({"state": state, "data": data}, ensure_ascii=False), ex=self.ttl)
+            await pipe.execute()
+
+    async def close(self):
+        close = getattr(self.redis, "aclose", None) or self.redis.close  # redis 5: aclose
+        await close()
+
+
+class CachedStorage(BaseStorage):
+    """Okuma önbellekli, toplu yazmalı FSM deposu (arka uç: SqliteBackend / RedisBackend)"""
+
+    def __init__(self, backend, flush_interval: float = 0.5, cache_ttl: float = 60):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.cache_ttl = cache_ttl
+        self.key_builder = DefaultKeyBuilder(prefix="fsm", with_destiny=True)
+        self._cache: Dict[str, List[Any]] = {}  # anahtar → [state, data, yüklenme zamanı]
+        self._dirty: Set[str] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._closed = False
+
+    async def _entry(self, key: StorageKey) -> Tuple[str, List[Any]]:
+        skey = self.key_builder.build(key)
+        entry = self._cache.get(skey)
+        now = time.monotonic()
+        if entry is not None and (skey in self._dirty or now - entry[2] < self.cache_ttl):
+            return skey, entry
+
+        record = await self.backend.load(skey)
+        # Yükleme sırasında yazılmış olabilir → yerel değişiklik önceliklidir
+        if skey in self._dirty:
+            return skey, self._cache[skey]
+        state, data = record or (None, {})
+        entry = [state, data, now]
+        self._cache[skey] = entry
+        return skey, entry
+
+    async def _mark_dirty(self, skey: str):
+        self._dirty.add(skey)
+        if self.flush_interval <= 0 or self._closed:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self):
+        """Bekleyen yazmaları arka uca tek seferde aktarır"""
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            keys, self._dirty = self._dirty, set()
+            records = {
+                key: (self._cache[key][0], copy.deepcopy(self._cache[key][1]))
+                for key in keys
+            }
+            try:
+                await self.backend.save_many(records)
+            except Exception as e:
+                # Yazılamayanlar bir sonraki flush'ta tekrar denenir
+                self._dirty |= keys
+                logger.error(f"FSM deposuna yazılamadı ({len(records)} kayıt): {e}")
+                if not self._closed:
+                    self._flush_task = asyncio.create_task(self._delayed_flush())
+                return
+            self._evict()
+
+    def _evict(self):
+        """Süresi dolmuş (ve yazılmış) önbellek kayıtlarını bırakır"""
+        now = time.monotonic()
+        expired = [
+            key for key, entry in self._cache.items()
+            if key not in self._dirty and now - entry[2] >= self.cache_ttl
+        ]
+        for key in expired:
+            del self._cache[key]
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        skey, entry = await self._entry(key)
+        entry[0] = state.state if isinstance(state, State) else state
+        await self._mark_dirty(skey)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        _, entry = await self._entry(key)
+        return entry[0]
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        skey, entry = await self._entry(key)
+        entry[1] = copy.deepcopy(data)
+        await self._mark_dirty(skey)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, entry = await self._entry(key)
+        return copy.deepcopy(entry[1])
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+        await self.backend.close()
+
+
+def create_fsm_storage() -> BaseStorage:
+    """config.FSM_STORAGE'a göre FSM deposunu oluşturur"""
+    kind = config.FSM_STORAGE
+    if kind == "memory":
+        logger.info("🗂️ FSM deposu: memory (yeniden başlatmada durumlar kaybolur)")
+        return MemoryStorage()
+
+    if kind == "redis":
+        try:
+            backend = RedisBackend(config.REDIS_URL, config.FSM_STATE_TTL)
+            logger.info("🗂️ FSM deposu: redis")
+        except ImportError as e:
+            logger.error(f"Redis FSM deposu kullanılamıyor ({e}), sqlite'a geçiliyor")
+            backend = None
+    else:
+        if kind != "sqlite":
+            logger.warning(f"Bilinmeyen FSM_STORAGE '{kind}', sqlite kullanılıyor")
+        backend = None
+
+    if backend is None:
+        path = Path(config.FSM_SQLITE_PATH) if config.FSM_SQLITE_PATH else config.DATA_DIR / "fsm.sqlite3"
+        backend = SqliteBackend(path)
+        logger.info(f"🗂️ FSM deposu: sqlite ({path})")
+
+    return CachedStorage(backend, config.FSM_FLUSH_INTERVAL, config.FSM_CACHE_TTL)
@@ -1,34 +1,292 @@
 #Grup Yöneticisi (utils/group_manager.py)
-
+"""
+Gruplar bir kez yüklenip değişmez (immutable) bir GroupIndex anlık görüntüsüne çevrilir:
+- grup id → grup (büyük/küçük harf duyarsız: grup_0 ve Grup_0 aynı grup)
+- normalize şehir → grup id'leri
+- alıcı e-posta → grup id'leri
+Yenileme yeni bir index oluşturup tek atamayla değiştirir; çalışan işler
+başta aldıkları index'i kullanmaya devam eder, yarım güncellenmiş veri görmez.
+watch() groups.json'u (mtime + boyut) izler, değişince index'i event loop dışında
+yeniden oluşturur, doğrular ve devreye alır - yeniden başlatma gerekmez.
+Oluşturulan index, groups.json içeriğinin sha256'sı ile birlikte marshal formatında
+groups.index.bin dosyasına yazılır; açılışta/worker'larda hash aynıysa şehir
+normalizasyonu tekrarlanmadan doğrudan yüklenir.
+"""
+import asyncio
+import hashlib
 import json
-from typing import Dict, List, Set
+import marshal
+import os
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
 from pathlib import Path
 from config import config
 from utils.logger import logger
 import unicodedata
 import re
 
+DEFAULT_GROUP_ID = "Grup_0"
+# normalize_city_name veya index yapısı değişirse artırın → eski önbellekler geçersiz sayılır
+INDEX_CACHE_FORMAT = 1
+
+# Türkçe karakterleri İngilizce karşılıklarına çevir
+_TURKISH_TO_ENGLISH = str.maketrans({
+    'ğ': 'g', 'Ğ': 'G',
+    'ı': 'i', 'İ': 'I',
+    'ö': 'o', 'Ö': 'O',
+    'ü': 'u', 'Ü': 'U',
+    'ş': 's', 'Ş': 'S',
+    'ç': 'c', 'Ç': 'C',
+    'â': 'a', 'Â': 'A',
+    'î': 'i', 'Î': 'I',
+    'û': 'u', 'Û': 'U'
+})
+_NON_ALNUM = re.compile(r'[^A-Z0-9\s]')
+_MULTI_SPACE = re.compile(r'\s+')
+
+
+def normalize_city_name(city_name: str) -> str:
+    """
+    Şehir ismini normalleştirir - Türkçe karakter sorununu çözer
+    """
+    if not city_name or not isinstance(city_name, str):
+        return ""
+    
+    # Unicode normalize (NFD form) ve Türkçe karakter dönüşümü
+    normalized = unicodedata.normalize('NFKD', city_name).translate(_TURKISH_TO_ENGLISH)
+    
+    # Büyük harfe çevir, boşlukları ve noktalamaları temizle
+    normalized = normalized.upper().strip()
+    normalized = _NON_ALNUM.sub('', normalized)  # Sadece harf, rakam ve boşluk
+    normalized = _MULTI_SPACE.sub(' ', normalized)  # Çoklu boşlukları tekilleştir
+    
+    return normalized
+
+
+def freeze_group(group: Mapping[str, Any]) -> Mapping[str, Any]:
+    """Grubun salt okunur kopyası (listeler tuple'a çevrilir); index'i paylaşan işler grubu değiştiremez"""
+    return MappingProxyType({
+        key: tuple(value) if isinstance(value, list) else value
+        for key, value in group.items()
+    })
+
+
+def default_group_info() -> Dict[str, Any]:
+    """Eşleşmeyen veriler için varsayılan grup bilgisi"""
+    return {
+        "group_id": DEFAULT_GROUP_ID,
+        "group_name": "Eşleşmeyen Veriler",
+        "cities": [],
+        "email_recipients": config.DEFAULT_EMAIL_RECIPIENTS if hasattr(config, 'DEFAULT_EMAIL_RECIPIENTS') else []
+    }
+
+
+class GroupIndex:
+    """Grupların değişmez, indeksli anlık görüntüsü (build() ile oluşturulur)"""
+    __slots__ = ("data", "groups", "by_id", "by_city", "by_recipient")
+    
+    data: Mapping[str, Any]                  # {"groups": (...)} yapısı (geriye uyumluluk)
+    groups: Tuple[Mapping[str, Any], ...]    # Dondurulmuş gruplar (freeze_group)
+    by_id: Mapping[str, Mapping[str, Any]]   # casefold grup id → grup
+    by_city: Mapping[str, Tuple[str, ...]]   # normalize şehir → grup id'leri
+    by_recipient: Mapping[str, Tuple[str, ...]]  # küçük harf e-posta → grup id'leri
+    
+    def __init__(self, data, groups, by_id, by_city, by_recipient):
+        object.__setattr__(self, "data", data)
+        object.__setattr__(self, "groups", groups)
+        object.__setattr__(self, "by_id", by_id)
+        object.__setattr__(self, "by_city", by_city)
+        object.__setattr__(self, "by_recipient", by_recipient)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("GroupIndex değiştirilemez, yeni index oluşturun")
+    
+    @classmethod
+    def build(cls, data: Dict[str, Any]) -> "GroupIndex":
+        """groups.json içeriğinden tüm indeksleri tek geçişte oluşturur"""
+        groups = tuple(freeze_group(group) for group in data.get("groups", []))
+        by_id: Dict[str, Mapping[str, Any]] = {}
+        # İç sözlükler sıralı küme gibi kullanılır (tekrarlar O(1) elenir)
+        by_city: Dict[str, Dict[str, None]] = {}
+        by_recipient: Dict[str, Dict[str, None]] = {}
+        
+        for group in groups:
+            group_id = group["group_id"]
+            by_id.setdefault(group_id.casefold(), group)
+            
+            # Bir şehir birden fazla gruba ait olabilir
+            for city in group.get("cities", []):
+                normalized_city = normalize_city_name(city)
+                if normalized_city:
+                    by_city.setdefault(normalized_city, {})[group_id] = None
+            
+            for recipient in group.get("email_recipients", []):
+                recipient = recipient.strip().lower()
+                if recipient:
+                    by_recipient.setdefault(recipient, {})[group_id] = None
+        
+        # Grup_0 için özel işlem
+        by_city[""] = {DEFAULT_GROUP_ID: None}
+        by_city["UNKNOWN"] = {DEFAULT_GROUP_ID: None}
+        
+        return cls(
+            MappingProxyType({"groups": groups}),
+            groups,
+            MappingProxyType(by_id),
+            MappingProxyType({city: tuple(ids) for city, ids in by_city.items()}),
+            MappingProxyType({email: tuple(ids) for email, ids in by_recipient.items()}),
+        )
+    
+    def to_payload(self) -> Dict[str, Any]:
+        """marshal ile yazılabilir yapı (sadece dict/list/tuple/str)"""
+        return {
+            "groups": [dict(group) for group in self.groups],
+            "by_city": dict(self.by_city),
+            "by_recipient": dict(self.by_recipient),
+        }
+    
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "GroupIndex":
+        """Önbellekten index'i normalizasyon yapmadan oluşturur"""
+        groups = tuple(freeze_group(group) for group in payload["groups"])
+        by_id: Dict[str, Mapping[str, Any]] = {}
+        for group in groups:
+            by_id.setdefault(group["group_id"].casefold(), group)
+        return cls(
+            MappingProxyType({"groups": groups}),
+            groups,
+            MappingProxyType(by_id),
+            MappingProxyType(payload["by_city"]),
+            MappingProxyType(payload["by_recipient"]),
+        )
+    
+    def groups_for_city(self, city_name: str) -> Tuple[str, ...]:
+        """Bir şehir adına karşılık gelen grup ID'lerini döndürür"""
+        if not city_name:
+            return (DEFAULT_GROUP_ID,)
+        return self.by_city.get(normalize_city_name(city_name), (DEFAULT_GROUP_ID,))
+    
+    def group(self, group_id: str) -> Optional[Mapping[str, Any]]:
+        """Grup id'ye göre (büyük/küçük harf duyarsız) grubu döndürür"""
+        return self.by_id.get(group_id.casefold()) if group_id else None
+    
+    def group_info(self, group_id: str) -> Mapping[str, Any]:
+        """Grup bilgisi, yoksa varsayılan (Eşleşmeyen Veriler) grup"""
+        return self.group(group_id) or default_group_info()
+    
+    def groups_for_recipient(self, email: str) -> Tuple[str, ...]:
+        """Alıcının kayıtlı olduğu grup ID'leri"""
+        return self.by_recipient.get((email or "").strip().lower(), ())
+    
+    def __len__(self) -> int:
+        return len(self.groups)
+
+
+def load_cached_index(cache_file: Path, digest: str) -> Optional[GroupIndex]:
+    """Önbellek groups.json'un bu içeriği için üretildiyse index'i döndürür"""
+    try:
+        # Tek okuma + loads: marshal.load dosyadan küçük parçalarla okuduğu için çok daha yavaş
+        payload = marshal.loads(cache_file.read_bytes())
+        if payload.get("format") != INDEX_CACHE_FORMAT or payload.get("sha256") != digest:
+            return None
+        return GroupIndex.from_payload(payload)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Grup index önbelleği okunamadı, yeniden oluşturulacak: {e}")
+        return None
+
+
+def save_cached_index(cache_file: Path, digest: str, index: GroupIndex):
+    """Index'i atomik olarak (geçici dosya + rename) önbelleğe yazar"""
+    payload = {"format": INDEX_CACHE_FORMAT, "sha256": digest, **index.to_payload()}
+    tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        tmp_file.write_bytes(marshal.dumps(payload))
+        os.replace(tmp_file, cache_file)
+    except Exception as e:
+        logger.warning(f"Grup index önbelleği yazılamadı: {e}")
+        tmp_file.unlink(missing_ok=True)
+
+
+def validate_groups(data: Any):
+    """groups.json yapısını doğrular, hatalıysa ValueError fırlatır"""
+    if not isinstance(data, dict) or not isinstance(data.get("groups"), list):
+        raise ValueError("Geçersiz grup dosyası formatı ('groups' listesi yok)")
+    
+    seen = set()
+    for position, group in enumerate(data["groups"], 1):
+        if not isinstance(group, dict) or not isinstance(group.get("group_id"), str) or not group["group_id"].strip():
+            raise ValueError(f"{position}. grubun group_id alanı eksik")
+        for key in ("cities", "email_recipients"):
+            if not isinstance(group.get(key, []), list):
+                raise ValueError(f"{group['group_id']}: '{key}' liste olmalı")
+        
+        group_key = group["group_id"].casefold()
+        if group_key in seen:
+            raise ValueError(f"Aynı group_id birden fazla kez tanımlı: {group['group_id']}")
+        seen.add(group_key)
+
+
 class GroupManager:
     def __init__(self):
-        self.groups = self.load_groups()
-        self.city_to_group = self.build_city_mapping()
-        self.group_cache = {}  # Grup bilgileri için cache
+        self._file_signature = self._read_signature()
+        self.index = self.load_index()
     
-    def load_groups(self) -> Dict:
-        """Grupları JSON dosyasından yükler"""
-        groups_file = config.GROUPS_DIR / "groups.json"
-        
-        if not groups_file.exists():
+    @property
+    def groups_file(self) -> Path:
+        return config.GROUPS_DIR / "groups.json"
+    
+    @property
+    def cache_file(self) -> Path:
+        return config.GROUPS_DIR / "groups.index.bin"
+    
+    @property
+    def groups(self) -> Mapping[str, Any]:
+        """Geriye uyumluluk: {"groups": [...]} yapısı (salt okunur)"""
+        return self.index.data
+    
+    @property
+    def city_to_group(self) -> Mapping[str, Tuple[str, ...]]:
+        """Geriye uyumluluk: normalize şehir → grup id'leri"""
+        return self.index.by_city
+    
+    def load_index(self) -> GroupIndex:
+        """Index'i önbellekten veya groups.json'dan yükler (hata durumunda boş index)"""
+        if not self.groups_file.exists():
             logger.warning("Gruplar dosyası bulunamadı, örnek dosya oluşturuluyor")
             self.create_sample_groups_file()
-            groups_file = config.GROUPS_DIR / "groups.json"
         
         try:
-            with open(groups_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return self._index_from_bytes(self.groups_file.read_bytes())
         except Exception as e:
             logger.error(f"Gruplar yüklenirken hata: {e}")
-            return {"groups": []}
+            return GroupIndex.build({"groups": []})
+    
+    def _index_from_bytes(self, raw: bytes, strict: bool = False) -> GroupIndex:
+        """
+        İçerik hash'i önbellekle eşleşirse önbellekten, değilse JSON'dan oluşturur.
+        Sadece doğrulamadan geçen içerik önbelleğe yazılır; strict ise hatalı içerik hata fırlatır.
+        """
+        digest = hashlib.sha256(raw).hexdigest()
+        index = load_cached_index(self.cache_file, digest)
+        if index is not None:
+            return index
+        
+        data = json.loads(raw)
+        try:
+            validate_groups(data)
+            valid = True
+        except ValueError as e:
+            if strict:
+                raise
+            logger.warning(f"groups.json doğrulanamadı, önbelleğe alınmayacak: {e}")
+            valid = False
+        
+        index = GroupIndex.build(data)
+        if valid:
+            save_cached_index(self.cache_file, digest, index)
+        return index
     
     def create_sample_groups_file(self):
         """Örnek gruplar dosyası oluşturur"""
@@ -53,92 +311,85 @@ class GroupManager:
             json.dump(sample_groups, f, ensure_ascii=False, indent=2)
     
     def normalize_city_name(self, city_name: str) -> str:
-        """
-        Şehir ismini normalleştirir - Türkçe karakter sorununu çözer
-        """
-        if not city_name or not isinstance(city_name, str):
-            return ""
-        
-        # Unicode normalize (NFD form) ve Türkçe karakter dönüşümü
-        city_name = unicodedata.normalize('NFKD', city_name)
-        
-        # Türkçe karakterleri İngilizce karşılıklarına çevir
-        turkish_to_english = {
-            'ğ': 'g', 'Ğ': 'G',
-            'ı': 'i', 'İ': 'I',
-            'ö': 'o', 'Ö': 'O',
-            'ü': 'u', 'Ü': 'U',
-            'ş': 's', 'Ş': 'S',
-            'ç': 'c', 'Ç': 'C',
-            'â': 'a', 'Â': 'A',
-            'î': 'i', 'Î': 'I',
-            'û': 'u', 'Û': 'U'
-        }
-        
-        normalized = ''.join(turkish_to_english.get(char, char) for char in city_name)
-        
-        # Büyük harfe çevir, boşlukları ve noktalamaları temizle
-        normalized = normalized.upper().strip()
-        normalized = re.sub(r'[^A-Z0-9\s]', '', normalized)  # Sadece harf, rakam ve boşluk
-        normalized = re.sub(r'\s+', ' ', normalized)  # Çoklu boşlukları tekilleştir
-        
-        return normalized
-    
-    def build_city_mapping(self) -> Dict[str, List[str]]:
-        """
-        Şehir isimlerini grup ID'lerine eşleyen sözlük oluşturur
-        Bir şehir birden fazla gruba ait olabilir
-        """
-        mapping = {}
-        for group in self.groups.get("groups", []):
-            group_id = group["group_id"]
-            for city in group["cities"]:
-                normalized_city = self.normalize_city_name(city)
-                if normalized_city:
-                    if normalized_city not in mapping:
-                        mapping[normalized_city] = []
-                    mapping[normalized_city].append(group_id)
-        
-        # Grup_0 için özel işlem
-        mapping[""] = ["Grup_0"]
-        mapping["UNKNOWN"] = ["Grup_0"]
-        
-        return mapping
+        """Şehir ismini normalleştirir (modül fonksiyonuna yönlendirir)"""
+        return normalize_city_name(city_name)
     
-    def get_groups_for_city(self, city_name: str) -> List[str]:
+    def get_groups_for_city(self, city_name: str) -> Tuple[str, ...]:
         """Bir şehir adına karşılık gelen grup ID'lerini döndürür"""
-        if not city_name:
-            return ["Grup_0"]
-        
-        normalized_city = self.normalize_city_name(city_name)
-        return self.city_to_group.get(normalized_city, ["Grup_0"])
+        return self.index.groups_for_city(city_name)
     
-    def get_group_info(self, group_id: str) -> Dict:
-        """Grup bilgilerini döndürür (cache'li)"""
-        if group_id in self.group_cache:
-            return self.group_cache[group_id]
+    def get_group_info(self, group_id: str) -> Mapping[str, Any]:
+        """Grup bilgilerini döndürür (indeksli, O(1))"""
+        return self.index.group_info(group_id)
+    
+    def apply_groups(self, data: Dict[str, Any]) -> GroupIndex:
+        """Yeni grup verisini doğrular, groups.json'a atomik yazar ve index'i hemen devreye alır"""
+        validate_groups(data)
+        raw = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+        index = GroupIndex.build(data)
         
-        for group in self.groups.get("groups", []):
-            if group["group_id"] == group_id:
-                self.group_cache[group_id] = group
-                return group
+        tmp_file = self.groups_file.with_name(f"groups.json.{os.getpid()}.tmp")
+        tmp_file.write_bytes(raw)
+        os.replace(tmp_file, self.groups_file)
+        save_cached_index(self.cache_file, hashlib.sha256(raw).hexdigest(), index)
         
-        # Varsayılan grup bilgisi
-        default_group = {
-            "group_id": "Grup_0",
-            "group_name": "Eşleşmeyen Veriler",
-            "cities": [],
-            "email_recipients": config.DEFAULT_EMAIL_RECIPIENTS if hasattr(config, 'DEFAULT_EMAIL_RECIPIENTS') else []
-        }
-        self.group_cache[group_id] = default_group
-        return default_group
+        # İzleyici kendi yazdığımız dosyayı tekrar yüklemesin
+        self._file_signature = self._read_signature()
+        self.swap_index(index)
+        logger.info(f"✅ {len(index)} grup groups.json'a yazıldı ve devreye alındı")
+        return index
+    
+    def swap_index(self, index: GroupIndex):
+        """Yeni index'i tek atamayla devreye alır"""
+        self.index = index
     
     def refresh_groups(self):
         """Grupları yeniden yükler"""
-        self.groups = self.load_groups()
-        self.city_to_group = self.build_city_mapping()
-        self.group_cache.clear()
+        self._file_signature = self._read_signature()
+        self.swap_index(self.load_index())
         logger.info("Gruplar başarıyla yenilendi")
+    
+    def _read_signature(self) -> Optional[Tuple[int, int]]:
+        """groups.json'un (mtime_ns, boyut) imzası, dosya yoksa None"""
+        try:
+            stat = self.groups_file.stat()
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+    
+    def build_index_from_file(self) -> GroupIndex:
+        """groups.json'u okur, doğrular ve index oluşturur (hata fırlatır, sessizce boş dönmez)"""
+        return self._index_from_bytes(self.groups_file.read_bytes(), strict=True)
+    
+    async def reload_if_changed(self) -> bool:
+        """Dosya değiştiyse index'i thread'de yeniden oluşturup devreye alır"""
+        signature = self._read_signature()
+        if signature is None or signature == self._file_signature:
+            return False
+        
+        # İmza okumadan önce alınır: okuma sırasında dosya tekrar değişirse sonraki turda yakalanır
+        self._file_signature = signature
+        try:
+            index = await asyncio.to_thread(self.build_index_from_file)
+        except Exception as e:
+            # Hatalı/yarım yazılmış dosya → mevcut index kullanılmaya devam eder
+            logger.error(f"groups.json değişti ama yüklenemedi, eski gruplar kullanılıyor: {e}")
+            return False
+        
+        self.swap_index(index)
+        logger.info(f"🔄 groups.json değişikliği algılandı, {len(index)} grup yüklendi")
+        return True
+    
+    async def watch(self, interval: float = None):
+        """groups.json'u periyodik olarak kontrol eder (iptal edilene kadar çalışır)"""
+        interval = interval or config.GROUPS_WATCH_INTERVAL
+        logger.info(f"👀 groups.json izleniyor ({interval} sn aralıkla)")
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload_if_changed()
+            except Exception as e:
+                logger.error(f"Grup izleme hatası: {e}")
 
 # Global group manager instance
-group_manager = GroupManager()
\ No newline at end of file
+group_manager = GroupManager()
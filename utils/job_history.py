@@ -0,0 +1,197 @@
+#İş Geçmişi (utils/job_history.py)
+"""
+Biten her Excel işi SQLite'a kaydedilir (varsayılan data/jobs.sqlite3):
+kullanıcı, mod, satır / grup sayısı, girdi-çıktı boyutu, aşama süreleri ve mail sonuçları.
+/status ve admin istatistikleri (toplam, son 24 saat, son 7 gün) indeksli sorgularla hesaplanır;
+çıktı klasörü taranmaz. Kayıtlar toplu yazılır (JOB_HISTORY_FLUSH_INTERVAL), eski kayıtlar
+JOB_HISTORY_DAYS sonra silinir.
+"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import config
+from utils.logger import logger
+
+COLUMNS = (
+    "job_id", "user_id", "name", "mode", "status", "created", "started", "finished",
+    "rows", "matched_rows", "groups", "input_bytes", "output_bytes",
+    "mails_sent", "mails_failed", "stages", "error",
+)
+
+
+def _mail_counts(result: Dict[str, Any]) -> tuple:
+    """(başarılı, başarısız) mail sayısı: grup mailleri + /bana ve /tek'in kişisel maili"""
+    sent = failed = 0
+    for part_mode, part in (result.get("modes") or {}).items():
+        if part_mode == "process":
+            outcomes = [email["success"] for email in part.get("email_results", [])]
+        else:
+            outcomes = [part.get("success", False)]
+        sent += sum(outcomes)
+        failed += len(outcomes) - sum(outcomes)
+    return sent, failed
+
+
+def job_record(job) -> tuple:
+    """Zamanlayıcıdaki Job → tablo satırı"""
+    result = job.result or {}
+    output_files = result.get("output_files") or {}
+    output_bytes = 0
+    for file_info in output_files.values():
+        try:
+            output_bytes += Path(file_info["path"]).stat().st_size
+        except (OSError, KeyError, TypeError):
+            pass
+    mails_sent, mails_failed = _mail_counts(result)
+    return (
+        job.job_id, job.user_id, job.name, job.mode or "+".join(result.get("modes") or ()), job.status,
+        job.created_at, job.started_at, job.finished_at,
+        result.get("total_rows") or 0, result.get("matched_rows") or 0, len(output_files),
+        job.size, output_bytes, mails_sent, mails_failed,
+        json.dumps(job.progress.timings, ensure_ascii=False), result.get("error"),
+    )
+
+
+class JobHistory:
+    def __init__(self, path: Optional[Path] = None, flush_interval: Optional[float] = None):
+        self.path = path or (Path(config.JOB_HISTORY_PATH) if config.JOB_HISTORY_PATH else config.DATA_DIR / "jobs.sqlite3")
+        self.flush_interval = config.JOB_HISTORY_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._pending: list = []  # Yazılmayı bekleyen biten işler
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, job_id TEXT, user_id INTEGER, name TEXT, mode TEXT, "
+                "status TEXT, created REAL, started REAL, finished REAL NOT NULL, "
+                "rows INTEGER, matched_rows INTEGER, groups INTEGER, input_bytes INTEGER, output_bytes INTEGER, "
+                "mails_sent INTEGER, mails_failed INTEGER, stages TEXT, error TEXT)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished)")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_user_finished ON jobs (user_id, finished)")
+            if config.JOB_HISTORY_DAYS > 0:
+                with conn:
+                    conn.execute("DELETE FROM jobs WHERE finished < ?", (time.time() - config.JOB_HISTORY_DAYS * 86400,))
+            self._conn = conn
+        return self._conn
+
+    # ---- Yazma ----
+
+    def record(self, job) -> None:
+        """Biten işi kayda alır (scheduler._finish'ten; satır oluşturma ve yazma arka planda toplu yapılır)"""
+        self._pending.append(job)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(self._take_pending())
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._delayed_flush())
+
+    def _take_pending(self) -> list:
+        jobs, self._pending = self._pending, []
+        return jobs
+
+    def _write(self, jobs: list):
+        rows = []
+        for job in jobs:
+            try:
+                rows.append(job_record(job))
+            except Exception as e:
+                logger.error(f"İş geçmişi kaydı oluşturulamadı #{job.job_id}: {e}")
+        if not rows:
+            return
+        placeholders = ", ".join("?" for _ in COLUMNS)
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(f"INSERT INTO jobs ({', '.join(COLUMNS)}) VALUES ({placeholders})", rows)
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self):
+        """Bekleyen kayıtları tek transaction ile yazar"""
+        jobs = self._take_pending()
+        if not jobs:
+            return
+        try:
+            await asyncio.to_thread(self._write, jobs)
+        except Exception as e:
+            logger.error(f"İş geçmişi yazılamadı ({len(jobs)} kayıt): {e}")
+
+    async def close(self):
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ---- Sorgular ----
+
+    def last_job_id(self) -> int:
+        """Kayıtlı en büyük iş numarası (zamanlayıcı sayacı yeniden başlatmada buradan devam eder)"""
+        try:
+            with self._lock:
+                row = self._connection().execute("SELECT MAX(CAST(job_id AS INTEGER)) FROM jobs").fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Son iş numarası okunamadı, numaralar 1'den başlıyor: {e}")
+            return 0
+        return row[0] or 0
+
+    def _summary(self, since: Optional[float], user_id: Optional[int]) -> Dict[str, Any]:
+        where, params = ["finished >= ?"], [since or 0]
+        if user_id is not None:
+            where.append("user_id = ?")
+            params.append(user_id)
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT COUNT(*), "
+                "COALESCE(SUM(status = 'done'), 0), COALESCE(SUM(status = 'failed'), 0), "
+                "COALESCE(SUM(status = 'cancelled'), 0), COALESCE(SUM(rows), 0), "
+                "COALESCE(SUM(mails_sent), 0), COALESCE(SUM(mails_failed), 0), MAX(finished) "
+                f"FROM jobs WHERE {' AND '.join(where)}",
+                params,
+            ).fetchone()
+        keys = ("jobs", "successful", "failed", "cancelled", "rows", "mails_sent", "mails_failed", "last_finished")
+        return dict(zip(keys, row))
+
+    async def summary(self, since: Optional[float] = None, user_id: Optional[int] = None) -> Dict[str, Any]:
+        """since (unix zamanı) sonrası biten işlerin özeti; bekleyen kayıtlar da dahil"""
+        await self.flush()
+        return await asyncio.to_thread(self._summary, since, user_id)
+
+    def _stage_averages(self, since: float) -> Dict[str, float]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT stages FROM jobs WHERE finished >= ? AND status = 'done'", (since,)
+            ).fetchall()
+        totals: Dict[str, List[float]] = {}
+        for (stages,) in rows:
+            for stage, seconds in json.loads(stages or "{}").items():
+                totals.setdefault(stage, []).append(seconds)
+        return {stage: sum(values) / len(values) for stage, values in totals.items()}
+
+    async def stage_averages(self, since: float) -> Dict[str, float]:
+        """since sonrası başarılı işlerin aşama başına ortalama süresi (sn)"""
+        await self.flush()
+        return await asyncio.to_thread(self._stage_averages, since)
+
+
+# Global job history instance
+job_history = JobHistory()
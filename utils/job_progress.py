@@ -0,0 +1,57 @@
+#İş İlerlemesi (utils/job_progress.py)
+"""
+Çalışan işin aşama / ilerleme / süre bilgisi.
+Zamanlayıcı her iş için bir JobProgress oluşturup ContextVar'a koyar; işlem adımları
+(temizleme, ayırma, mail) report_stage / report_progress ile parametre taşımadan günceller.
+asyncio.to_thread context'i kopyaladığı için thread içindeki döngüler de raporlayabilir.
+"""
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+# Süresi aşama listesinde gösterilmeyen geçiş durumları
+UNTIMED_STAGES = ("kuyrukta", "başladı")
+
+
+@dataclass
+class JobProgress:
+    stage: str = "kuyrukta"
+    done: int = 0
+    total: int = 0
+    stage_started: float = field(default_factory=time.time)
+    timings: Dict[str, float] = field(default_factory=dict)  # biten aşama → süre (sn)
+
+    def set_stage(self, stage: str):
+        """Önceki aşamanın süresini kaydeder, yeni aşamaya geçer"""
+        now = time.time()
+        if self.stage not in UNTIMED_STAGES:
+            self.timings[self.stage] = self.timings.get(self.stage, 0.0) + now - self.stage_started
+        self.stage, self.stage_started = stage, now
+        self.done = self.total = 0
+
+    def update(self, done: int, total: Optional[int] = None):
+        self.done = done
+        if total is not None:
+            self.total = total
+
+    @property
+    def percent(self) -> Optional[float]:
+        return self.done * 100 / self.total if self.total else None
+
+
+current_progress: ContextVar[Optional[JobProgress]] = ContextVar("current_progress", default=None)
+
+
+def report_stage(stage: str):
+    """Aktif işin aşamasını günceller (zamanlayıcı dışında çağrılırsa etkisiz)"""
+    progress = current_progress.get()
+    if progress is not None:
+        progress.set_stage(stage)
+
+
+def report_progress(done: int, total: Optional[int] = None):
+    """Aktif işin aşama içi ilerlemesini günceller"""
+    progress = current_progress.get()
+    if progress is not None:
+        progress.update(done, total)
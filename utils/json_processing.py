@@ -1,18 +1,22 @@
 # utils/json_processing.py
 # openpyxl ile
-import os
-import json
-import logging
-import aiofiles
+"""
+"grup" sayfası tek iter_rows geçişiyle okunur ve sütunlara çevrilir (read-only modda
+koordinat ile hücre okumak her seferinde sayfa XML'ini yeniden taradığı için kaldırıldı).
+Üretilen gruplar doğrulanıp groups.json'a yazılır ve GroupIndex'e doğrudan uygulanır.
+"""
 import asyncio
-from openpyxl import load_workbook
-from typing import Dict, List, Any
+from itertools import zip_longest
+from typing import Dict, List, Any, Optional, Sequence
 
-logger = logging.getLogger(__name__)
+from utils.group_manager import group_manager
+from utils.logger import logger
+
+FIRST_GROUP_COLUMN = 4  # D sütunu
 
 async def process_excel_to_json(excel_file_path: str) -> str:
     """
-    Excel dosyasını işleyerek groups.json dosyası oluşturur.
+    Excel dosyasını işleyerek groups.json dosyası oluşturur ve grupları hemen devreye alır.
     
     Args:
         excel_file_path: İşlenecek Excel dosyasının yolu
@@ -21,60 +25,36 @@ async def process_excel_to_json(excel_file_path: str) -> str:
         Oluşturulan JSON dosyasının yolu
     """
     try:
-        # Excel dosyasını senkron olarak yükle (openpyxl async desteklemiyor)
-        def load_excel_sync():
-            return load_workbook(excel_file_path, read_only=True)
+        # openpyxl async desteklemiyor → okuma ve index oluşturma thread'de
+        groups_data = await asyncio.to_thread(read_groups_workbook, excel_file_path)
+        index = await asyncio.to_thread(group_manager.apply_groups, {"groups": groups_data})
         
-        # Thread pool'da Excel yükleme
-        loop = asyncio.get_event_loop()
-        wb = await loop.run_in_executor(None, load_excel_sync)
+        logger.info(f"JSON dosyası başarıyla oluşturuldu: {group_manager.groups_file} ({len(index)} grup)")
+        return str(group_manager.groups_file)
         
+    except Exception as e:
+        logger.opt(exception=e).error("Excel işleme hatası: {}", e)
+        raise
+
+def read_groups_workbook(excel_file_path: str) -> List[Dict[str, Any]]:
+    """Excel'deki "grup" sayfasından grup listesini okur"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(excel_file_path, read_only=True)
+    try:
         # "grup" sayfasını kontrol et
         if 'grup' not in wb.sheetnames:
             raise ValueError("Excel dosyasında 'grup' sayfası bulunamadı")
-        
-        ws = wb['grup']
-        
-        # Grup verilerini topla
-        groups_data = extract_groups_data(ws)
-        
-        # Çıktı dizinini oluştur
-        output_dir = "data/groups"
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # JSON dosya yolu
-        json_file_path = os.path.join(output_dir, "groups.json")
-        
-        # JSON'ı asenkron olarak yaz
-        async with aiofiles.open(json_file_path, 'w', encoding='utf-8') as f:
-            json_data = json.dumps({"groups": groups_data}, ensure_ascii=False, indent=2)
-            await f.write(json_data)
-        
-        logger.info(f"JSON dosyası başarıyla oluşturuldu: {json_file_path}")
-        return json_file_path
-        
-    except Exception as e:
-        logger.error(f"Excel işleme hatası: {str(e)}", exc_info=True)
-        raise
+        return extract_groups_data(wb['grup'])
     finally:
         # Workbook'u kapat
-        if 'wb' in locals():
-            wb.close()
-
-def get_column_letter(n: int) -> str:
-    """
-    Sütun numarasını Excel harfine çevirir.
-    Örnek: 1 -> 'A', 27 -> 'AA'
-    """
-    result = ""
-    while n > 0:
-        n, remainder = divmod(n - 1, 26)
-        result = chr(65 + remainder) + result
-    return result
+        wb.close()
 
 def extract_groups_data(worksheet) -> List[Dict[str, Any]]:
     """
     Worksheet'ten grup verilerini çıkarır.
+    Sayfa tek geçişte okunur ve sütun listelerine çevrilir:
+    1. satır grup ID, 2. satır grup adı, 3. satır e-postalar, 4. satırdan itibaren şehirler.
     
     Args:
         worksheet: Openpyxl worksheet objesi
@@ -82,60 +62,45 @@ def extract_groups_data(worksheet) -> List[Dict[str, Any]]:
     Returns:
         Grup verileri listesi
     """
-    groups = []
-    
-    # Sütunları D'dan başlayarak tarayın (sütun 4)
-    column_index = 4  # D sütunu = 4
+    rows = worksheet.iter_rows(min_col=FIRST_GROUP_COLUMN, values_only=True)
+    # Read-only modda satır uzunlukları farklı olabilir → eksik hücreler None
+    columns = zip_longest(*rows)
     
-    while True:
-        # Sütun harfini al (AA, AB, ... dahil)
-        column_letter = get_column_letter(column_index)
-        
-        # Grup ID kontrolü (1. satır)
-        group_id_cell = f"{column_letter}1"
-        group_id = worksheet[group_id_cell].value if worksheet[group_id_cell].value else None
-        
+    groups = []
+    for column in columns:
+        group = _group_from_column(column)
         # Boş sütun bulunursa dur
-        if not group_id:
+        if group is None:
             break
-        
-        # Grup adı (2. satır)
-        group_name_cell = f"{column_letter}2"
-        group_name = worksheet[group_name_cell].value if worksheet[group_name_cell].value else ""
-        
-        # E-posta listesi (3. satır)
-        email_cell = f"{column_letter}3"
-        email_recipients = worksheet[email_cell].value if worksheet[email_cell].value else ""
-        
-        # Şehirleri topla (4. satırdan itibaren)
-        cities = []
-        row_index = 4
-        
-        while True:
-            city_cell = f"{column_letter}{row_index}"
-            city = worksheet[city_cell].value
-            
-            # Boş hücre bulunursa şehirleri toplamayı durdur
-            if not city:
-                break
-            
-            cities.append(str(city).strip())
-            row_index += 1
-        
-        # E-postaları temizle ve liste olarak ayır
-        email_list = []
-        if email_recipients:
-            email_list = [email.strip() for email in str(email_recipients).split(',') if email.strip()]
-        
-        # Grup verisini oluştur
-        group_data = {
-            "group_id": str(group_id).strip(),
-            "group_name": str(group_name).strip(),
-            "email_recipients": email_list,
-            "cities": cities
-        }
-        
-        groups.append(group_data)
-        column_index += 1  # Sonraki sütuna geç
+        groups.append(group)
     
     return groups
+
+def _group_from_column(column: Sequence[Any]) -> Optional[Dict[str, Any]]:
+    """Tek bir sütunun değerlerinden grup verisini oluşturur (grup ID yoksa None)"""
+    group_id = column[0] if column else None
+    if not group_id:
+        return None
+    
+    group_name = column[1] if len(column) > 1 and column[1] else ""
+    email_recipients = column[2] if len(column) > 2 and column[2] else ""
+    
+    # Şehirleri topla (4. satırdan itibaren, ilk boş hücreye kadar)
+    cities = []
+    for city in column[3:]:
+        if not city:
+            break
+        cities.append(str(city).strip())
+    
+    # E-postaları temizle ve liste olarak ayır
+    email_list = []
+    if email_recipients:
+        email_list = [email.strip() for email in str(email_recipients).split(',') if email.strip()]
+    
+    # Grup verisini oluştur
+    return {
+        "group_id": str(group_id).strip(),
+        "group_name": str(group_name).strip(),
+        "email_recipients": email_list,
+        "cities": cities
+    }
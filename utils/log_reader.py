@@ -0,0 +1,89 @@
+#Log Okuyucu (utils/log_reader.py)
+"""
+Log dosyaları (rotasyona kadar 10 MB) tamamen belleğe okunmaz:
+- tail_lines: dosya sonundan geriye doğru blok blok okur, sadece istenen satırlar kadar
+- grep_lines: dosyayı satır satır tarar, sadece son eşleşmeleri tutar (düz metin, regex değil)
+- error_counter: ERROR seviyesindeki kayıtları sayan loguru sink'i (errors.log okunmaz)
+"""
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+TAIL_BLOCK_SIZE = 8192
+GREP_MAX_PATTERN = 200  # Aranan metnin azami uzunluğu
+GREP_MAX_LINE = 1000    # Satırların bu kadar karakteri aranır / gösterilir
+ERROR_WINDOW = 24 * 3600  # Son 24 saatteki hatalar ayrıca sayılır
+
+
+def tail_lines(path: Path, count: int, block_size: int = TAIL_BLOCK_SIZE) -> List[str]:
+    """Dosyanın son count satırı (sondan geriye blok okuyarak)"""
+    if count <= 0:
+        return []
+    with open(path, "rb") as f:
+        f.seek(0, 2)
+        position = f.tell()
+        data = b""
+        # count satır için count+1 satır sonu yeterli (ilk satır yarım olabilir)
+        while position > 0 and data.count(b"\n") <= count:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    # Bloklar bayt sınırında kesilir → çözümleme birleşik veride yapılır
+    lines = data.decode("utf-8", errors="replace").splitlines(keepends=True)
+    return lines[-count:]
+
+
+def _fold(text: str) -> str:
+    """Büyük/küçük harf duyarsız karşılaştırma için; Türkçe İ/ı da i'ye indirgenir"""
+    return text.replace("İ", "i").replace("ı", "i").casefold()
+
+
+def grep_lines(path: Path, pattern: str, limit: int = 30) -> Dict[str, Any]:
+    """Metni içeren satırları tarar (büyük/küçük harf duyarsız); son limit eşleşme tutulur.
+    Kullanıcı girdisi regex olarak derlenmez: geri izleme patlaması GIL'i tutup bot'u kilitler."""
+    needle = _fold(pattern[:GREP_MAX_PATTERN])
+    matches: Deque[str] = deque(maxlen=limit)
+    total = scanned = 0
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            scanned += 1
+            line = line[:GREP_MAX_LINE]
+            if needle in _fold(line):
+                total += 1
+                matches.append(line if line.endswith("\n") else line + "\n")
+    return {"matches": list(matches), "total": total, "scanned": scanned}
+
+
+class ErrorCounter:
+    """loguru sink'i: ERROR ve üstü kayıtları sayar"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.total = 0
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[float] = None
+        self._recent: Deque[float] = deque()
+
+    def sink(self, message):
+        record = message.record
+        now = record["time"].timestamp()
+        self.total += 1
+        self.last_error = record["message"][:200]
+        self.last_error_at = now
+        self._recent.append(now)
+        self._expire(now)
+
+    def _expire(self, now: float):
+        while self._recent and self._recent[0] < now - ERROR_WINDOW:
+            self._recent.popleft()
+
+    @property
+    def last_24h(self) -> int:
+        self._expire(time.time())
+        return len(self._recent)
+
+
+# Global error counter instance
+error_counter = ErrorCounter()
@@ -1,7 +1,17 @@
 #Logger Kurulumu (utils/logger.py)
+"""
+- Dosya sink'leri enqueue=True: kayıt kuyruğa atılır, diske ayrı thread yazar (event loop beklemez)
+- bot.log metin, bot.jsonl JSON satırları; her kayıtta job_id / user_id (scheduler contextualize eder)
+- Rotasyona uğrayan dosyalar gzip ile sıkıştırılır
+- LogThrottle: sıcak döngülerdeki log satırlarını zamana göre seyreltir
+"""
 import logging
+import os
+import sys
+import time
 from loguru import logger
 from pathlib import Path
+from typing import Optional
 from config import config
 
 class InterceptHandler(logging.Handler):
@@ -22,14 +32,56 @@ class InterceptHandler(logging.Handler):
             level, record.getMessage()
         )
 
+def _retention(days: int):
+    """loguru retention: rotasyonda eski log dosyalarını siler, log dizininin disk kaydını günceller"""
+    def remove_old(files):
+        limit = time.time() - days * 24 * 3600
+        for path in files:
+            try:
+                if os.stat(path).st_mtime < limit:
+                    os.remove(path)
+            except OSError:
+                pass
+        from utils.disk_usage import disk_usage  # disk_usage bu modülü import ediyor
+        disk_usage.rescan(config.LOGS_DIR)
+    return remove_old
+
+
+class LogThrottle:
+    """Döngü içindeki log satırı için: interval saniyede en fazla bir kez izin verir"""
+    
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = config.LOG_THROTTLE_SECONDS if interval is None else interval
+        self._last = float("-inf")
+        self.suppressed = 0  # Son izinden beri atlanan satır sayısı
+    
+    def ready(self) -> bool:
+        now = time.monotonic()
+        if now - self._last < self.interval:
+            self.suppressed += 1
+            return False
+        self._last = now
+        self.suppressed = 0
+        return True
+
+
 def setup_logger():
     logging.basicConfig(handlers=[InterceptHandler()], level=logging.INFO)
     
+    # İş dışındaki kayıtlarda da alanlar bulunsun
+    logger.configure(extra={"job_id": "", "user_id": ""})
+    
+    # Varsayılan stderr sink'i de kuyruktan yazsın
+    logger.remove()
+    logger.add(sys.stderr, enqueue=True, level="INFO")
+    
     # Loguru yapılandırması
     logger.add(
         config.LOGS_DIR / "bot.log",
         rotation="10 MB",
-        retention="10 days",
+        retention=_retention(10),
+        compression="gz",
+        enqueue=True,
         level="INFO",
         format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}"
     )
@@ -37,9 +89,34 @@ def setup_logger():
     logger.add(
         config.LOGS_DIR / "errors.log",
         rotation="10 MB",
-        retention="30 days",
+        retention=_retention(30),
+        compression="gz",
+        enqueue=True,
         level="ERROR",
         format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}"
     )
     
+    # Yapısal log: bir işin zaman çizelgesi job_id ile süzülebilir
+    if config.LOG_JSON:
+        logger.add(
+            config.LOGS_DIR / "bot.jsonl",
+            rotation="10 MB",
+            retention=_retention(10),
+            compression="gz",
+            enqueue=True,
+            level="INFO",
+            serialize=True,
+        )
+    
+    # Hata sayacı: admin paneli errors.log'u okumadan sayıyı gösterir
+    from utils.log_reader import error_counter
+    logger.add(error_counter.sink, level="ERROR", format="{message}")
+    
+    # Aktif log dosyaları sürekli büyür → boyutları okunurken stat edilir
+    from utils.disk_usage import disk_usage
+    disk_usage.add_live_file(config.LOGS_DIR / "bot.log")
+    disk_usage.add_live_file(config.LOGS_DIR / "errors.log")
+    if config.LOG_JSON:
+        disk_usage.add_live_file(config.LOGS_DIR / "bot.jsonl")
+    
     logger.info("Logger başlatıldı")
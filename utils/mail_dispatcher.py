@@ -0,0 +1,196 @@
+#Mail Gönderim Kuyruğu (utils/mail_dispatcher.py)
+"""
+Toplu mail gönderimini sınırlar:
+- Aynı anda açık SMTP oturumu sayısı MAIL_MAX_CONCURRENCY ile sınırlı
+- Hesap bazlı token-bucket: mesaj/dakika ve byte/dakika (hesapta yoksa sağlayıcı varsayılanı)
+- Birden fazla SMTP hesabı varsa ağırlıklı dağıtım, kota/kimlik hatasında diğer hesaba geçiş
+- MAIL_LIMITER_BACKEND=redis: kovalar, günlük sayaçlar ve bekleme süreleri tüm worker'larda ortak
+Böylece Gmail/Yandex throttle'a takılmadan sağlayıcı limitine yakın hızda gönderilir.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from config import config
+from utils.cancellation import CancellationToken, check_cancelled
+from utils.job_progress import report_progress
+from utils.logger import logger
+from utils.mailer import deliver_email
+from utils.metrics import observe_mail
+from utils.rate_limit import make_bucket
+from utils.smtp_accounts import SmtpAccount, get_account_pool, reset_account_pool, shared_account_state
+
+# base64 kodlama + MIME başlıkları için yaklaşık ek yük
+MIME_OVERHEAD_BYTES = 4 * 1024
+
+
+class ProviderLimiter:
+    """Bir sağlayıcı için mesaj ve byte kovaları"""
+
+    def __init__(self, name: str, messages_per_minute: float, bytes_per_minute: float):
+        self.name = name
+        self.messages = make_bucket(f"kova:mail:{name}:messages", messages_per_minute)
+        # Byte kovasında tek bir büyük ek de geçebilmeli → kapasite en az 1 dakikalık kota
+        self.bytes = make_bucket(f"kova:mail:{name}:bytes", bytes_per_minute, capacity=bytes_per_minute)
+
+    async def acquire(self, message_bytes: int) -> float:
+        waited = await self.messages.acquire(1)
+        waited += await self.bytes.acquire(message_bytes)
+        return waited
+
+
+def provider_for(server: str) -> str:
+    """SMTP sunucu adından sağlayıcı anahtarını çıkarır"""
+    server = (server or "").lower()
+    for name in config.SMTP_PROVIDER_LIMITS:
+        if name != "default" and name in server:
+            return name
+    return "default"
+
+
+def estimate_message_size(attachment_path: Union[Path, List[Path]]) -> int:
+    """Gönderilecek mesajın yaklaşık boyutu (base64 ile ~4/3 büyür)"""
+    paths = attachment_path if isinstance(attachment_path, list) else [attachment_path]
+    size = 0
+    for path in paths:
+        try:
+            size += path.stat().st_size
+        except OSError:
+            pass
+    return size * 4 // 3 + MIME_OVERHEAD_BYTES * len(paths)
+
+
+@dataclass
+class MailJob:
+    """Kuyruğa verilecek tek bir mail gönderimi"""
+    to_emails: List[str]
+    subject: str
+    body: str
+    attachment_path: Union[Path, List[Path]]  # Birleşik maillerde birden fazla ek
+    meta: Dict[str, Any] = field(default_factory=dict)  # Rapor için ek bilgiler (grup, alıcı...)
+
+
+class MailDispatcher:
+    def __init__(self, max_concurrency: Optional[int] = None):
+        self.max_concurrency = max_concurrency or config.MAIL_MAX_CONCURRENCY
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._limiters: Dict[str, ProviderLimiter] = {}
+
+    def limiter_for(self, account: SmtpAccount) -> ProviderLimiter:
+        """Hesaba ait limitleyiciyi döndürür (lazy create)"""
+        if account.name not in self._limiters:
+            provider = provider_for(account.server)
+            limits = config.SMTP_PROVIDER_LIMITS.get(provider, config.SMTP_PROVIDER_LIMITS["default"])
+            self._limiters[account.name] = ProviderLimiter(
+                account.name,
+                account.messages_per_minute or config.MAIL_RATE_PER_MINUTE or limits["messages_per_minute"],
+                account.bytes_per_minute or config.MAIL_BYTES_PER_MINUTE or limits["bytes_per_minute"],
+            )
+        return self._limiters[account.name]
+
+    def reset(self):
+        """Limitleyicileri ve hesap havuzunu sıfırlar (config değiştiğinde yeniden oluşturulur)"""
+        self._limiters.clear()
+        reset_account_pool()
+
+    async def send(self, job: MailJob, cancel_token: Optional[CancellationToken] = None) -> Dict[str, Any]:
+        """Tek bir maili limitlere uyarak gönderir, hesap kullanılamazsa diğerine geçer"""
+        check_cancelled(cancel_token)
+        pool = get_account_pool()
+        message_bytes = estimate_message_size(job.attachment_path)
+        tried: List[str] = []
+        started = time.perf_counter()
+        error = "Kullanılabilir SMTP hesabı yok"
+        shared = shared_account_state()
+
+        while True:
+            if shared:
+                await shared.refresh(pool.accounts)  # Diğer worker'ların gönderimleri / devre dışı bıraktıkları
+            account = pool.select(exclude=tried)
+            if account is None:
+                break
+            tried.append(account.name)
+
+            limiter = self.limiter_for(account)
+            waited = await limiter.acquire(message_bytes)
+            if waited > 1:
+                logger.info(f"⏳ Hız limiti ({limiter.name}): {waited:.1f} sn beklendi")
+
+            async with self._semaphore:
+                # Limit/slot beklerken iş iptal edildiyse gönderme
+                check_cancelled(cancel_token)
+                trace = await deliver_email(
+                    job.to_emails, job.subject, job.body, job.attachment_path, account=account
+                )
+
+            observe_mail(limiter.name, trace.success)
+            if trace.success:
+                pool.mark_success(account)
+                if shared:
+                    await shared.record_success(account)
+                return {
+                    **job.meta,
+                    "success": True,
+                    "elapsed": time.perf_counter() - started,
+                    "account": account.name,
+                }
+
+            pool.mark_failure(account, trace.error_kind)
+            if shared:
+                await shared.record_failure(account)
+            error = trace.error or "Tüm gönderim denemeleri başarısız"
+            if trace.error_kind not in ("auth", "quota"):
+                break  # Geçici hata → denemeler zaten yapıldı, başka hesaba geçme
+
+        return {
+            **job.meta,
+            "success": False,
+            "elapsed": time.perf_counter() - started,
+            "error": error,
+            "accounts_tried": tried,
+        }
+
+    async def dispatch(
+        self,
+        jobs: List[MailJob],
+        cancel_token: Optional[CancellationToken] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Tüm işleri limitler dahilinde paralel gönderir, sonuçları aynı sırayla döndürür.
+        İptal edilirse henüz gönderilmemiş mailler atlanır ve JobCancelled fırlatılır.
+        """
+        if not jobs:
+            return []
+
+        logger.info(
+            f"{len(jobs)} mail kuyruğa alındı "
+            f"(eşzamanlılık: {self.max_concurrency}, hesap: {len(get_account_pool().accounts)})"
+        )
+        sent = 0
+
+        async def send_and_report(job: MailJob) -> Dict[str, Any]:
+            nonlocal sent
+            try:
+                return await self.send(job, cancel_token)
+            finally:
+                sent += 1
+                report_progress(sent, len(jobs))
+
+        report_progress(0, len(jobs))
+        results = await asyncio.gather(*(send_and_report(job) for job in jobs), return_exceptions=True)
+        check_cancelled(cancel_token)
+
+        email_results = []
+        for job, result in zip(jobs, results):
+            if isinstance(result, Exception):
+                logger.error(f"Mail gönderim hatası - {job.meta}, Hata: {result}")
+                email_results.append({**job.meta, "success": False, "error": str(result)})
+            else:
+                email_results.append(result)
+        return email_results
+
+
+# Global mail dispatcher instance
+mail_dispatcher = MailDispatcher()
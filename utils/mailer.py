@@ -9,97 +9,274 @@ Yandex Mail (smtp.yandex.com)
 Outlook/Hotmail (smtp-mail.outlook.com)
 ojmkrjzsxcxrpzuh
 """
-import aiosmtplib
+import asyncio
+import io
+import socket
+import time
+from email import policy
+from email.generator import BytesGenerator
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
 from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
 from config import config
 from utils.logger import logger
+from utils.mime_stream import StreamingMessage
+from utils.smtp_accounts import SmtpAccount, default_account
+from utils.smtp_trace import DeliveryTrace, smtp_trace_store
 import ssl
 
-async def send_email_with_attachment(
+if TYPE_CHECKING:
+    import aiosmtplib  # Çalışma anında ilk gönderimde yüklenir
+
+
+class _TimedTLSContext(ssl.SSLContext):
+    """
+    asyncio TLS el sıkışmasına başlarken wrap_bio'yu çağırır; bu an TCP
+    bağlantısının kurulduğu andır. Böylece 465 portunda connect ve TLS ayrı ölçülür.
+    """
+    handshake_started = None
+
+    def wrap_bio(self, *args, **kwargs):
+        self.handshake_started = time.perf_counter()
+        return super().wrap_bio(*args, **kwargs)
+
+
+def create_tls_context() -> _TimedTLSContext:
+    """ssl.create_default_context ile aynı ayarlar (SMTP_CA_FILE: yerel test sunucusu için)"""
+    context = _TimedTLSContext(ssl.PROTOCOL_TLS_CLIENT)
+    if config.SMTP_CA_FILE:
+        context.load_verify_locations(cafile=config.SMTP_CA_FILE)
+    else:
+        context.load_default_certs(ssl.Purpose.SERVER_AUTH)
+    return context
+
+
+def smtp_security_for(port: int, security: str = None) -> str:
+    """Port için bağlantı güvenliği: ssl (465), starttls (587) veya none (yerel test sunucusu)"""
+    security = security or config.SMTP_SECURITY
+    if security in ("ssl", "starttls", "none"):
+        return security
+    return "ssl" if port == 465 else "starttls"
+
+
+# Bu kodlar + mesajdaki anahtar kelimeler → hesabın kotası dolmuş demektir
+QUOTA_CODES = (421, 450, 451, 452, 550, 554)
+QUOTA_KEYWORDS = ("quota", "limit", "rate", "too many", "exceeded")
+
+
+def classify_smtp_error(error: Exception) -> str:
+    """Hata türü: auth (kimlik), quota (kota/hız limiti) veya temporary (tekrar denenebilir)"""
+    import aiosmtplib
+
+    if isinstance(error, aiosmtplib.SMTPAuthenticationError):
+        return "auth"
+    code = getattr(error, "code", None)
+    if code in (534, 535):
+        return "auth"
+    if code in QUOTA_CODES and any(word in str(error).lower() for word in QUOTA_KEYWORDS):
+        return "quota"
+    return "temporary"
+
+
+def _as_path_list(attachment_path: Union[Path, List[Path]]) -> List[Path]:
+    return attachment_path if isinstance(attachment_path, list) else [attachment_path]
+
+
+def build_message(
     to_emails: list,
     subject: str,
     body: str,
-    attachment_path: Path,
-    max_retries: int = 2
-) -> bool:
-    """E-posta gönderir (ekli dosya ile) - DETAYLI LOGLAMALI"""
+    attachment_path: Union[Path, List[Path]],
+    sender: str = None
+) -> bytes:
+    """Ekli mesajı oluşturup SMTP'ye hazır (CRLF) byte dizisine çevirir"""
+    message = MIMEMultipart()
+    message["From"] = sender if sender is not None else config.SMTP_USERNAME
+    message["To"] = ", ".join(to_emails)
+    message["Subject"] = subject
+    
+    # Mesaj gövdesi
+    message.attach(MIMEText(body, "plain", "utf-8"))
+    
+    # Dosya ekleri
+    for path in _as_path_list(attachment_path):
+        with open(path, "rb") as f:
+            attachment = MIMEApplication(f.read(), _subtype="zip" if path.suffix == ".zip" else "xlsx")
+            attachment.add_header(
+                "Content-Disposition",
+                "attachment",
+                filename=path.name
+            )
+            message.attach(attachment)
+    
+    with io.BytesIO() as buffer:
+        BytesGenerator(buffer, policy=policy.compat32.clone(linesep="\r\n")).flatten(message)
+        return buffer.getvalue()
+
+
+async def _send_streaming(server: "aiosmtplib.SMTP", sender: str, to_emails: list, message: StreamingMessage):
+    """MAIL/RCPT sonrası DATA'yı bloklar halinde yazar (mesaj hiçbir zaman tamamı bellekte olmaz)"""
+    import aiosmtplib
+
+    await server.mail(sender)
+    for recipient in to_emails:
+        await server.rcpt(recipient)
+    
+    protocol = server.protocol
+    protocol.write(b"DATA\r\n")
+    response = await protocol.read_response(timeout=server.timeout)
+    if response.code != 354:
+        raise aiosmtplib.SMTPDataError(response.code, response.message)
+    
+    for chunk in message.iter_chunks():
+        protocol.write(chunk)
+        # Soket tamponu dolunca bekle → okunan bloklar ağ hızında ilerler, bellekte birikmez
+        await protocol._drain_helper()
+    
+    protocol.write(b".\r\n")
+    response = await protocol.read_response(timeout=server.timeout)
+    if response.code != 250:
+        raise aiosmtplib.SMTPDataError(response.code, response.message)
+
+
+async def _deliver(
+    account: SmtpAccount,
+    port: int,
+    security: str,
+    tls_context: _TimedTLSContext,
+    to_emails: list,
+    message: Union[bytes, StreamingMessage],
+    phases: Dict[str, float]
+):
+    """Tek bir SMTP oturumu: her aşamanın süresi phases içine yazılır"""
+    import aiosmtplib
+
+    loop = asyncio.get_running_loop()
+    
+    # DNS çözümleme (sonuç işletim sistemi tarafından cache'lenir)
+    started = time.perf_counter()
+    await loop.getaddrinfo(account.server, port, type=socket.SOCK_STREAM)
+    phases["dns"] = time.perf_counter() - started
+    
+    # start_tls=False: aiosmtplib 2.x aksi halde bağlanırken kendi
+    # STARTTLS'ini yapar ve aşağıdaki starttls() çağrısı hata verir
+    server = aiosmtplib.SMTP(
+        hostname=account.server,
+        port=port,
+        use_tls=security == "ssl",
+        start_tls=False,
+        tls_context=tls_context if security == "ssl" else None
+    )
+    
+    tls_context.handshake_started = None
+    started = time.perf_counter()
+    await server.connect()
+    connected = time.perf_counter()
+    if security == "ssl" and tls_context.handshake_started:
+        phases["connect"] = tls_context.handshake_started - started
+        phases["tls"] = connected - tls_context.handshake_started
+    else:
+        phases["connect"] = connected - started
+    
+    async with server:
+        if security == "starttls":
+            started = time.perf_counter()
+            await server.starttls(tls_context=tls_context)
+            phases["starttls"] = time.perf_counter() - started
+        
+        if account.username:
+            started = time.perf_counter()
+            await server.login(account.username, account.password)
+            phases["login"] = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        if isinstance(message, StreamingMessage):
+            await _send_streaming(server, account.username, to_emails, message)
+        else:
+            await server.sendmail(account.username, to_emails, message)
+        phases["data"] = time.perf_counter() - started
+
+
+async def deliver_email(
+    to_emails: list,
+    subject: str,
+    body: str,
+    attachment_path: Union[Path, List[Path]],
+    max_retries: int = 2,
+    account: Optional[SmtpAccount] = None
+) -> DeliveryTrace:
+    """
+    E-posta gönderir (ekli dosya ile) - DETAYLI LOGLAMALI.
+    Sonuç, aşama süreleri ve hata türüyle birlikte DeliveryTrace olarak döner ve smtp_trace'e yazılır.
+    """
+    account = account or default_account()
+    trace = DeliveryTrace(recipients=list(to_emails or []), server=account.server, account=account.name)
+    
     if not to_emails or not any(to_emails):
         logger.warning("Alıcı email adresi yok")
-        return False
+        trace.error = "Alıcı email adresi yok"
+        return trace
+    
+    for path in _as_path_list(attachment_path):
+        if not path.exists():
+            logger.warning(f"❌ Eklenecek dosya bulunamadı: {path}")
+            trace.error = f"Eklenecek dosya bulunamadı: {path.name}"
+            return trace
+        
+        file_size = path.stat().st_size / 1024  # KB
+        logger.info(f"📎 Eklenecek dosya: {path.name} ({file_size:.1f} KB)")
+    
+    # Büyük eklerde mesaj diskten akışla gönderilir, küçüklerde bir kez oluşturulup tüm denemelerde kullanılır
+    paths = _as_path_list(attachment_path)
+    if sum(path.stat().st_size for path in paths) > config.MAIL_STREAM_THRESHOLD:
+        message = StreamingMessage(to_emails, subject, body, paths, sender=account.username)
+        message_size = message.size
+    else:
+        message = build_message(to_emails, subject, body, attachment_path, sender=account.username)
+        message_size = len(message)
     
     # SSL context oluştur
-    ssl_context = ssl.create_default_context()
+    tls_context = create_tls_context()
     
+    delivery_started = time.perf_counter()
     successful = False
     
-    for port in config.SMTP_PORTS:
+    for port in account.ports:
         for attempt in range(max_retries + 1):
+            security = smtp_security_for(port, account.security)
+            phases: Dict[str, float] = {}
+            trace.attempts += 1
+            trace.port, trace.security, trace.phases = port, security, phases
+            
             try:
-                logger.info(f"📧 Mail gönderimi deneniyor: {to_emails}, Port: {port}, Deneme: {attempt + 1}")
+                # İlk deneme her mailde tekrarlanır → DEBUG; tekrar denemeler ve sonuçlar INFO
+                logger.log(
+                    "INFO" if attempt else "DEBUG",
+                    f"📧 Mail gönderimi deneniyor: {to_emails}, {account.server}:{port} "
+                    f"({security}, hesap: {account.name}), Deneme: {attempt + 1}"
+                )
                 
-                message = MIMEMultipart()
-                message["From"] = config.SMTP_USERNAME
-                message["To"] = ", ".join(to_emails)
-                message["Subject"] = subject
-                
-                # Mesaj gövdesi
-                message.attach(MIMEText(body, "plain", "utf-8"))
-                
-                # Dosya eki
-                if attachment_path.exists():
-                    file_size = attachment_path.stat().st_size / 1024  # KB
-                    logger.info(f"📎 Eklenecek dosya: {attachment_path.name} ({file_size:.1f} KB)")
-                    
-                    with open(attachment_path, "rb") as f:
-                        attachment = MIMEApplication(f.read(), _subtype="xlsx")
-                        attachment.add_header(
-                            "Content-Disposition",
-                            "attachment",
-                            filename=attachment_path.name
-                        )
-                        message.attach(attachment)
-                else:
-                    logger.warning(f"❌ Eklenecek dosya bulunamadı: {attachment_path}")
-                    return False
-                
-                # PORT'A GÖRE BAĞLANTI AYARLARI
-                use_tls = port == 465  # 465 için SSL, 587 için STARTTLS
-                
-                logger.info(f"🔌 SMTP bağlantısı: {config.SMTP_SERVER}:{port} (TLS: {use_tls})")
-                
-                if port == 465:
-                    # SSL bağlantısı
-                    async with aiosmtplib.SMTP(
-                        hostname=config.SMTP_SERVER,
-                        port=port,
-                        use_tls=True,
-                        tls_context=ssl_context
-                    ) as server:
-                        await server.login(config.SMTP_USERNAME, config.SMTP_PASSWORD)
-                        await server.send_message(message)
-                
-                else:  # port 587
-                    # STARTTLS bağlantısı
-                    async with aiosmtplib.SMTP(
-                        hostname=config.SMTP_SERVER,
-                        port=port,
-                        use_tls=False
-                    ) as server:
-                        await server.starttls(tls_context=ssl_context)
-                        await server.login(config.SMTP_USERNAME, config.SMTP_PASSWORD)
-                        await server.send_message(message)
+                await _deliver(account, port, security, tls_context, to_emails, message, phases)
                 
+                trace.bytes_sent = message_size
+                trace.error = trace.error_kind = None
                 logger.info(f"✅ Mail BAŞARIYLA gönderildi: {to_emails}")
                 successful = True
                 break  # Başarılı oldu, diğer portları deneme
                 
             except Exception as e:
                 error_msg = str(e)
+                trace.error = error_msg
+                trace.error_kind = classify_smtp_error(e)
                 logger.error(f"❌ Mail gönderme hatası (Port: {port}, Deneme: {attempt + 1}): {error_msg}")
                 
+                # Kimlik / kota hatasında aynı hesapla tekrar denemek anlamsız → çağıran failover yapar
+                if trace.error_kind in ("auth", "quota"):
+                    logger.error(f"❌ Hesap kullanılamıyor ({trace.error_kind}): {account.name}")
+                    break
+                
                 # Son denemede logla
                 if attempt == max_retries:
                     logger.error(f"❌ Port {port} için tüm denemeler başarısız")
@@ -107,13 +284,29 @@ async def send_email_with_attachment(
                 # Bekle ve tekrar dene
                 if attempt < max_retries:
                     wait_time = 2 ** attempt
-                    import asyncio
                     await asyncio.sleep(wait_time)
         
-        if successful:
-            break  # Başarılı oldu, diğer portları deneme
+        if successful or trace.error_kind in ("auth", "quota"):
+            break  # Başarılı oldu (veya hesap kullanılamaz), diğer portları deneme
     
     if not successful:
         logger.error(f"❌❌❌ TÜM MAIL GÖNDERME DENEMELERİ BAŞARISIZ: {to_emails}")
     
-    return successful
\ No newline at end of file
+    trace.success = successful
+    trace.total = time.perf_counter() - delivery_started
+    smtp_trace_store.record(trace)
+    
+    return trace
+
+
+async def send_email_with_attachment(
+    to_emails: list,
+    subject: str,
+    body: str,
+    attachment_path: Union[Path, List[Path]],
+    max_retries: int = 2,
+    account: Optional[SmtpAccount] = None
+) -> bool:
+    """E-posta gönderir (ekli dosya ile), başarı durumunu döndürür"""
+    trace = await deliver_email(to_emails, subject, body, attachment_path, max_retries, account)
+    return trace.success
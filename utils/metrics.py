@@ -0,0 +1,88 @@
+#Prometheus Metrikleri (utils/metrics.py)
+"""
+/metrics uç noktasında yayınlanan metrikler:
+- İş süreleri (toplam ve aşama bazında histogram), işlenen satır sayacı (rows/sn → rate())
+- Mail sonuçları (sağlayıcı ve sonuç bazında)
+- Webhook update kuyruğu, iş kuyruğu ve Telegram gönderim sayaçları (okuma anında toplanır)
+- Süreç RSS / CPU: prometheus_client'ın varsayılan process collector'ı
+Celery modunda mail ve satır sayaçları worker süreçlerinde artar, bot'un /metrics'inde görünmez.
+"""
+from typing import Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from utils.logger import logger
+
+STAGE_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+JOBS = Counter("kova_jobs_total", "Biten Excel işleri", ["status"])
+JOB_DURATION = Histogram("kova_job_duration_seconds", "İşin başlangıçtan bitişe süresi", ["status"], buckets=STAGE_BUCKETS)
+JOB_WAIT = Histogram("kova_job_queue_wait_seconds", "İşin kuyrukta bekleme süresi", buckets=STAGE_BUCKETS)
+JOB_STAGE = Histogram("kova_job_stage_seconds", "İş aşamalarının süresi", ["stage"], buckets=STAGE_BUCKETS)
+ROWS = Counter("kova_rows_processed_total", "İşlenen Excel satırları")
+LAST_ROWS_PER_SECOND = Gauge("kova_last_job_rows_per_second", "Son biten işin okuma hızı (satır/sn)")
+MAILS = Counter("kova_mails_total", "Gönderilen mailler", ["provider", "result"])
+
+
+def observe_job(job) -> None:
+    """Biten işin süre / aşama / satır metriklerini kaydeder (scheduler._finish'ten çağrılır)"""
+    try:
+        status = job.status
+        JOBS.labels(status).inc()
+        if job.started_at is not None:
+            JOB_WAIT.observe(job.started_at - job.created_at)
+            JOB_DURATION.labels(status).observe(job.finished_at - job.started_at)
+        for stage, seconds in job.progress.timings.items():
+            JOB_STAGE.labels(stage).observe(seconds)
+
+        rows = (job.result or {}).get("total_rows") or 0
+        if rows:
+            ROWS.inc(rows)
+            read_seconds = job.progress.timings.get("okuma")
+            if read_seconds:
+                LAST_ROWS_PER_SECOND.set(rows / read_seconds)
+    except Exception as e:
+        logger.error(f"İş metrikleri kaydedilemedi #{job.job_id}: {e}")
+
+
+def observe_mail(provider: str, success: bool) -> None:
+    MAILS.labels(provider, "success" if success else "failure").inc()
+
+
+class RuntimeCollector:
+    """Kuyruk ve gönderici durumlarını her /metrics okumasında anlık toplar"""
+
+    def describe(self):
+        # Kayıt sırasında collect() çağrılmasın (scheduler bu modülü import ediyor)
+        return []
+
+    def collect(self):
+        from jobs.scheduler import job_scheduler
+        from utils.telegram_sender import limiter_stats
+        from utils.update_queue import update_queue
+
+        stats = update_queue.stats()
+        yield GaugeMetricFamily("kova_update_queue_depth", "Webhook kuyruğunda bekleyen update", value=stats["depth"])
+        yield GaugeMetricFamily("kova_update_queue_capacity", "Webhook kuyruğu kapasitesi", value=stats["capacity"])
+        yield GaugeMetricFamily("kova_update_workers_busy", "Update işleyen worker sayısı", value=stats["busy"])
+        updates = CounterMetricFamily("kova_updates", "Webhook update sayaçları", labels=["result"])
+        for key in ("received", "processed", "failed", "rejected", "duplicates"):
+            updates.add_metric([key], stats[key])
+        yield updates
+
+        yield GaugeMetricFamily("kova_jobs_queued", "Kuyrukta bekleyen Excel işi", value=len(job_scheduler.queued_jobs()))
+        yield GaugeMetricFamily("kova_jobs_running", "Çalışan Excel işi", value=job_scheduler.running_count)
+
+        telegram = CounterMetricFamily("kova_telegram_requests", "Sınırlanan Telegram çağrıları", labels=["result"])
+        for key, value in limiter_stats().items():
+            telegram.add_metric([key], value)
+        yield telegram
+
+
+REGISTRY.register(RuntimeCollector())
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Prometheus metin formatı: (gövde, content-type)"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,103 @@
+#Akışlı MIME Mesajı (utils/mime_stream.py)
+"""
+Büyük ekli mailleri belleğe almadan gönderir:
+- Başlıklar ve parça sınırları önceden oluşturulur (birkaç KB)
+- Ekler diskten 57 KB'lık bloklar halinde okunur ve base64'e çevrilerek SMTP DATA'ya yazılır
+- Mesaj boyutu göndermeden önce hesaplanır (iz/istatistik için)
+Böylece aynı anda birden fazla gönderimde bellek kullanımı ek boyutundan bağımsız kalır.
+"""
+import base64
+import math
+import uuid
+from email.header import Header
+from email.utils import encode_rfc2231, formatdate, make_msgid
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+# base64 her 57 byte'ı 76 karakterlik bir satıra çevirir → 57'nin katı okununca satırlar bloklara tam bölünür
+CHUNK_BYTES = 57 * 1024
+
+
+def _header(name: str, value: str) -> bytes:
+    """ASCII dışı değerleri RFC 2047 ile kodlayıp satırı CRLF ile döndürür"""
+    try:
+        value.encode("ascii")
+        encoded = value
+    except UnicodeEncodeError:
+        encoded = Header(value, "utf-8", header_name=name).encode()
+    return f"{name}: {encoded}".replace("\n", "\r\n").encode("ascii") + b"\r\n"
+
+
+def _disposition(filename: str) -> bytes:
+    """Dosya adı ASCII değilse RFC 2231 (filename*=utf-8'') kullanılır"""
+    try:
+        filename.encode("ascii")
+        value = f'attachment; filename="{filename}"'
+    except UnicodeEncodeError:
+        value = f"attachment; filename*={encode_rfc2231(filename, 'utf-8')}"
+    return f"Content-Disposition: {value}\r\n".encode("ascii")
+
+
+def _base64_size(size: int) -> int:
+    """base64 (76 karakter + CRLF satırlar) çıktısının byte cinsinden boyutu"""
+    return 4 * math.ceil(size / 3) + 2 * math.ceil(size / 57)
+
+
+def _base64_lines(data: bytes) -> bytes:
+    return base64.encodebytes(data).replace(b"\n", b"\r\n")
+
+
+class StreamingMessage:
+    """multipart/mixed mesajı: gövde metni + diskten akışla okunan ekler"""
+
+    def __init__(self, to_emails: List[str], subject: str, body: str, paths: List[Path], sender: str):
+        self.paths = paths
+        boundary = f"==============={uuid.uuid4().hex}=="
+        self._delimiter = f"--{boundary}\r\n".encode("ascii")
+        self._closing = f"--{boundary}--\r\n".encode("ascii")
+
+        self._head = (
+            _header("From", sender)
+            + _header("To", ", ".join(to_emails))
+            + _header("Subject", subject)
+            + _header("Date", formatdate(localtime=True))
+            + _header("Message-ID", make_msgid())
+            + b"MIME-Version: 1.0\r\n"
+            + f'Content-Type: multipart/mixed; boundary="{boundary}"\r\n\r\n'.encode("ascii")
+            + self._delimiter
+            + b'Content-Type: text/plain; charset="utf-8"\r\n'
+            + b"Content-Transfer-Encoding: base64\r\n\r\n"
+            + _base64_lines(body.encode("utf-8"))
+        )
+
+        # Her ek: (parça başlığı, dosya yolu, dosya boyutu)
+        self._parts: List[Tuple[bytes, Path, int]] = []
+        for path in paths:
+            part_header = (
+                self._delimiter
+                + f"Content-Type: application/{'zip' if path.suffix == '.zip' else 'xlsx'}\r\n".encode("ascii")
+                + b"MIME-Version: 1.0\r\n"
+                + b"Content-Transfer-Encoding: base64\r\n"
+                + _disposition(path.name)
+                + b"\r\n"
+            )
+            self._parts.append((part_header, path, path.stat().st_size))
+
+        self.size = (
+            len(self._head)
+            + sum(len(header) + _base64_size(size) for header, _, size in self._parts)
+            + len(self._closing)
+        )
+
+    def iter_chunks(self) -> Iterator[bytes]:
+        """SMTP DATA'ya yazılacak blokları üretir (CRLF satırlar, nokta ile başlayan satır yok)"""
+        yield self._head
+        for header, path, _ in self._parts:
+            yield header
+            with open(path, "rb") as f:
+                while True:
+                    block = f.read(CHUNK_BYTES)
+                    if not block:
+                        break
+                    yield _base64_lines(block)
+        yield self._closing
@@ -0,0 +1,109 @@
+#Hız Sınırlayıcı (utils/rate_limit.py)
+"""
+Mail gönderimi ve Telegram API çağrıları için ortak token-bucket.
+RedisTokenBucket aynı arayüzle kovayı Redis'te tutar: birden fazla süreç (Celery worker'ları) tek limiti paylaşır.
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from config import config
+
+
+class TokenBucket:
+    """Dakikalık dolum hızına sahip basit token-bucket"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0  # saniyede eklenen token
+        # Kısa bir patlamaya izin ver (varsayılan: 15 saniyelik kota)
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_minute / 4)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1) -> float:
+        """Yeterli token birikene kadar bekler, beklenen süreyi (sn) döndürür"""
+        if self.rate <= 0:
+            return 0.0  # Limitsiz
+
+        # Kapasiteden büyük istekler kilitlenmesin diye kapasiteye kırpılır
+        amount = min(amount, self.capacity)
+        waited = 0.0
+
+        # Kilit uyurken de tutulur → bekleyenler FIFO sırayla geçer
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+
+
+# Dolum + alma tek adımda (atomik); saat Redis'in saati → süreçler arası saat farkı etkilemez.
+# Dönüş: token yetmiyorsa beklenmesi gereken süre (sn), metin olarak (Lua sayıları tamsayıya kırpılır)
+_TAKE_SCRIPT = """
+local rate, capacity, amount = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= amount then tokens = tokens - amount else wait = (amount - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+_redis_clients: Dict[int, Any] = {}
+
+
+def redis_client():
+    """Paylaşılan limitler için async Redis istemcisi (event loop başına bir tane; redis ilk kullanımda yüklenir)"""
+    from redis.asyncio import Redis
+
+    loop_id = id(asyncio.get_running_loop())
+    if loop_id not in _redis_clients:
+        _redis_clients[loop_id] = Redis.from_url(config.REDIS_URL)
+    return _redis_clients[loop_id]
+
+
+class RedisTokenBucket:
+    """TokenBucket ile aynı arayüz; durum Redis'te (key), tüm süreçler aynı kovadan harcar"""
+
+    def __init__(self, key: str, rate_per_minute: float, capacity: Optional[float] = None):
+        self.key = key
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_minute / 4)
+
+    async def acquire(self, amount: float = 1) -> float:
+        """Yeterli token birikene kadar bekler, beklenen süreyi (sn) döndürür"""
+        if self.rate <= 0:
+            return 0.0
+
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        client = redis_client()
+        while True:
+            delay = float(await client.eval(_TAKE_SCRIPT, 1, self.key, self.rate, self.capacity, amount))
+            if delay <= 0:
+                return waited
+            # Bekleyen süreçler sırayla değil, ilk uyanan alır (kısa gecikmeler için yeterli)
+            await asyncio.sleep(delay)
+            waited += delay
+
+
+def make_bucket(key: str, rate_per_minute: float, capacity: Optional[float] = None):
+    """MAIL_LIMITER_BACKEND'e göre süreç içi veya Redis'te paylaşılan kova"""
+    if config.MAIL_LIMITER_BACKEND == "redis":
+        return RedisTokenBucket(key, rate_per_minute, capacity)
+    return TokenBucket(rate_per_minute, capacity)
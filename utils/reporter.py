@@ -40,6 +40,13 @@ def generate_processing_report(result: Dict) -> str:
         row_count = file_info.get("row_count", 0)
         group_name = group_manager.get_group_info(group_id).get("group_name", group_id)
         report_lines.append(f"• {group_name}: {filename} ({row_count} satır)")
+        
+        # Ek limiti nedeniyle zip'lenen / bölünen dosyalar
+        for part in file_info.get("parts", []):
+            if part.get("rows"):
+                report_lines.append(f"   ↳ {part['filename']} (satır {part['rows'][0]}-{part['rows'][1]})")
+            else:
+                report_lines.append(f"   ↳ {part['filename']} (zip, {part['size'] / 1024 / 1024:.1f} MB)")
     
     # Eşleşmeyen şehirler
     unmatched_cities = result.get("unmatched_cities", [])
@@ -0,0 +1,226 @@
+#SMTP Hesap Havuzu (utils/smtp_accounts.py)
+"""
+Birden fazla SMTP hesabı/sunucusu arasında gönderimi paylaştırır:
+- Ağırlıklı round-robin (nginx "smooth weighted" algoritması)
+- Kota veya kimlik doğrulama hatası alan hesap bir süre devre dışı kalır (failover)
+- Günlük limit (daily_limit) dolan hesap ertesi güne kadar seçilmez
+- MAIL_LIMITER_BACKEND=redis: günlük sayaç ve bekleme süreleri Redis'te, tüm worker'lar aynı durumu görür
+
+config.SMTP_ACCOUNTS boşsa SMTP_SERVER / SMTP_USERNAME / SMTP_PASSWORD ile tek hesap kullanılır.
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import config
+from utils.logger import logger
+
+
+def default_ports_for(server: str) -> List[int]:
+    """config ile aynı akıllı port seçimi: Yandex sadece 465, diğerleri 465 + 587"""
+    return [465] if "yandex" in server.lower() else [465, 587]
+
+
+@dataclass
+class SmtpAccount:
+    name: str
+    server: str
+    username: str
+    password: str
+    ports: List[int] = field(default_factory=list)
+    security: str = "auto"
+    weight: int = 1
+    messages_per_minute: int = 0   # 0 → sağlayıcı varsayılanı
+    bytes_per_minute: int = 0
+    daily_limit: int = 0           # 0 → limitsiz
+
+    # Çalışma zamanı durumu
+    current_weight: int = 0
+    disabled_until: float = 0.0
+    disabled_reason: str = ""
+    sent_today: int = 0
+    sent_day: date = field(default_factory=date.today)
+    failures: int = 0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], index: int = 0) -> "SmtpAccount":
+        server = data["server"]
+        username = data.get("username", "")
+        return cls(
+            name=data.get("name") or f"{username or 'hesap' + str(index + 1)}@{server}",
+            server=server,
+            username=username,
+            password=data.get("password", ""),
+            ports=[int(p) for p in data.get("ports", [])] or default_ports_for(server),
+            security=data.get("security", "auto").lower(),
+            weight=max(1, int(data.get("weight", 1))),
+            messages_per_minute=int(data.get("messages_per_minute", 0)),
+            bytes_per_minute=int(data.get("bytes_per_minute", 0)),
+            daily_limit=int(data.get("daily_limit", 0)),
+        )
+
+    def _roll_day(self):
+        today = date.today()
+        if self.sent_day != today:
+            self.sent_day, self.sent_today = today, 0
+
+    def is_available(self, now: float) -> bool:
+        self._roll_day()
+        if self.daily_limit and self.sent_today >= self.daily_limit:
+            return False
+        return now >= self.disabled_until
+
+
+def default_account() -> SmtpAccount:
+    """config'deki tekil SMTP ayarlarından hesap oluşturur"""
+    return SmtpAccount(
+        name=config.SMTP_USERNAME or config.SMTP_SERVER,
+        server=config.SMTP_SERVER,
+        username=config.SMTP_USERNAME,
+        password=config.SMTP_PASSWORD,
+        ports=list(config.SMTP_PORTS),
+        security=config.SMTP_SECURITY,
+    )
+
+
+class SmtpAccountPool:
+    def __init__(self, accounts: List[SmtpAccount]):
+        self.accounts = accounts
+
+    @classmethod
+    def from_config(cls) -> "SmtpAccountPool":
+        if config.SMTP_ACCOUNTS:
+            accounts = [SmtpAccount.from_dict(data, i) for i, data in enumerate(config.SMTP_ACCOUNTS)]
+        else:
+            accounts = [default_account()]
+        logger.info(f"📮 SMTP hesap havuzu: {[f'{a.name} (x{a.weight})' for a in accounts]}")
+        return cls(accounts)
+
+    def select(self, exclude: Iterable[str] = ()) -> Optional[SmtpAccount]:
+        """Kullanılabilir hesaplar arasından ağırlıklı round-robin ile seçer"""
+        now = time.monotonic()
+        excluded = set(exclude)
+        candidates = [a for a in self.accounts if a.name not in excluded and a.is_available(now)]
+        if not candidates:
+            return None
+
+        total = sum(a.weight for a in candidates)
+        for account in candidates:
+            account.current_weight += account.weight
+        chosen = max(candidates, key=lambda a: a.current_weight)
+        chosen.current_weight -= total
+        return chosen
+
+    def mark_success(self, account: SmtpAccount):
+        account.sent_today += 1
+        account.failures = 0
+        if account.daily_limit and account.sent_today >= account.daily_limit:
+            logger.warning(f"📮 {account.name} günlük limitine ulaştı ({account.daily_limit})")
+
+    def mark_failure(self, account: SmtpAccount, error_kind: Optional[str]):
+        """Kota / kimlik hatasında hesabı bir süre devre dışı bırakır"""
+        account.failures += 1
+        if error_kind == "auth":
+            cooldown = config.SMTP_AUTH_COOLDOWN
+        elif error_kind == "quota":
+            cooldown = config.SMTP_QUOTA_COOLDOWN
+        else:
+            return
+        account.disabled_until = time.monotonic() + cooldown
+        account.disabled_reason = error_kind
+        logger.warning(f"📮 {account.name} {cooldown} sn devre dışı ({error_kind} hatası), diğer hesaplara geçiliyor")
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Admin ekranı için hesap durumları"""
+        now = time.monotonic()
+        return [
+            {
+                "name": a.name,
+                "weight": a.weight,
+                "available": a.is_available(now),
+                "sent_today": a.sent_today,
+                "daily_limit": a.daily_limit,
+                "disabled_for": max(0, int(a.disabled_until - now)),
+                "disabled_reason": a.disabled_reason if a.disabled_until > now else "",
+            }
+            for a in self.accounts
+        ]
+
+
+class RedisAccountState:
+    """Hesapların günlük gönderim sayısı ve devre dışı kalma süreleri Redis'te"""
+
+    DAY_TTL = 2 * 24 * 3600
+
+    @staticmethod
+    def _sent_key(account: SmtpAccount) -> str:
+        return f"kova:mail:{account.name}:sent:{date.today().isoformat()}"
+
+    @staticmethod
+    def _disabled_key(account: SmtpAccount) -> str:
+        return f"kova:mail:{account.name}:disabled"
+
+    async def refresh(self, accounts: List[SmtpAccount]):
+        """Yerel hesap durumunu Redis'tekiyle günceller (seçimden önce, tek pipeline)"""
+        from utils.rate_limit import redis_client
+
+        async with redis_client().pipeline(transaction=False) as pipe:
+            for account in accounts:
+                pipe.get(self._sent_key(account))
+                pipe.pttl(self._disabled_key(account))
+                pipe.get(self._disabled_key(account))
+            values = await pipe.execute()
+
+        now, today = time.monotonic(), date.today()
+        for index, account in enumerate(accounts):
+            sent, ttl_ms, reason = values[index * 3:index * 3 + 3]
+            account.sent_day, account.sent_today = today, int(sent or 0)
+            if ttl_ms and ttl_ms > 0:
+                account.disabled_until = max(account.disabled_until, now + ttl_ms / 1000)
+                account.disabled_reason = (reason or b"").decode()
+
+    async def record_success(self, account: SmtpAccount):
+        from utils.rate_limit import redis_client
+
+        async with redis_client().pipeline(transaction=False) as pipe:
+            pipe.incr(self._sent_key(account))
+            pipe.expire(self._sent_key(account), self.DAY_TTL)
+            sent, _ = await pipe.execute()
+        account.sent_today = int(sent)
+
+    async def record_failure(self, account: SmtpAccount):
+        """mark_failure hesabı devre dışı bıraktıysa kalan süre diğer worker'lara da yazılır"""
+        from utils.rate_limit import redis_client
+
+        remaining_ms = int((account.disabled_until - time.monotonic()) * 1000)
+        if remaining_ms > 0:
+            await redis_client().set(self._disabled_key(account), account.disabled_reason, px=remaining_ms)
+
+
+_pool: Optional[SmtpAccountPool] = None
+_shared_state: Optional[RedisAccountState] = None
+
+
+def get_account_pool() -> SmtpAccountPool:
+    """Global hesap havuzu (config'den lazy oluşturulur)"""
+    global _pool
+    if _pool is None:
+        _pool = SmtpAccountPool.from_config()
+    return _pool
+
+
+def reset_account_pool():
+    """config değiştiğinde havuz yeniden oluşturulsun"""
+    global _pool
+    _pool = None
+
+
+def shared_account_state() -> Optional[RedisAccountState]:
+    """MAIL_LIMITER_BACKEND=redis ise paylaşılan hesap durumu, değilse None (durum süreç içinde)"""
+    global _shared_state
+    if config.MAIL_LIMITER_BACKEND != "redis":
+        return None
+    if _shared_state is None:
+        _shared_state = RedisAccountState()
+    return _shared_state
@@ -0,0 +1,155 @@
+#SMTP Zamanlama İzi (utils/smtp_trace.py)
+"""
+Her mail teslimatı için aşama bazlı süreleri saklar:
+dns → connect → tls (465) / starttls (587) → login → data
+Kayıtlar bellekte (son N teslimat) ve logs/smtp_trace.jsonl dosyasında tutulur,
+/smtp admin komutu aşama bazında p50/p95 özetini gösterir.
+Dosyaya arka plan thread'i yazar (gönderim beklemez); dosya büyüyünce son N kayda kırpılır,
+açılışta sadece dosya sonu okunur.
+"""
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from config import config
+from utils.log_reader import tail_lines
+from utils.logger import logger
+
+TRIM_BYTES_PER_RECORD = 1024  # Dosya max_records * bu kadar byte'ı aşınca son max_records kayda kırpılır
+
+PHASES = ("dns", "connect", "tls", "starttls", "login", "data")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Basit en-yakın-sıra yüzdelik"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+@dataclass
+class DeliveryTrace:
+    recipients: List[str]
+    server: str
+    account: str = ""
+    port: int = 0
+    security: str = ""
+    started_at: float = field(default_factory=time.time)
+    phases: Dict[str, float] = field(default_factory=dict)  # aşama → saniye (son deneme)
+    bytes_sent: int = 0
+    attempts: int = 0
+    total: float = 0.0
+    success: bool = False
+    error: Optional[str] = None
+    error_kind: Optional[str] = None  # auth | quota | temporary
+
+
+class SmtpTraceStore:
+    def __init__(self, path: Path, max_records: int = 2000):
+        self.path = path
+        self.max_records = max_records
+        self.records: Deque[Dict[str, Any]] = deque(maxlen=max_records)
+        self._loaded = False
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Yeniden başlatma sonrası önceki kayıtları yükler (bir kez; dosyanın sadece sonu okunur)"""
+        self._loaded = True
+        if not self.path.exists():
+            return
+        try:
+            lines = tail_lines(self.path, self.max_records)
+        except OSError as e:
+            logger.warning(f"SMTP iz dosyası okunamadı: {e}")
+            return
+        for line in lines:
+            try:
+                self.records.append(json.loads(line))
+            except ValueError:
+                continue
+
+    def record(self, trace: DeliveryTrace):
+        if not self._loaded:
+            self._load()
+        data = asdict(trace)
+        self.records.append(data)
+        self._queue.put(json.dumps(data, ensure_ascii=False) + "\n")
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="smtp-trace-writer", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            lines = [self._queue.get()]
+            while True:  # Birikmiş kayıtlar tek yazımda
+                try:
+                    lines.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+                    size = f.tell()
+                if size > self.max_records * TRIM_BYTES_PER_RECORD:
+                    self._trim()
+            except OSError as e:
+                logger.warning(f"SMTP izi yazılamadı: {e}")
+            finally:
+                for _ in lines:
+                    self._queue.task_done()
+
+    def _trim(self):
+        """Dosyayı son max_records kayda indirir (geçici dosya + atomik değiştirme)"""
+        lines = tail_lines(self.path, self.max_records)
+        temp_path = self.path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write("".join(lines))
+        os.replace(temp_path, self.path)
+
+    def flush(self):
+        """Kuyruktaki kayıtlar dosyaya yazılana kadar bekler (kapanış / benchmark)"""
+        self._queue.join()
+
+    def summary(self, since: Optional[float] = None) -> Dict[str, Any]:
+        """Aşama bazında p50/p95 (ms) ve genel teslimat istatistikleri"""
+        if not self._loaded:
+            self._load()
+        records = [r for r in self.records if since is None or r.get("started_at", 0) >= since]
+
+        phases = {}
+        for phase in PHASES:
+            values = [r["phases"][phase] for r in records if phase in r.get("phases", {})]
+            if values:
+                phases[phase] = {
+                    "count": len(values),
+                    "p50_ms": percentile(values, 50) * 1000,
+                    "p95_ms": percentile(values, 95) * 1000,
+                }
+
+        totals = [r.get("total", 0.0) for r in records]
+        successes = sum(1 for r in records if r.get("success"))
+        return {
+            "deliveries": len(records),
+            "successful": successes,
+            "failed": len(records) - successes,
+            "avg_attempts": sum(r.get("attempts", 0) for r in records) / len(records) if records else 0.0,
+            "bytes_sent": sum(r.get("bytes_sent", 0) for r in records),
+            "total_p50_ms": percentile(totals, 50) * 1000,
+            "total_p95_ms": percentile(totals, 95) * 1000,
+            "phases": phases,
+        }
+
+
+# Global trace store instance
+smtp_trace_store = SmtpTraceStore(config.LOGS_DIR / "smtp_trace.jsonl")
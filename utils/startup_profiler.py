@@ -0,0 +1,159 @@
+#Başlangıç Profilleyici (utils/startup_profiler.py)
+"""
+Soğuk başlangıç süresini ölçer (Render free tier'da bot sık uyanır):
+- STARTUP_PROFILE=true iken her modülün import süresi sys.meta_path kancasıyla ölçülür
+  (python -X importtime gibi: modülün kendi süresi + alt import'larla toplam süre)
+- Hazır olma süresi (router'lar yüklendi, sunucu dinliyor) ve ilk update'e kadar geçen süre loglanır
+config'e ve üçüncü parti paketlere bağımlı değildir; main.py'de diğer import'lardan önce kurulur.
+"""
+import os
+import sys
+import threading
+import time
+from importlib.abc import MetaPathFinder
+from typing import Any, Dict, List, Optional
+
+REPORT_TOP = 15  # Raporda gösterilen en yavaş modül sayısı
+
+
+class _TimedLoader:
+    """Asıl loader'ı sarar; create_module + exec_module süresini profilleyiciye yazar"""
+
+    def __init__(self, profiler: "StartupProfiler", loader):
+        self._profiler = profiler
+        self._loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        create = getattr(self._loader, "create_module", None)
+        if create is None:
+            return None
+        with self._profiler.measure(spec.name):
+            return create(spec)
+
+    def exec_module(self, module):
+        # Modül kendi loader'ını görsün (importlib.resources vb. loader'a bakar)
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        with self._profiler.measure(module.__name__):
+            self._loader.exec_module(module)
+
+
+class _Measure:
+    def __init__(self, profiler: "StartupProfiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._stack.append([self.name, time.perf_counter(), 0.0])
+
+    def __exit__(self, *exc):
+        name, started, children = self.profiler._stack.pop()
+        total = time.perf_counter() - started
+        record = self.profiler.modules.setdefault(name, {"self": 0.0, "total": 0.0, "depth": len(self.profiler._stack)})
+        record["self"] += total - children
+        record["total"] += total
+        if self.profiler._stack:
+            self.profiler._stack[-1][2] += total
+        return False
+
+
+class StartupProfiler(MetaPathFinder):
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.enabled = os.getenv("STARTUP_PROFILE", "False").lower() == "true"
+        self.modules: Dict[str, Dict[str, Any]] = {}
+        self.ready_at: Optional[float] = None
+        self.first_update_at: Optional[float] = None
+        self._stack: List[list] = []
+        self._finding = False
+        self._thread: Optional[int] = None
+
+    def install(self):
+        """Import ölçümünü başlatır (STARTUP_PROFILE kapalıysa hiçbir şey yapmaz)"""
+        if self.enabled and self not in sys.meta_path:
+            self._thread = threading.get_ident()  # Sadece ana thread'in import'ları ölçülür
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path=None, target=None):
+        if self._finding or threading.get_ident() != self._thread:
+            return None
+        self._finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding = False
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(self, spec.loader)
+        return spec
+
+    def measure(self, name: str) -> _Measure:
+        return _Measure(self, name)
+
+    def elapsed(self, at: Optional[float] = None) -> float:
+        return (at or time.perf_counter()) - self.started
+
+    def slowest(self, top: int = REPORT_TOP) -> List[tuple]:
+        """Kendi süresi en uzun modüller: (modül, kendi sn, toplam sn)"""
+        ranked = sorted(self.modules.items(), key=lambda item: item[1]["self"], reverse=True)
+        return [(name, record["self"], record["total"]) for name, record in ranked[:top]]
+
+    def mark_ready(self):
+        """Bot update almaya hazır: import ölçümü biter, rapor loglanır"""
+        if self.ready_at is not None:
+            return
+        self.ready_at = time.perf_counter()
+        self.uninstall()
+
+        from utils.logger import logger
+
+        logger.info(f"⏱️ Başlangıç süresi: {self.elapsed(self.ready_at):.2f} sn (hazır)")
+        if self.modules:
+            imports = sum(record["total"] for record in self.modules.values() if record["depth"] == 0)
+            lines = [f"  {record_self * 1000:8.1f} ms | {total * 1000:8.1f} ms | {name}" for name, record_self, total in self.slowest()]
+            logger.info(
+                f"⏱️ Import süresi: {imports:.2f} sn, {len(self.modules)} modül. En yavaşlar (kendi | toplam):\n"
+                + "\n".join(lines)
+            )
+
+    def mark_first_update(self):
+        if self.first_update_at is not None:
+            return
+        self.first_update_at = time.perf_counter()
+
+        from utils.logger import logger
+
+        logger.info(f"⏱️ İlk update: başlangıçtan {self.elapsed(self.first_update_at):.2f} sn sonra")
+
+    async def first_update_middleware(self, handler, event, data):
+        """Dispatcher outer middleware: ilk update'in geliş zamanını kaydeder"""
+        if self.first_update_at is None:
+            self.mark_first_update()
+        return await handler(event, data)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "ready_seconds": self.elapsed(self.ready_at) if self.ready_at else None,
+            "first_update_seconds": self.elapsed(self.first_update_at) if self.first_update_at else None,
+            "modules": len(self.modules),
+            "slowest": self.slowest(),
+        }
+
+
+# Global startup profiler instance
+startup_profiler = StartupProfiler()
@@ -0,0 +1,131 @@
+#Telegram Gönderim Sınırlayıcı (utils/telegram_sender.py)
+"""
+Bot'un tüm giden API çağrıları (rapor, dosya, toplu mesaj) tek noktadan sınırlanır:
+- Bot session middleware'i olarak takılır → message.answer / send_document vb. değişmeden sınırlanır
+- Genel token-bucket (TG_GLOBAL_RATE mesaj/sn) + sohbet başına token-bucket
+  (özel sohbet TG_CHAT_RATE_PER_MINUTE, grup TG_GROUP_RATE_PER_MINUTE)
+- Aynı anda en fazla TG_MAX_CONCURRENCY gönderim
+- 429 (TelegramRetryAfter) gelirse retry_after süresince tüm gönderimler durur, istek tekrar denenir
+Sadece chat_id'li (mesaj gönderen) çağrılar sınırlanır; getUpdates, getFile vb. doğrudan geçer.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, SendMediaGroup, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from config import config
+from utils.logger import logger
+from utils.rate_limit import TokenBucket
+
+MAX_CHAT_BUCKETS = 10000  # Bellekte tutulan sohbet kovası sayısı (en eski kullanılanlar atılır)
+
+
+class TelegramRateLimiter(BaseRequestMiddleware):
+    def __init__(self):
+        per_second = config.TG_GLOBAL_RATE
+        self.global_bucket = TokenBucket(per_second * 60, capacity=per_second)
+        self._chat_buckets: "OrderedDict[Any, TokenBucket]" = OrderedDict()
+        self._semaphore = asyncio.Semaphore(config.TG_MAX_CONCURRENCY)
+        self._paused_until = 0.0
+        self.stats = {"sent": 0, "retry_after": 0, "failed": 0}
+
+    def _chat_bucket(self, chat_id: Any) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            # Negatif id / @kanal → grup veya kanal (dakikada ~20 mesaj)
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            rate = config.TG_GROUP_RATE_PER_MINUTE if is_group else config.TG_CHAT_RATE_PER_MINUTE
+            # Patlamaya izin verme: Telegram sohbet limitini kısa aralıklarla ölçer
+            bucket = self._chat_buckets[chat_id] = TokenBucket(rate, capacity=1)
+            if len(self._chat_buckets) > MAX_CHAT_BUCKETS:
+                self._chat_buckets.popitem(last=False)
+        else:
+            self._chat_buckets.move_to_end(chat_id)
+        return bucket
+
+    @staticmethod
+    async def _acquire(bucket: TokenBucket, amount: int):
+        """Her mesaj için ayrı token: tek seferde istenirse TokenBucket miktarı kapasiteye kırpar"""
+        for _ in range(amount):
+            await bucket.acquire()
+
+    async def _wait_pause(self):
+        delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await make_request(bot, method)
+
+        # Medya grubundaki her dosya ayrı mesaj sayılır
+        amount = len(method.media) if isinstance(method, SendMediaGroup) else 1
+
+        for attempt in range(config.TG_MAX_RETRIES + 1):
+            await self._wait_pause()
+            await self._acquire(self._chat_bucket(chat_id), amount)
+            await self._acquire(self.global_bucket, amount)
+            try:
+                async with self._semaphore:
+                    response = await make_request(bot, method)
+                self.stats["sent"] += 1
+                return response
+            except TelegramRetryAfter as e:
+                self.stats["retry_after"] += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + e.retry_after)
+                if attempt == config.TG_MAX_RETRIES:
+                    self.stats["failed"] += 1
+                    raise
+                logger.warning(
+                    f"⏳ Telegram flood limiti ({method.__api_method__}, sohbet {chat_id}): "
+                    f"{e.retry_after} sn bekleniyor (deneme {attempt + 1}/{config.TG_MAX_RETRIES})"
+                )
+
+
+async def broadcast(bot: Bot, chat_ids: Iterable[int], text: str, **kwargs) -> Dict[str, int]:
+    """
+    Aynı mesajı birden fazla sohbete paralel gönderir; hız ve eşzamanlılık
+    bot session'ındaki TelegramRateLimiter ile sınırlanır.
+    """
+    chat_ids = list(chat_ids)
+
+    async def send(chat_id: int) -> bool:
+        try:
+            await bot.send_message(chat_id, text, **kwargs)
+            return True
+        except Exception as e:
+            logger.error(f"Toplu mesaj gönderilemedi {chat_id}: {e}")
+            return False
+
+    results = await asyncio.gather(*(send(chat_id) for chat_id in chat_ids))
+    sent = sum(results)
+    return {"sent": sent, "failed": len(chat_ids) - sent}
+
+
+_limiter: Optional[TelegramRateLimiter] = None
+
+
+def install_rate_limiter(bot: Bot) -> TelegramRateLimiter:
+    """Bot session'ına sınırlayıcıyı takar (tüm botlar aynı limiti paylaşır)"""
+    global _limiter
+    if _limiter is None:
+        _limiter = TelegramRateLimiter()
+    bot.session.middleware(_limiter)
+    return _limiter
+
+
+def limiter_stats() -> Dict[str, int]:
+    """Gönderim sayaçları (sınırlayıcı takılmadıysa boş)"""
+    return dict(_limiter.stats) if _limiter else {}
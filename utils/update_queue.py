@@ -0,0 +1,146 @@
+#Webhook Update Kuyruğu (utils/update_queue.py)
+"""
+Webhook'a gelen update'ler hemen 200 ile onaylanır, işleme arka planda yapılır:
+- Sınırlı kuyruk (WEBHOOK_QUEUE_SIZE); doluysa 503 döner → Telegram update'i sonra tekrar gönderir
+- WEBHOOK_WORKERS adet işleyici; aynı sohbetin update'leri hep aynı işleyiciye gider (sıra korunur)
+- Son görülen update_id'ler tutulur, Telegram'ın tekrar gönderdiği update iki kez işlenmez
+- Kuyruk derinliği, bekleme (lag) ve işleme süreleri /queue admin komutunda izlenir
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from aiogram import Bot, Dispatcher
+
+from config import config
+from utils.logger import logger
+from utils.smtp_trace import percentile
+
+RECENT_UPDATE_IDS = 1000  # Tekrar kontrolü için hatırlanan update sayısı
+LATENCY_SAMPLES = 500     # p50/p95 için tutulan son ölçüm sayısı
+
+
+def chat_key(update: Dict[str, Any]) -> int:
+    """Update'in ait olduğu sohbet (yoksa kullanıcı) kimliği; bulunamazsa update_id"""
+    for value in update.values():
+        if not isinstance(value, dict):
+            continue
+        # message / edited_message → chat, callback_query → message.chat
+        for source in (value, value.get("message")):
+            if isinstance(source, dict) and isinstance(source.get("chat"), dict):
+                return source["chat"].get("id", 0)
+        user = value.get("from") or value.get("user")
+        if isinstance(user, dict):
+            return user.get("id", 0)
+    return update.get("update_id", 0)
+
+
+class UpdateQueue:
+    def __init__(self, workers: Optional[int] = None, maxsize: Optional[int] = None):
+        self.workers = max(1, workers or config.WEBHOOK_WORKERS)
+        self.per_worker = max(1, -(-(maxsize or config.WEBHOOK_QUEUE_SIZE) // self.workers))
+        self._queues: List[asyncio.Queue] = [asyncio.Queue(self.per_worker) for _ in range(self.workers)]
+        self._tasks: List[asyncio.Task] = []
+        self._recent: Deque[int] = deque(maxlen=RECENT_UPDATE_IDS)
+        self._recent_ids: Set[int] = set()
+        self._lag: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._durations: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.counters = {"received": 0, "processed": 0, "failed": 0, "rejected": 0, "duplicates": 0}
+        self.max_depth = 0
+        self.busy = 0  # O an update işleyen worker sayısı
+
+    @property
+    def depth(self) -> int:
+        return sum(queue.qsize() for queue in self._queues)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self, bot: Bot, dp: Dispatcher):
+        """İşleyici task'larını başlatır"""
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(queue, bot, dp))
+            for queue in self._queues
+        ]
+        logger.info(f"📬 Update kuyruğu başladı ({self.workers} işleyici, kapasite {self.per_worker * self.workers})")
+
+    def _remember(self, update_id: int):
+        if len(self._recent) == self._recent.maxlen:
+            self._recent_ids.discard(self._recent[0])
+        self._recent.append(update_id)
+        self._recent_ids.add(update_id)
+
+    def enqueue(self, update: Dict[str, Any]) -> bool:
+        """Update'i kuyruğa koyar; kuyruk doluysa False döner (çağıran 503 dönmeli)"""
+        self.counters["received"] += 1
+        update_id = update.get("update_id")
+        if update_id in self._recent_ids:
+            self.counters["duplicates"] += 1
+            return True  # Zaten alındı → tekrar onayla, işleme
+
+        queue = self._queues[chat_key(update) % self.workers]
+        try:
+            queue.put_nowait((time.monotonic(), update))
+        except asyncio.QueueFull:
+            self.counters["rejected"] += 1
+            logger.warning(f"📬 Update kuyruğu dolu, update {update_id} reddedildi (derinlik {self.depth})")
+            return False
+
+        # Sadece kuyruğa girenler hatırlanır → reddedilen update tekrar geldiğinde kabul edilir
+        if update_id is not None:
+            self._remember(update_id)
+        self.max_depth = max(self.max_depth, self.depth)
+        return True
+
+    async def _worker(self, queue: asyncio.Queue, bot: Bot, dp: Dispatcher):
+        while True:
+            enqueued_at, update = await queue.get()
+            started = time.monotonic()
+            self._lag.append(started - enqueued_at)
+            self.busy += 1
+            try:
+                await dp.feed_raw_update(bot, update)
+                self.counters["processed"] += 1
+            except Exception as e:
+                self.counters["failed"] += 1
+                logger.error(f"Update işlenemedi ({update.get('update_id')}): {e}")
+            finally:
+                self.busy -= 1
+                self._durations.append(time.monotonic() - started)
+                queue.task_done()
+
+    async def stop(self, timeout: float = 10):
+        """Kuyruktakileri (en fazla timeout sn) işleyip işleyicileri durdurur"""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(asyncio.gather(*(queue.join() for queue in self._queues)), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"📬 {self.depth} update işlenmeden kapatıldı")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        lag, durations = list(self._lag), list(self._durations)
+        return {
+            **self.counters,
+            "workers": self.workers,
+            "capacity": self.per_worker * self.workers,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "busy": self.busy,
+            "lag_p50_ms": percentile(lag, 50) * 1000,
+            "lag_p95_ms": percentile(lag, 95) * 1000,
+            "duration_p50_ms": percentile(durations, 50) * 1000,
+            "duration_p95_ms": percentile(durations, 95) * 1000,
+        }
+
+
+# Global update queue instance
+update_queue = UpdateQueue()
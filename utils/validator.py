@@ -3,8 +3,6 @@
 "TARİH", "İL" doğrulaması yapar
 
 """
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
 from typing import Dict, Any
 from utils.logger import logger
 
@@ -12,6 +10,8 @@ def validate_excel_file(file_path: str) -> Dict[str, Any]:
     """
     Excel dosyasını doğrular
     """
+    from openpyxl import load_workbook  # Ağır paket: ilk dosyada yüklenir
+
     try:
         wb = load_workbook(filename=file_path, read_only=True)
         ws = wb.active